@@ -0,0 +1,211 @@
+(* Benchmark dos motores do Scheduler: corre cada política sobre cargas geradas
+   pelo Process_generator, para vários tamanhos e horizontes, e escreve uma
+   linha por medição (CSV ou NDJSON) para comparar entre commits.
+
+   Cada medição corre num processo filho (fork): assim o pico do heap
+   (Gc.top_heap_words) é o dessa medição e uma medição que passe do --timeout
+   é interrompida e marcada como "timeout" em vez de bloquear o resto.
+
+   rm/edf correm com ~extrapolate (como o --extrapolate do prob_sched): quando o
+   escalonamento se repete, os hiperperíodos seguintes são saltados e final_time
+   passa à frente dos eventos contados. *)
+open Prob_sched_lib
+
+let split_list s =
+  String.split_on_char ',' s |> List.map String.trim |> List.filter (fun x -> x <> "")
+
+let int_list s =
+  try List.map int_of_string (split_list s)
+  with Failure _ -> raise (Arg.Bad ("Lista de inteiros inválida: " ^ s))
+
+let all_algos = ["fcfs"; "sjf"; "priority_np"; "priority_preemp"; "rr"; "rm"; "edf"]
+
+let algos_ref = ref all_algos
+let sizes_ref = ref [100; 1_000; 10_000; 100_000; 1_000_000]
+let rt_sizes_ref = ref [10; 100; 1_000]           (* nº de tarefas periódicas (rm/edf) *)
+let horizons_ref = ref [1_000; 100_000; 10_000_000]  (* tempo_max de rm/edf *)
+let quanta_ref = ref [2; 4; 8]
+let seed_ref = ref 42
+let timeout_ref = ref 60.0
+let max_releases_ref = ref 20_000_000  (* rm/edf: salta combinações com mais instâncias do que isto *)
+let format_ref = ref "csv"
+let out_ref = ref ""
+
+let usage_msg =
+  "Usage: bench [--algos a,b] [--sizes n1,n2] [--rt-sizes n1,n2] [--horizons h1,h2] [--quanta q1,q2]\n" ^
+  "             [--seed s] [--timeout segundos] [--max-releases n] [--format csv|ndjson] [--out ficheiro]\n"
+
+let speclist = [
+  ("--algos", Arg.String (fun s -> algos_ref := split_list s), " Políticas (por omissão todas)");
+  ("--sizes", Arg.String (fun s -> sizes_ref := int_list s), " Números de processos (fcfs, sjf, priority_*, rr)");
+  ("--rt-sizes", Arg.String (fun s -> rt_sizes_ref := int_list s), " Números de tarefas periódicas (rm, edf)");
+  ("--horizons", Arg.String (fun s -> horizons_ref := int_list s), " Tempos máximos (rm, edf)");
+  ("--quanta", Arg.String (fun s -> quanta_ref := int_list s), " Quanta do rr");
+  ("--seed", Arg.Set_int seed_ref, " Semente das cargas geradas");
+  ("--timeout", Arg.Set_float timeout_ref, " Tempo máximo por medição, em segundos");
+  ("--max-releases", Arg.Set_int max_releases_ref, " Máximo de instâncias por medição de rm/edf");
+  ("--format", Arg.Symbol (["csv"; "ndjson"], (fun f -> format_ref := f)), " Formato das linhas");
+  ("--out", Arg.Set_string out_ref, " Ficheiro de saída (por omissão stdout)");
+]
+
+(* Uma medição a fazer *)
+type case = {
+  algo : string;
+  quantum : int option;
+  size : int;
+  horizon : int option;
+}
+
+(* Resultado de uma medição (enviado do filho para o pai com Marshal) *)
+type measurement = {
+  wall : float;               (* segundos *)
+  events : int;
+  final_time : int;
+  allocated_words : float;
+  top_heap_words : int;
+}
+
+type outcome = Done of measurement | Timeout | Failed of string
+
+let processes_of case =
+  let st = Random_distributions.stream ~seed:!seed_ref [case.size] in
+  if case.horizon <> None then
+    List.map (fun (id, arrival_time, burst_time, period) ->
+      Process.create ~id ~arrival_time ~burst_time ~priority:id
+        ?period:(Some period) ?deadline:(Some (arrival_time + period)) ()
+    ) (Process_generator.generate_processes_rt ~st case.size)
+  else
+    List.map (fun (id, arrival_time, burst_time, priority) ->
+      Process.create ~id ~arrival_time ~burst_time ~priority ()
+    ) (Process_generator.generate_processes ~st case.size)
+
+(* Corre a política; os eventos só são contados, para medir apenas o motor *)
+let measure case : measurement =
+  let ctx = Sim_context.create (processes_of case) in
+  let processes = ctx.Sim_context.processes in
+  let events = ref 0 in
+  let sink _ = incr events in
+  Gc.compact ();
+  let allocated_before = Gc.allocated_bytes () in
+  let start = Profile.monotonic_ns () in
+  let final_time, _ =
+    match case.algo, case.quantum, case.horizon with
+    | "fcfs", _, _ -> Scheduler.fcfs ~ctx ~sink processes
+    | "sjf", _, _ -> Scheduler.sjf ~ctx ~sink processes
+    | "priority_np", _, _ -> Scheduler.priority_non_preemptive ~ctx ~sink processes
+    | "priority_preemp", _, _ -> Scheduler.priority_preemptive ~ctx ~sink processes
+    | "rr", Some quantum, _ -> Scheduler.round_robin ~ctx ~sink ~quantum processes
+    | "rm", _, Some tempo_max -> Scheduler.rate_monotonic_periodic ~ctx ~sink ~extrapolate:true ~tempo_max processes
+    | "edf", _, Some tempo_max -> Scheduler.edf_periodic ~ctx ~sink ~extrapolate:true ~tempo_max processes
+    | algo, _, _ -> failwith ("Política desconhecida: " ^ algo)
+  in
+  let wall = Int64.to_float (Int64.sub (Profile.monotonic_ns ()) start) /. 1e9 in
+  let allocated = Gc.allocated_bytes () -. allocated_before in
+  { wall; events = !events; final_time;
+    allocated_words = allocated /. float_of_int (Sys.word_size / 8);
+    top_heap_words = (Gc.stat ()).Gc.top_heap_words }
+
+(* Corre a medição num processo filho, com limite de tempo *)
+let run_isolated case : outcome =
+  let rd, wr = Unix.pipe ~cloexec:true () in
+  match Unix.fork () with
+  | 0 ->
+      Unix.close rd;
+      let oc = Unix.out_channel_of_descr wr in
+      let result = try Done (measure case) with ex -> Failed (Printexc.to_string ex) in
+      Marshal.to_channel oc result [];
+      close_out oc;
+      Unix._exit 0
+  | pid ->
+      Unix.close wr;
+      let outcome =
+        match Unix.select [rd] [] [] !timeout_ref with
+        | [], _, _ ->
+            Unix.kill pid Sys.sigkill;
+            Timeout
+        | _ ->
+            let ic = Unix.in_channel_of_descr rd in
+            (try (Marshal.from_channel ic : outcome)
+             with End_of_file -> Failed "o processo da medição terminou sem resultado")
+      in
+      Unix.close rd;
+      ignore (Unix.waitpid [] pid);
+      outcome
+
+(* Instâncias libertadas por uma medição de rm/edf até ao horizonte, pelos
+   períodos da carga gerada (sem contar com os hiperperíodos extrapolados, que
+   só se sabem a simular) *)
+let estimated_releases case =
+  match case.horizon with
+  | Some h ->
+      List.fold_left (fun acc (p : Process.t) ->
+        match p.period with
+        | Some per when p.arrival_time < h -> acc +. float_of_int (((h - 1 - p.arrival_time) / per) + 1)
+        | _ -> acc
+      ) 0.0 (processes_of case)
+  | None -> 0.0
+
+let cases () =
+  List.concat_map (fun algo ->
+    match algo with
+    | "rm" | "edf" ->
+        List.concat_map (fun size ->
+          List.map (fun h -> { algo; quantum = None; size; horizon = Some h }) !horizons_ref
+        ) !rt_sizes_ref
+    | "rr" ->
+        List.concat_map (fun size ->
+          List.map (fun q -> { algo; quantum = Some q; size; horizon = None }) !quanta_ref
+        ) !sizes_ref
+    | _ -> List.map (fun size -> { algo; quantum = None; size; horizon = None }) !sizes_ref
+  ) !algos_ref
+
+let csv_header =
+  "algorithm,quantum,size,horizon,seed,status,wall_s,events,events_per_s,final_time,allocated_words,top_heap_words"
+
+let row case outcome =
+  let opt = function Some v -> string_of_int v | None -> "" in
+  let status, fields =
+    match outcome with
+    | Done m ->
+        let rate = if m.wall > 0.0 then float_of_int m.events /. m.wall else 0.0 in
+        ("ok", [Printf.sprintf "%.6f" m.wall; string_of_int m.events; Printf.sprintf "%.0f" rate;
+                string_of_int m.final_time; Printf.sprintf "%.0f" m.allocated_words;
+                string_of_int m.top_heap_words])
+    | Timeout -> ("timeout", ["";  ""; ""; ""; ""; ""])
+    | Failed msg -> ("error: " ^ String.map (fun c -> if c = ',' || c = '\n' then ' ' else c) msg,
+                     [""; ""; ""; ""; ""; ""])
+  in
+  if !format_ref = "csv" then
+    String.concat "," ([case.algo; opt case.quantum; string_of_int case.size; opt case.horizon;
+                        string_of_int !seed_ref; status] @ fields)
+  else
+    let json_opt = function Some v -> string_of_int v | None -> "null" in
+    let measured =
+      match outcome with
+      | Done m ->
+          Printf.sprintf ",\"wall_s\":%.6f,\"events\":%d,\"events_per_s\":%.0f,\"final_time\":%d,\"allocated_words\":%.0f,\"top_heap_words\":%d"
+            m.wall m.events (if m.wall > 0.0 then float_of_int m.events /. m.wall else 0.0)
+            m.final_time m.allocated_words m.top_heap_words
+      | Timeout | Failed _ -> ""
+    in
+    Printf.sprintf "{\"algorithm\":%S,\"quantum\":%s,\"size\":%d,\"horizon\":%s,\"seed\":%d,\"status\":%S%s}"
+      case.algo (json_opt case.quantum) case.size (json_opt case.horizon) !seed_ref status measured
+
+let () =
+  Arg.parse speclist (fun arg -> raise (Arg.Bad ("Argumento inesperado: " ^ arg))) usage_msg;
+  List.iter (fun a ->
+    if not (List.mem a all_algos) then (prerr_endline ("Política desconhecida: " ^ a); exit 2)
+  ) !algos_ref;
+  let oc = if !out_ref = "" then stdout else open_out !out_ref in
+  if !format_ref = "csv" then output_string oc (csv_header ^ "\n");
+  List.iter (fun case ->
+    if estimated_releases case > float_of_int !max_releases_ref then
+      Printf.eprintf "A saltar %s com %d tarefas até %d: mais de %d instâncias (--max-releases)\n%!"
+        case.algo case.size (Option.get case.horizon) !max_releases_ref
+    else begin
+      let outcome = run_isolated case in
+      output_string oc (row case outcome ^ "\n");
+      flush oc
+    end
+  ) (cases ());
+  if oc != stdout then close_out oc
@@ -10,18 +10,73 @@ let max_time_ref = ref (None : int option)
 let num_ref = ref None
 let human_ref = ref false  (* Indica se o output deve ser legível para humanos *)
 let exp_ref = ref false   (* indica se se deve usar burst exponencial *)
+let timeline_string_ref = ref false  (* inclui também a timeline tick a tick (pode ser enorme) *)
+let seed_ref = ref (None : int option)  (* semente dos geradores (aleatória se não for indicada) *)
+let events_ref = ref ""  (* escreve os eventos da simulação neste ficheiro, à medida que são produzidos *)
+let events_format_ref = ref "ndjson"  (* formato dos eventos: ndjson ou binary *)
+let convert_ref = ref ""  (* converte o ficheiro de --file para o formato binário neste caminho *)
+let extrapolate_ref = ref false  (* rm/edf: extrapola os hiperperíodos repetidos em vez de os simular *)
+let analyze_ref = ref false  (* rm/edf: testes analíticos de escalonabilidade antes de simular *)
+let profile_ref = ref false  (* acrescenta ao output os tempos por fase, o GC e os contadores do motor *)
+let serve_ref = ref false  (* lê pedidos JSON do stdin, um por linha, e responde a cada um com uma linha *)
+let inline_ref = ref (None : (int * int * int * int) list option)  (* processos vindos no pedido (--serve) *)
+let progress_ref = ref false  (* --serve: linhas de progresso (tempo simulado) antes da resposta *)
+
+(* --- Modo sweep: várias execuções no mesmo processo, uma linha de estatísticas por execução --- *)
+let reps_ref = ref 0                      (* repetições por combinação (ativa o modo sweep) *)
+let algos_ref = ref ([] : string list)    (* lista de algoritmos (ativa o modo sweep) *)
+let quanta_ref = ref ([] : int list)      (* quanta a experimentar no rr *)
+let maxes_ref = ref ([] : int list)       (* tempos máximos a experimentar no rm/edf *)
+let gens_ref = ref ([] : int list)        (* números de processos a gerar *)
+let dists_ref = ref ([] : string list)    (* distribuições do burst: normal, exp *)
+let format_ref = ref "csv"                (* formato das linhas: csv ou ndjson *)
+let domains_ref = ref (Parallel.default_domains ())  (* domínios usados para correr as execuções *)
+let crn_ref = ref false                   (* todos os algoritmos veem a mesma carga (common random numbers) *)
+
+(* Divide "a,b,c" numa lista, ignorando elementos vazios *)
+let split_list (s : string) : string list =
+  String.split_on_char ',' s |> List.map String.trim |> List.filter (fun x -> x <> "")
+
+let int_list (s : string) : int list =
+  try List.map int_of_string (split_list s)
+  with Failure _ -> raise (Arg.Bad ("Lista de inteiros inválida: " ^ s))
 
 (* --- Especificação dos Argumentos --- *)
 let usage_msg =
   "Usage: " ^ Sys.argv.(0) ^
-  " --algo <name> [--file <path> | --gen <num>] [--quantum <int>] [--max <int>] [--human] [--exp]\n" ^
+  " --algo <name> [--file <path> | --gen <num>] [--quantum <int>] [--max <int>] [--human] [--exp] [--timeline-string] [--seed <int>]\n" ^
   "  --file <path>   : Caminho para o ficheiro CSV de processos\n" ^
   "  --gen <num>     : Gerar <num> processos aleatórios (alternativa a --file)\n" ^
   "  --algo <name>   : Algoritmo (fcfs, sjf, priority_np, priority_preemp, rr, rm, edf)\n" ^
   "  --quantum <int> : Quantum para RR\n" ^
   "  --max <int>     : Tempo máximo de simulação (obrigatório para rm/edf)\n" ^
   "  --human         : Output legível para humanos\n" ^
-  "  --exp           : Gerar burst times com distribuição exponencial (normalmente mais curtos)\n"
+  "  --exp           : Gerar burst times com distribuição exponencial (normalmente mais curtos)\n" ^
+  "  --timeline-string : Incluir a timeline com um símbolo por unidade de tempo (além dos segmentos)\n" ^
+  "  --seed <int>    : Semente dos geradores aleatórios (a mesma semente repete exatamente a execução)\n" ^
+  "  --events <path> : Escrever os eventos da simulação neste ficheiro (em stream)\n" ^
+  "  --events-format <ndjson|binary> : Formato dos eventos (ndjson por omissão; binary = 4 int32 big-endian por evento)\n" ^
+  "  --convert <path> : Converte o CSV de --file para o formato binário (lido por --file, mapeado em memória)\n" ^
+  "  --extrapolate   : rm/edf: quando o escalonamento se repete, extrapola os hiperperíodos seguintes (ficam fora da timeline)\n" ^
+  "  --analyze       : rm/edf: testes de escalonabilidade (RTA, Liu & Layland, utilização, procura do processador); só simula se forem inconclusivos\n" ^
+  "  --profile       : Acrescenta um objeto \"profile\" com o tempo de cada fase, contadores do GC e do motor\n" ^
+  "  --serve         : Fica à espera de pedidos JSON no stdin (um por linha) e responde a cada um com uma linha JSON;\n" ^
+  "                    os campos são algo, quantum, max, seed, gen, exp, file ou processes ([[id,chegada,burst,prio], ...]),\n" ^
+  "                    timeline_string, extrapolate, analyze, profile, progress e id (devolvido na resposta).\n" ^
+  "                    Com progress=true escreve antes da resposta linhas {\"progress\": tempo simulado}.\n" ^
+  "                    As outras opções da linha de comando servem de valores por omissão.\n" ^
+  "                    fcfs/sjf/priority_np/priority_preemp/rr guardam checkpoints: se o pedido seguinte for a mesma\n" ^
+  "                    política com a carga alterada, a simulação retoma antes da primeira chegada afetada\n" ^
+  "\nModo sweep (todas as combinações correm no mesmo processo, uma linha por execução, sem timeline):\n" ^
+  "  --reps <n>            : Repetições por combinação\n" ^
+  "  --algos <a,b,...>     : Algoritmos a comparar (por omissão o de --algo)\n" ^
+  "  --quanta <q1,q2,...>  : Quanta para o rr (por omissão o de --quantum)\n" ^
+  "  --maxes <m1,m2,...>   : Tempos máximos para rm/edf (por omissão o de --max)\n" ^
+  "  --gens <n1,n2,...>    : Números de processos a gerar (por omissão o de --gen, ou --file)\n" ^
+  "  --dists <normal,exp>  : Distribuições do burst (por omissão a de --exp)\n" ^
+  "  --format <csv|ndjson> : Formato das linhas (csv por omissão)\n" ^
+  "  --domains <n>         : Domínios a usar em paralelo (por omissão um por core)\n" ^
+  "  --crn                 : Todos os algoritmos/quanta/max recebem a mesma carga gerada em cada repetição\n"
 
 let speclist = [
   ("--algo", Arg.Set_string algo_ref, " Algoritmo de escalonamento (fcfs, sjf, priority_np, priority_preemp, rr, rm, edf)");
@@ -31,11 +86,38 @@ let speclist = [
   ("--max", Arg.Int (fun m -> max_time_ref := Some m), " Tempo máximo de simulação (obrigatório para rm/edf)");
   ("--human", Arg.Set human_ref, " Output legível para humanos");
   ("--exp", Arg.Set exp_ref, " Gerar burst times com distribuição exponencial");
+  ("--timeline-string", Arg.Set timeline_string_ref, " Incluir a timeline tick a tick no output");
+  ("--seed", Arg.Int (fun s -> seed_ref := Some s), " Semente dos geradores aleatórios");
+  ("--events", Arg.Set_string events_ref, " Ficheiro onde escrever os eventos da simulação");
+  ("--events-format", Arg.Symbol (["ndjson"; "binary"], (fun f -> events_format_ref := f)), " Formato dos eventos");
+  ("--convert", Arg.Set_string convert_ref, " Converter o CSV de --file para o formato binário");
+  ("--extrapolate", Arg.Set extrapolate_ref, " rm/edf: extrapolar os hiperperíodos repetidos");
+  ("--analyze", Arg.Set analyze_ref, " rm/edf: análise de escalonabilidade sem simular (simula se inconclusiva)");
+  ("--profile", Arg.Set profile_ref, " Tempos por fase, contadores do GC e do motor no output");
+  ("--serve", Arg.Set serve_ref, " Modo worker: pedidos JSON no stdin, uma resposta JSON por linha");
+  ("--reps", Arg.Set_int reps_ref, " Repetições por combinação (modo sweep)");
+  ("--algos", Arg.String (fun s -> algos_ref := split_list s), " Algoritmos separados por vírgulas (modo sweep)");
+  ("--quanta", Arg.String (fun s -> quanta_ref := int_list s), " Quanta separados por vírgulas (modo sweep)");
+  ("--maxes", Arg.String (fun s -> maxes_ref := int_list s), " Tempos máximos separados por vírgulas (modo sweep)");
+  ("--gens", Arg.String (fun s -> gens_ref := int_list s), " Números de processos separados por vírgulas (modo sweep)");
+  ("--dists", Arg.String (fun s -> dists_ref := split_list s), " Distribuições do burst: normal, exp (modo sweep)");
+  ("--format", Arg.Symbol (["csv"; "ndjson"], (fun f -> format_ref := f)), " Formato das linhas do modo sweep");
+  ("--domains", Arg.Int (fun d -> domains_ref := max 1 d), " Domínios a usar em paralelo (modo sweep)");
+  ("--crn", Arg.Set crn_ref, " Mesma carga gerada para todas as configurações de cada repetição (modo sweep)");
 ]
 
 (* --- Função de Saída JSON --- *)
+let percentiles_to_json (p : Statistics.percentiles) : t =
+  `Assoc [("p50", `Float p.p50); ("p95", `Float p.p95); ("p99", `Float p.p99)]
+
+let latency_fields (l : Statistics.latency) : (string * t) list = [
+  ("waiting_time_percentiles", percentiles_to_json l.waiting);
+  ("response_time_percentiles", percentiles_to_json l.response);
+  ("turnaround_time_percentiles", percentiles_to_json l.turnaround);
+]
+
 let stats_to_json (stats : Statistics.simulation_stats) : t =
-  `Assoc [
+  `Assoc ([
     ("total_simulation_time", `Int stats.total_simulation_time);
     ("total_processes_completed", `Int stats.total_processes_completed);
     ("avg_waiting_time", `Float stats.avg_waiting_time);
@@ -43,56 +125,120 @@ let stats_to_json (stats : Statistics.simulation_stats) : t =
     ("cpu_utilization", `Float stats.cpu_utilization);
     ("throughput", `Float stats.throughput);
     ("deadline_misses", `Int stats.deadline_misses);
-  ]
+    ("avg_response_time", `Float stats.avg_response_time);
+  ] @ latency_fields stats.latency @ [
+    ("by_priority",
+      `List (List.map (fun (priority, (c : Statistics.priority_stats)) ->
+        `Assoc ([("priority", `Int priority); ("completed", `Int c.completed)]
+                @ latency_fields c.class_latency)
+      ) stats.by_priority));
+  ])
+
+(* --- Timeline compacta: segmentos (pid, início, fim) com o processo em execução --- *)
+(* Consumidor do stream de eventos (que as políticas produzem ordenado por tempo):
+   o sink (observe) e a função que, dado o tempo final, fecha e devolve os segmentos.
+   pid -1 representa a CPU livre; segmentos seguidos do mesmo pid são juntos.
+   save/restore guardam e repõem o estado ao lado dos checkpoints do motor. *)
+type segment_state = (int * int * int) list * int * int  (* segmentos, pid atual, início *)
 
-(* --- Função para formatar a timeline da simulação --- *)
-let format_timeline_string (log : Scheduler.timeline_event list) (tempo_final : int) : string =
-  if tempo_final <= 0 || log = [] then "[No simulation trace]"
+type segment_collector = {
+  observe : Scheduler.sink;
+  skip : Scheduler.hyperperiod_skip -> unit;
+  finish : int -> (int * int * int) list;
+  save : unit -> segment_state;
+  restore : segment_state -> unit;
+}
+
+let segment_collector ?(ctx = Sim_context.default) () : segment_collector =
+  let segments = ref [] in
+  let running_pid = ref (-1) in
+  let seg_start = ref 0 in
+  (* fecha o segmento do processo atual no instante t *)
+  let close_segment t =
+    if t > !seg_start then begin
+      let pid = if !running_pid = -1 then -1 else Scheduler.display_id ~ctx !running_pid in
+      (match !segments with
+       | (last_pid, last_start, last_end) :: rest when last_pid = pid && last_end = !seg_start ->
+           segments := (pid, last_start, t) :: rest
+       | _ -> segments := (pid, !seg_start, t) :: !segments);
+      seg_start := t
+    end
+  in
+  let observe (event : Scheduler.timeline_event) =
+    let next_pid =
+      match event.Scheduler.new_state with
+      | Process.Running -> event.Scheduler.process_id
+      | Process.Terminated when event.Scheduler.process_id = !running_pid -> -1
+      | Process.Ready when event.Scheduler.process_id = !running_pid -> -1
+      | Process.Waiting when event.Scheduler.process_id = -1 -> -1
+      | _ -> !running_pid
+    in
+    if next_pid <> !running_pid then begin
+      close_segment event.Scheduler.time;
+      running_pid := next_pid
+    end
+  in
+  (* hiperperíodos extrapolados pelo motor periódico: ficam fora dos segmentos. Os
+     eventos levam o id da tarefa, que não muda quando as instâncias são renomeadas *)
+  let skip (info : Scheduler.hyperperiod_skip) =
+    close_segment info.skip_from;
+    seg_start := info.skip_from + (info.repeats * info.hyperperiod)
+  in
+  let finish tempo_final =
+    close_segment tempo_final;
+    (* nada é mostrado depois do tempo final *)
+    List.rev !segments
+    |> List.filter_map (fun (pid, inicio, fim) ->
+      if inicio >= tempo_final then None else Some (pid, inicio, min fim tempo_final))
+  in
+  (* a lista de segmentos é imutável, por isso guardar o estado é O(1) *)
+  let save () = (!segments, !running_pid, !seg_start) in
+  let restore (saved, pid, start) =
+    segments := saved;
+    running_pid := pid;
+    seg_start := start
+  in
+  { observe; skip; finish; save; restore }
+
+(* Segmentos a partir de um log já guardado *)
+let timeline_segments ?ctx (log : Scheduler.timeline_event list) (tempo_final : int) : (int * int * int) list =
+  let c = segment_collector ?ctx () in
+  List.iter c.observe log;
+  c.finish tempo_final
+
+(* --- Função para formatar a timeline da simulação (um símbolo por unidade de tempo) --- *)
+let timeline_string_of_segments (segments : (int * int * int) list) (tempo_final : int) : string =
+  if tempo_final <= 0 || segments = [] then "[No simulation trace]"
   else
     let buffer = Buffer.create (tempo_final * 6) in
-    let sorted_log = List.sort (fun e1 e2 -> compare e1.Scheduler.time e2.Scheduler.time) log in
-    let log_ref = ref sorted_log in
-    let running_pid = ref (-1) in
-    
-    for t = 0 to tempo_final - 1 do
-      let rec process_events_at_t current_t =
-        match !log_ref with
-        | event :: rest when event.Scheduler.time = current_t ->
-            (match event.Scheduler.new_state with
-             | Process.Running -> 
-                 running_pid := event.Scheduler.process_id
-             | Process.Terminated when event.Scheduler.process_id = !running_pid -> 
-                 running_pid := -1
-             | Process.Ready when event.Scheduler.process_id = !running_pid -> 
-                 running_pid := -1
-             | Process.Waiting when event.Scheduler.process_id = -1 -> 
-                 running_pid := -1
-             | _ -> ());
-            log_ref := rest;
-            process_events_at_t current_t
-        | _ -> ()
-      in
-      process_events_at_t t;
-      let symbol = 
-        if !running_pid = -1 then "[-]"
-        else 
-          (* Extrai o ID original do processo dividindo por 1000, se for uma instância periódica *)
-          let original_id = 
-            if !running_pid >= 1000 then
-              !running_pid / 1000  (* Por exemplo, instância 1001 -> processo 1 *)
-            else
-              !running_pid
-          in
-          Printf.sprintf "[P%d]" original_id
-      in
-      Buffer.add_string buffer symbol
-    done;
+    List.iter (fun (pid, inicio, fim) ->
+      let symbol = if pid = -1 then "[-]" else Printf.sprintf "[P%d]" pid in
+      for _i = inicio to fim - 1 do
+        Buffer.add_string buffer symbol
+      done
+    ) segments;
+    Buffer.contents buffer
+
+let format_timeline_string ?ctx (log : Scheduler.timeline_event list) (tempo_final : int) : string =
+  if log = [] then "[No simulation trace]"
+  else timeline_string_of_segments (timeline_segments ?ctx log tempo_final) tempo_final
+
+(* --- Segmentos em texto compacto, ex: "[P1 0-3][- 3-5]" --- *)
+let format_segments (segments : (int * int * int) list) : string =
+  if segments = [] then "[No simulation trace]"
+  else
+    let buffer = Buffer.create (List.length segments * 12) in
+    List.iter (fun (pid, inicio, fim) ->
+      if pid = -1 then Buffer.add_string buffer (Printf.sprintf "[- %d-%d]" inicio fim)
+      else Buffer.add_string buffer (Printf.sprintf "[P%d %d-%d]" pid inicio fim)
+    ) segments;
     Buffer.contents buffer
 
 (* --- Função para imprimir resultados em formato legível para humanos --- *)
-let print_human_readable algo filename tempo_final stats timeline_str processos_tuplos =
+let print_human_readable algo filename seed tempo_final stats timeline_str processos_tuplos =
   Printf.printf "Algoritmo: %s\n" algo;
   if filename <> "" then Printf.printf "Ficheiro: %s\n" filename;
+  Printf.printf "Semente: %d\n" seed;
   Printf.printf "Tempo final: %d\n" tempo_final;
   Printf.printf "\n--- Estatísticas ---\n";
   Printf.printf "Total de processos terminados: %d\n" stats.Statistics.total_processes_completed;
@@ -101,6 +247,21 @@ let print_human_readable algo filename tempo_final stats timeline_str processos_
   Printf.printf "Utilização da CPU: %.2f%%\n" stats.Statistics.cpu_utilization;
   Printf.printf "Throughput: %.2f\n" stats.Statistics.throughput;
   Printf.printf "Deadline misses: %d\n" stats.Statistics.deadline_misses;
+  Printf.printf "Tempo médio de resposta: %.2f\n" stats.Statistics.avg_response_time;
+  let print_percentiles name (p : Statistics.percentiles) =
+    Printf.printf "  %-11s p50 %.1f | p95 %.1f | p99 %.1f\n" name p.p50 p.p95 p.p99
+  in
+  let print_latency (l : Statistics.latency) =
+    print_percentiles "Espera:" l.waiting;
+    print_percentiles "Resposta:" l.response;
+    print_percentiles "Turnaround:" l.turnaround
+  in
+  Printf.printf "Percentis (todos os processos):\n";
+  print_latency stats.Statistics.latency;
+  List.iter (fun (priority, (c : Statistics.priority_stats)) ->
+    Printf.printf "Percentis (prioridade %d, %d terminados):\n" priority c.completed;
+    print_latency c.class_latency
+  ) stats.Statistics.by_priority;
   Printf.printf "\n--- Timeline ---\n%s\n" timeline_str;
   Printf.printf "\n--- Processos Gerados ---\n";
   List.iter (fun (id, arrival_time, burst_time, priority) ->
@@ -108,153 +269,731 @@ let print_human_readable algo filename tempo_final stats timeline_str processos_
       id arrival_time burst_time priority
   ) processos_tuplos
 
-(* --- Função principal que executa a simulação e imprime o resultado em JSON ou formato humano --- *)
-let run_and_output () =
+(* --- Construção dos processos a partir dos tuplos (id, chegada, burst, prioridade/período) --- *)
+let processes_of_tuples (is_realtime : bool) (tuplos : (int * int * int * int) list) : Process.t list =
+  if is_realtime then
+    List.map (fun (id, arrival_time, burst_time, period) ->
+      Process.create
+        ~id
+        ~arrival_time
+        ~burst_time
+        ~priority:id  (* Guarda o ID original no campo priority *)
+        ?period:(Some period)
+        ?deadline:(Some (arrival_time + period))
+        ()
+    ) tuplos
+  else
+    List.map (fun (id, arrival_time, burst_time, priority) ->
+      Process.create ~id ~arrival_time ~burst_time ~priority ()
+    ) tuplos
+
+(* --- Geração aleatória dos tuplos consoante o tipo de algoritmo e a distribuição do burst --- *)
+let generate_tuples ?st (is_realtime : bool) (exp : bool) (n : int) : (int * int * int * int) list =
+  match is_realtime, exp with
+  | true, true -> Process_generator.generate_processes_rt_exp ?st n
+  | true, false -> Process_generator.generate_processes_rt ?st n
+  | false, true -> Process_generator.generate_processes_exp ?st n
+  | false, false -> Process_generator.generate_processes ?st n
+
+(* --- Construção dos processos diretamente a partir das colunas da carga lida do ficheiro ---
+   Só para rm/edf, em que cada linha é uma tarefa periódica; as outras políticas
+   correm sobre as colunas (Scheduler.run_workload) sem construir esta lista *)
+let processes_of_workload (is_realtime : bool) (w : Workload.t) : Process.t list =
+  List.init (Workload.length w) (fun i ->
+    let id = Workload.id w i in
+    let arrival_time = Workload.arrival w i in
+    let burst_time = Workload.burst w i in
+    if is_realtime then
+      let period = Workload.param w i in
+      Process.create ~id ~arrival_time ~burst_time ~priority:id
+        ?period:(Some period) ?deadline:(Some (arrival_time + period)) ()
+    else
+      Process.create ~id ~arrival_time ~burst_time ~priority:(Workload.param w i) ())
+
+(* --- Leitura de um ficheiro de processos (CSV ou binário) ---
+   As cargas lidas ficam em cache (invalidada pela data de modificação e pelo
+   tamanho), para que os pedidos do --serve sobre o mesmo ficheiro não o voltem a ler *)
+let workload_cache : (string, float * int * Workload.t) Hashtbl.t = Hashtbl.create 8
+
+let read_workload (filename : string) : Workload.t =
   try
-    (* Validação dos argumentos obrigatórios *)
-    if !algo_ref = "" then failwith "Algorithm (--algo) is required.";
-    if !num_ref = None && !file_ref = "" then failwith "É necessário --file ou --gen.";
-    if !algo_ref = "rr" && !quantum_ref = None then failwith "Quantum (--quantum) is required for Round Robin (rr).";
-    let algo = !algo_ref in
-    let filename = !file_ref in
-    let quantum = !quantum_ref in
-    let max_time = !max_time_ref in
-
-    let is_realtime = match algo with "rm" | "edf" -> true | _ -> false in
-    if is_realtime && max_time = None then failwith "Max simulation time (--max) is required for rm/edf.";
-
-    (* Geração ou leitura dos processos *)
-    let (processos_tuplos, processos_iniciais) =
-      match !num_ref with
-      | Some n ->
-          if is_realtime then
-            let tuplos =
-              if !exp_ref then
-                Process_generator.generate_processes_rt_exp n
-              else
-                Process_generator.generate_processes_rt n
-            in
-            let processos =
-              List.map (fun (id, arrival_time, burst_time, period) ->
-                Process.create
-                  ~id
-                  ~arrival_time
-                  ~burst_time
-                  ~priority:id  (* Guarda o ID original no campo priority *)
-                  ?period:(Some period)
-                  ?deadline:(Some (arrival_time + period))
-                  ()
-              ) tuplos
-            in
-            (tuplos, processos)
-          else
-            let tuplos =
-              if !exp_ref then
-                Process_generator.generate_processes_exp n
-              else
-                Process_generator.generate_processes n
-            in
-            let processos =
-              List.map (fun (id, arrival_time, burst_time, priority) ->
-                Process.create
-                  ~id
-                  ~arrival_time
-                  ~burst_time
-                  ~priority
-                  ()
-              ) tuplos
-            in
-            (tuplos, processos)
-      | None ->
-          let tuplos = [] in
-          let processos =
-            if !file_ref = "" then failwith "É necessário --file ou --num."
-            else
-              if is_realtime then
-                Help.ler_ficheiro_dados_processos_rt filename
-                |> List.map (fun (id, inicio, burst, periodo) ->
-                     Process.create ~id ~arrival_time:inicio ~burst_time:burst ~priority:id
-                       ?period:(Some periodo) ?deadline:(Some (inicio + periodo)) ())
-              else
-                Help.ler_ficheiro_dados_processos filename
-                |> List.map (fun (id, inicio, burst, prioridade) ->
-                     Process.create ~id ~arrival_time:inicio ~burst_time:burst ~priority:prioridade ())
-          in
-          (tuplos, processos)
-    in
+    let st = Unix.stat filename in
+    match Hashtbl.find_opt workload_cache filename with
+    | Some (mtime, size, w) when mtime = st.Unix.st_mtime && size = st.Unix.st_size -> w
+    | _ ->
+        let w = Workload.load filename in
+        if Hashtbl.length workload_cache >= 8 then Hashtbl.reset workload_cache;
+        Hashtbl.replace workload_cache filename (st.Unix.st_mtime, st.Unix.st_size, w);
+        w
+  with
+  | Sys_error msg -> failwith ("Erro ao abrir ou ler o ficheiro '" ^ filename ^ "': " ^ msg)
+  | Unix.Unix_error (err, _, _) ->
+      failwith ("Erro ao abrir ou ler o ficheiro '" ^ filename ^ "': " ^ Unix.error_message err)
+
+let is_realtime_algo algo = match algo with "rm" | "edf" -> true | _ -> false
+
+(* --- Executa o algoritmo escolhido sobre os processos do contexto ---
+   Devolve (tempo_final, log); no caso de rm/edf as instâncias periódicas são
+   libertadas à medida que a simulação avança e, com listeners (estatísticas,
+   segmentos), os hiperperíodos repetidos são extrapolados em vez de simulados.
+   Com ?sink os eventos vão para o sink e o log devolvido fica vazio.
+   Com ?workload as políticas não periódicas correm sobre as colunas da carga lida
+   do ficheiro, em vez de ctx.processes.
+   ?checkpoints só se aplica às políticas não periódicas (ver supports_checkpoints). *)
+let simulate ?sink ?(listeners = []) ?checkpoints ?workload (ctx : Sim_context.t) algo quantum max_time =
+  let extrapolate = listeners <> [] in
+  let processos = ctx.Sim_context.processes in
+  let run policy list_engine =
+    match workload with
+    | Some w -> Scheduler.run_workload ~ctx ?sink policy w
+    | None -> list_engine ()
+  in
+  try
+    match algo with
+    | "fcfs" -> run Scheduler.Fcfs (fun () -> Scheduler.fcfs ~ctx ?sink ?checkpoints processos)
+    | "sjf" -> run Scheduler.Sjf (fun () -> Scheduler.sjf ~ctx ?sink ?checkpoints processos)
+    | "priority_np" ->
+        run Scheduler.Priority_non_preemptive
+          (fun () -> Scheduler.priority_non_preemptive ~ctx ?sink ?checkpoints processos)
+    | "priority_preemp" ->
+        run Scheduler.Priority_preemptive
+          (fun () -> Scheduler.priority_preemptive ~ctx ?sink ?checkpoints processos)
+    | "rr" -> (match quantum with
+              | Some q -> run (Scheduler.Round_robin q) (fun () -> Scheduler.round_robin ~ctx ?sink ?checkpoints ~quantum:q processos)
+              | None -> failwith "Internal error: Quantum missing for RR")
+    | "rm" -> (match max_time with
+              | Some m -> Scheduler.rate_monotonic_periodic ~ctx ?sink ~extrapolate ~listeners ~tempo_max:m processos
+              | None -> failwith "Internal error: Max time missing for RM")
+    | "edf"-> (match max_time with
+              | Some m -> Scheduler.edf_periodic ~ctx ?sink ~extrapolate ~listeners ~tempo_max:m processos
+              | None -> failwith "Internal error: Max time missing for EDF")
+    | _ -> failwith ("Algorithm '" ^ algo ^ "' not recognized or implemented.")
+  with ex -> failwith ("Error during simulation for algorithm '" ^ algo ^ "': " ^ Printexc.to_string ex)
+
+(* --- Re-simulação incremental (--serve) ---
+   A última execução de uma política não periódica guarda checkpoints do motor,
+   cada um com o estado das estatísticas e dos segmentos nesse instante. Se um
+   pedido seguinte usar a mesma política sobre uma carga alterada (ex: um processo
+   editado na GUI), a simulação retoma do último checkpoint anterior à primeira
+   chegada afetada em vez de recomeçar em t=0, com o mesmo resultado. *)
+let supports_checkpoints algo =
+  match algo with "fcfs" | "sjf" | "priority_np" | "priority_preemp" | "rr" -> true | _ -> false
+
+let checkpoints_per_run = 64
+
+type saved_checkpoint = {
+  engine : Checkpoint.t;
+  stats : Statistics.collector_state;
+  segments : segment_state;
+}
+
+type last_run = {
+  run_key : string * int option;       (* algoritmo e quantum *)
+  workload : Process.t list;           (* processos da execução, antes de simular *)
+  saved : saved_checkpoint list;       (* do mais recente para o mais antigo *)
+}
+
+let last_run = ref (None : last_run option)
+
+(* --- Erros: um objeto JSON com success=false e código de saída 1 --- *)
+let error_json msg = `Assoc [("success", `Bool false); ("error", `String msg)]
+
+let print_error_and_exit msg =
+  print_endline (Yojson.Basic.to_string (error_json msg));
+  exit 1
+
+(* --- Resultado de --analyze --- *)
+let analysis_to_json (r : Schedulability.report) : t =
+  let verdict v = `String (Schedulability.string_of_verdict v) in
+  `Assoc ([
+    ("verdict", verdict r.verdict);
+    ("utilization", `Float r.utilization);
+  ] @ (match r.liu_layland_bound with
+       | Some b -> [("liu_layland_bound", `Float b)]
+       | None -> []) @ [
+    ("tests", `List (List.map (fun (name, v) ->
+        `Assoc [("test", `String name); ("verdict", verdict v)]) r.tests));
+    ("tasks", `List (List.map (fun (tr : Schedulability.task_result) ->
+        `Assoc [
+          ("id", `Int tr.task.task_id);
+          ("wcet", `Int tr.task.wcet);
+          ("period", `Int tr.task.period);
+          ("deadline", `Int tr.task.deadline);
+          ("response_time", match tr.response_time with Some rt -> `Int rt | None -> `Null);
+        ]) r.tasks));
+  ])
+
+(* Campos a juntar aos resultados: a análise e se foi preciso simular *)
+let analysis_fields ?(simulated = true) (analysis : Schedulability.report option) : (string * t) list =
+  match analysis with
+  | Some r -> [("analysis", analysis_to_json r); ("simulated", `Bool simulated)]
+  | None -> []
+
+let print_analysis (r : Schedulability.report) =
+  Printf.printf "--- Análise de escalonabilidade ---\n";
+  Printf.printf "Veredicto: %s\n" (Schedulability.string_of_verdict r.verdict);
+  Printf.printf "Utilização: %.4f\n" r.utilization;
+  Option.iter (Printf.printf "Limite de Liu & Layland: %.4f\n") r.liu_layland_bound;
+  List.iter (fun (name, v) ->
+    Printf.printf "  %-17s %s\n" name (Schedulability.string_of_verdict v)) r.tests;
+  List.iter (fun (tr : Schedulability.task_result) ->
+    Printf.printf "  P%d: C=%d T=%d D=%d R=%s\n" tr.task.task_id tr.task.wcet tr.task.period tr.task.deadline
+      (match tr.response_time with Some rt -> string_of_int rt | None -> "-")) r.tasks;
+  print_newline ()
+
+(* Análise conclusiva: imprime só a análise, sem simular *)
+let print_analysis_only ~output algo filename seed (r : Schedulability.report) =
+  if !human_ref then begin
+    Printf.printf "Algoritmo: %s\n" algo;
+    if filename <> "" then Printf.printf "Ficheiro: %s\n" filename;
+    Printf.printf "Semente: %d\n\n" seed;
+    print_analysis r
+  end else
+    output (`Assoc [
+      ("success", `Bool true);
+      ("results", `Assoc ([
+          ("algorithm", `String algo);
+          ("file", `String filename);
+          ("seed", `Int seed);
+        ] @ analysis_fields ~simulated:false (Some r)));
+    ])
+
+(* --- Profile ---
+   Tempos por fase (relógio monotónico), GC desde o início da execução e contadores
+   do motor. ticks_simulated exclui o intervalo extrapolado por --extrapolate e o
+   que veio de um checkpoint (resumed_at: instante de onde a simulação retomou). *)
+let profile_counters ?(resumed_at = 0) (ctx : Sim_context.t) (ticks_simulated : int) : (string * int) list =
+  let c = ctx.Sim_context.counters in
+  [
+    ("queue_pushes", c.queue_pushes);
+    ("queue_pops", c.queue_pops);
+    ("preemptions", c.preemptions);
+    ("context_switches", c.context_switches);
+    ("events", c.events);
+    ("ticks_simulated", ticks_simulated);
+    ("resumed_at", resumed_at);
+  ]
+
+let profile_to_json (p : Profile.t) (counters : (string * int) list) : t =
+  `Assoc [
+    ("phases_ms", `Assoc (List.map (fun (name, ms) -> (name, `Float ms)) (Profile.phases_ms p)));
+    ("total_ms", `Float (Profile.total_ms p));
+    ("gc", `Assoc (List.map (fun (name, v) -> (name, `Float v)) (Profile.gc_counters p)));
+    ("engine", `Assoc (List.map (fun (name, v) -> (name, `Int v)) counters));
+  ]
+
+let print_profile (p : Profile.t) (counters : (string * int) list) =
+  Printf.printf "\n--- Profile (%.3f ms) ---\n" (Profile.total_ms p);
+  List.iter (fun (name, ms) -> Printf.printf "%-16s %12.3f ms\n" name ms) (Profile.phases_ms p);
+  List.iter (fun (name, v) -> Printf.printf "%-16s %12.0f\n" name v) (Profile.gc_counters p);
+  List.iter (fun (name, v) -> Printf.printf "%-16s %12d\n" name v) counters
+
+(* Acrescenta um campo no fim de um objeto JSON (o "profile", depois de medido o
+   resto do output, e o id das respostas do --serve) *)
+let with_field (json : t) (name : string) (value : t) : t =
+  match json with
+  | `Assoc fields -> `Assoc (fields @ [(name, value)])
+  | other -> other
+
+(* --- Progresso: sink que passa a report o tempo simulado, no máximo a cada
+   progress_interval_ns. O relógio só é lido a cada 4096 eventos. *)
+let progress_interval_ns = 200_000_000L
+
+let progress_sink (report : int -> unit) : Scheduler.sink =
+  let count = ref 0 in
+  let last = ref (Profile.monotonic_ns ()) in
+  fun ev ->
+    incr count;
+    if !count land 4095 = 0 then begin
+      let now = Profile.monotonic_ns () in
+      if Int64.sub now !last >= progress_interval_ns then begin
+        last := now;
+        report ev.Scheduler.time
+      end
+    end
+
+(* --- Escritor de eventos pedido com --events: devolve os sinks e a função que fecha o ficheiro --- *)
+let open_event_writer () =
+  if !events_ref = "" then ([], fun () -> ())
+  else
+    let oc = open_out_bin !events_ref in
+    let writer = if !events_format_ref = "binary" then Event_sink.binary oc else Event_sink.ndjson oc in
+    ([writer], fun () -> close_out oc)
+
+(* --- Função principal que executa a simulação e imprime o resultado em JSON ou formato humano ---
+   O JSON é entregue a output, que o serializa; os erros são lançados como Failure.
+   Com ?progress, o tempo simulado vai sendo passado a progress durante a simulação. *)
+let run_single ?progress ~(output : t -> unit) () =
+  (* Validação dos argumentos obrigatórios *)
+  if !algo_ref = "" then failwith "Algorithm (--algo) is required.";
+  if !num_ref = None && !file_ref = "" && !inline_ref = None then failwith "É necessário --file ou --gen.";
+  if !algo_ref = "rr" && !quantum_ref = None then failwith "Quantum (--quantum) is required for Round Robin (rr).";
+  let algo = !algo_ref in
+  let filename = !file_ref in
+  let quantum = !quantum_ref in
+  let max_time = !max_time_ref in
+
+  let is_realtime = is_realtime_algo algo in
+  if is_realtime && max_time = None && not !analyze_ref then
+    failwith "Max simulation time (--max) is required for rm/edf.";
+
+  (* Com --profile cada fase é medida; sem ele phase só corre a função *)
+  let profile = if !profile_ref then Some (Profile.create ()) else None in
+  let phase name f = match profile with Some p -> Profile.time p name f | None -> f () in
+
+  (* Geração ou leitura dos processos *)
+  let seed = match !seed_ref with Some s -> s | None -> Random_distributions.fresh_seed () in
+  let rng = Random_distributions.stream ~seed [] in
+  (* Os ficheiros das políticas não periódicas ficam em colunas (workload): os
+     processos só são criados à medida que a simulação os admite *)
+  let (processos_tuplos, processos_iniciais, workload) =
+    phase "load" @@ fun () ->
+    match !inline_ref, !num_ref with
+    | Some tuplos, _ ->
+        (* processos do pedido (--serve): o cliente já os tem, não voltam na resposta;
+           tal como nos ficheiros (Workload), os ids têm de ser únicos *)
+        let processos = processes_of_tuples is_realtime tuplos in
+        if not (Checkpoint.unique_ids processos) then failwith "ID de processo repetido no pedido.";
+        ([], processos, None)
+    | None, Some n ->
+        let tuplos = generate_tuples ~st:rng is_realtime !exp_ref n in
+        (tuplos, processes_of_tuples is_realtime tuplos, None)
+    | None, None ->
+        if !file_ref = "" then failwith "É necessário --file ou --num.";
+        let w = read_workload filename in
+        if is_realtime then ([], processes_of_workload is_realtime w, None)
+        else ([], [], Some w)
+  in
+
+  let empty =
+    match workload with
+    | Some w -> Workload.length w = 0
+    | None -> processos_iniciais = []
+  in
+  if empty then failwith ("No valid processes loaded from file '" ^ filename ^ "'.");
+
+  (* --analyze: primeiro os testes analíticos; só se simula se forem inconclusivos *)
+  let analysis =
+    if not !analyze_ref then None
+    else match phase "analysis" (fun () -> Schedulability.analyze algo processos_iniciais) with
+      | Some report -> Some report
+      | None -> failwith "--analyze só se aplica a rm/edf com tarefas periódicas."
+  in
+  match analysis with
+  | Some report when report.verdict <> Schedulability.Inconclusive ->
+      print_analysis_only ~output algo filename seed report
+  | _ ->
+  if is_realtime && max_time = None then
+    failwith "A análise de escalonabilidade foi inconclusiva: indique --max para simular.";
+
+  (* Execução da simulação consoante o algoritmo escolhido *)
+  let ctx = phase "setup" (fun () -> Sim_context.create ~rng processos_iniciais) in
+  (* Os eventos não são guardados: vão diretamente para as estatísticas,
+     para os segmentos da timeline e, se pedido, para o ficheiro de eventos *)
+  let stats_collector = Statistics.create_collector ~ctx () in
+  let segments_collector = segment_collector ~ctx () in
+  let event_writers, close_events = open_event_writer () in
+  let progress_sinks = match progress with Some report -> [progress_sink report] | None -> [] in
+  let sink =
+    Event_sink.tee (Statistics.observe stats_collector :: segments_collector.observe :: progress_sinks @ event_writers)
+  in
+  (* Checkpoints só no --serve, onde o pedido seguinte os pode aproveitar, e com a
+     lista de processos (a carga do pedido ou gerada) para comparar com a seguinte *)
+  let run_key = (algo, quantum) in
+  let incremental =
+    !serve_ref && supports_checkpoints algo && !events_ref = "" && Option.is_none workload
+    && phase "setup" (fun () -> Checkpoint.unique_ids processos_iniciais)
+  in
+  let resume =
+    match !last_run with
+    | Some last when incremental && last.run_key = run_key ->
+        let change = phase "setup" (fun () -> Checkpoint.earliest_change last.workload processos_iniciais) in
+        List.find_opt (fun s -> s.engine.Checkpoint.time < change) last.saved
+    | _ -> None
+  in
+  (* ao retomar, as estatísticas e os segmentos voltam ao estado do checkpoint e os
+     checkpoints anteriores continuam válidos para a nova carga *)
+  let saved =
+    match resume, !last_run with
+    | Some from, Some last ->
+        Statistics.restore_collector stats_collector from.stats;
+        segments_collector.restore from.segments;
+        ref (List.filter (fun s -> s.engine.Checkpoint.time <= from.engine.Checkpoint.time) last.saved)
+    | _ -> ref []
+  in
+  let checkpoints =
+    if not incremental then None
+    else Some {
+      Checkpoint.every = Checkpoint.interval ~count:checkpoints_per_run processos_iniciais;
+      save = (fun engine ->
+        saved := { engine; stats = Statistics.save_collector stats_collector;
+                   segments = segments_collector.save () } :: !saved);
+      resume = Option.map (fun s -> s.engine) resume;
+    }
+  in
+  (* intervalo extrapolado, se o motor periódico saltou hiperperíodos *)
+  let extrapolated = ref None in
+  let listeners =
+    if !extrapolate_ref then [
+      Statistics.hyperperiod_listener stats_collector;
+      { Scheduler.on_boundary = ignore;
+        on_skip = (fun info ->
+          segments_collector.skip info;
+          extrapolated := Some (info.skip_from, info.skip_from + (info.repeats * info.hyperperiod))) };
+    ] else []
+  in
+  let simulation_result =
+    Some (phase "simulation" (fun () ->
+      Fun.protect ~finally:close_events (fun () ->
+        simulate ~sink ~listeners ?checkpoints ?workload ctx algo quantum max_time)))
+  in
+  if incremental then last_run := Some { run_key; workload = processos_iniciais; saved = !saved };
+
+  (* Impressão do resultado no formato escolhido *)
+  match simulation_result with
+  | None -> failwith "Simulation failed to produce results."
+  | Some (tempo_final, _) ->
+      let stats = phase "statistics" (fun () -> Statistics.finish stats_collector tempo_final) in
+      let segments = phase "timeline" (fun () -> segments_collector.finish tempo_final) in
+      let extrapolated_field =
+        match !extrapolated with
+        | Some (inicio, fim) -> [("extrapolated", `List [`Int inicio; `Int fim])]
+        | None -> []
+      in
+      let counters () =
+        let skipped = match !extrapolated with Some (inicio, fim) -> fim - inicio | None -> 0 in
+        let resumed_at = match resume with Some s -> s.engine.Checkpoint.time | None -> 0 in
+        profile_counters ~resumed_at ctx (tempo_final - skipped - resumed_at)
+      in
+
+      if !human_ref then begin
+        let timeline_str =
+          phase "timeline" (fun () ->
+            if !timeline_string_ref then timeline_string_of_segments segments tempo_final
+            else format_segments segments)
+        in
+        Option.iter print_analysis analysis;
+        print_human_readable algo filename seed tempo_final stats timeline_str processos_tuplos;
+        Option.iter (fun (inicio, fim) ->
+          Printf.printf "Hiperperíodos extrapolados: %d-%d (fora da timeline)\n" inicio fim
+        ) !extrapolated;
+        Option.iter (fun p -> print_profile p (counters ())) profile
+      end else
+        let timeline_field =
+          if !timeline_string_ref then
+            phase "timeline" (fun () ->
+              [("timeline_string", `String (timeline_string_of_segments segments tempo_final))])
+          else []
+        in
+        let json_output =
+          phase "json" @@ fun () ->
+          `Assoc [
+            ("success", `Bool true);
+            ("results", `Assoc ([
+                ("algorithm", `String algo);
+                ("file", `String filename);
+                ("seed", `Int seed);
+                ("final_time", `Int tempo_final);
+                ("stats", stats_to_json stats);
+                ("segments",
+                  `List (List.map (fun (pid, inicio, fim) ->
+                    `List [`Int pid; `Int inicio; `Int fim]) segments));
+              ] @ analysis_fields analysis @ extrapolated_field @ timeline_field @ [
+                ("processes_generated",
+                  `List (List.map (fun (id, arrival_time, burst_time, priority) ->
+                    `List [
+                      `Int id;
+                      `Int arrival_time;
+                      `Int burst_time;
+                      `Int priority
+                    ]) processos_tuplos)
+                )
+              ]))
+          ]
+        in
+        output
+          (match profile with
+           | Some p -> with_field json_output "profile" (profile_to_json p (counters ()))
+           | None -> json_output)
 
-    if processos_iniciais = [] then failwith ("No valid processes loaded from file '" ^ filename ^ "'.");
-
-    (* Execução da simulação consoante o algoritmo escolhido *)
-    let simulation_result, processos_para_stats =
-      try
-        match algo with
-        | "fcfs" -> (Some (Scheduler.fcfs processos_iniciais), processos_iniciais)
-        | "sjf" -> (Some (Scheduler.sjf processos_iniciais), processos_iniciais)
-        | "priority_np" -> (Some (Scheduler.priority_non_preemptive processos_iniciais), processos_iniciais)
-        | "priority_preemp" -> (Some (Scheduler.priority_preemptive processos_iniciais), processos_iniciais)
-        | "rr" -> (match quantum with
-                  | Some q -> (Some (Scheduler.round_robin ~quantum:q processos_iniciais), processos_iniciais)
-                  | None -> failwith "Internal error: Quantum missing for RR")
-        | "rm" -> (match max_time with
-                  | Some m ->
-                      let insts = Scheduler.gerar_instancias_periodicas processos_iniciais m in
-                      (Some (Scheduler.rate_monotonic ~tempo_max:m insts), insts)
-                  | None -> failwith "Internal error: Max time missing for RM")
-        | "edf"-> (match max_time with
-                  | Some m ->
-                      let insts = Scheduler.gerar_instancias_periodicas processos_iniciais m in
-                      (Some (Scheduler.edf ~tempo_max:m insts), insts)
-                  | None -> failwith "Internal error: Max time missing for EDF")
-        | _ -> failwith ("Algorithm '" ^ algo ^ "' not recognized or implemented."), processos_iniciais
-      with ex -> failwith ("Error during simulation for algorithm '" ^ algo ^ "': " ^ Printexc.to_string ex), processos_iniciais
+let run_and_output () =
+  try run_single ~output:(fun json -> print_endline (Yojson.Basic.to_string json)) ()
+  with
+  | Failure msg -> print_error_and_exit msg
+  | ex -> print_error_and_exit ("Erro inesperado: " ^ Printexc.to_string ex)
+
+(* --- Modo --serve ---
+   Um pedido por linha (objeto JSON) e uma resposta por linha, com o mesmo formato
+   do output normal em JSON e o "id" do pedido, se vier. Cada pedido parte dos
+   valores dados na linha de comando; um erro num pedido só afeta a sua resposta. *)
+
+(* Guarda as opções da linha de comando; a função devolvida repõe-nas *)
+let save_options () =
+  let algo = !algo_ref and file = !file_ref and quantum = !quantum_ref
+  and max_time = !max_time_ref and num = !num_ref and exp = !exp_ref
+  and timeline_string = !timeline_string_ref and seed = !seed_ref
+  and extrapolate = !extrapolate_ref and analyze = !analyze_ref and profile = !profile_ref in
+  fun () ->
+    algo_ref := algo; file_ref := file; quantum_ref := quantum;
+    max_time_ref := max_time; num_ref := num; exp_ref := exp;
+    timeline_string_ref := timeline_string; seed_ref := seed;
+    extrapolate_ref := extrapolate; analyze_ref := analyze; profile_ref := profile;
+    inline_ref := None; progress_ref := false;
+    (* as respostas são sempre JSON e os eventos não vão para ficheiro *)
+    human_ref := false;
+    events_ref := ""
+
+(* Processo inline: [id, chegada, burst, prioridade/período] *)
+let tuple_of_json (row : t) =
+  match row with
+  | `List [`Int id; `Int arrival_time; `Int burst_time; `Int param] -> (id, arrival_time, burst_time, param)
+  | _ -> failwith ("Processo inválido no pedido (esperava [id, chegada, burst, prioridade/período]): "
+                   ^ Yojson.Basic.to_string row)
+
+(* Passa os campos de um pedido para as opções *)
+let apply_request (fields : (string * t) list) =
+  let opt_int name = function
+    | `Int v -> Some v
+    | `Null -> None
+    | _ -> failwith ("O campo '" ^ name ^ "' tem de ser um inteiro.")
+  in
+  let bool name = function
+    | `Bool b -> b
+    | _ -> failwith ("O campo '" ^ name ^ "' tem de ser true ou false.")
+  in
+  List.iter (fun (name, v) ->
+    match name, v with
+    | "id", _ -> ()
+    | "algo", `String a -> algo_ref := a
+    | "file", `String f -> file_ref := f
+    | "processes", `List rows -> inline_ref := Some (List.map tuple_of_json rows)
+    | "quantum", _ -> quantum_ref := opt_int name v
+    | "max", _ -> max_time_ref := opt_int name v
+    | "seed", _ -> seed_ref := opt_int name v
+    | "gen", _ -> num_ref := opt_int name v
+    | "exp", _ -> exp_ref := bool name v
+    | "timeline_string", _ -> timeline_string_ref := bool name v
+    | "extrapolate", _ -> extrapolate_ref := bool name v
+    | "analyze", _ -> analyze_ref := bool name v
+    | "profile", _ -> profile_ref := bool name v
+    | "progress", _ -> progress_ref := bool name v
+    | _ -> failwith ("Campo inválido no pedido: '" ^ name ^ "'.")
+  ) fields
+
+let run_serve () =
+  let restore = save_options () in
+  let respond id json =
+    print_endline (Yojson.Basic.to_string (match id with `Null -> json | _ -> with_field json "id" id));
+    flush stdout
+  in
+  let rec loop () =
+    match In_channel.input_line stdin with
+    | None -> ()
+    | Some line when String.trim line = "" -> loop ()
+    | Some line ->
+        let id = ref `Null in
+        (try
+           let fields =
+             match Yojson.Basic.from_string line with
+             | `Assoc fields -> fields
+             | _ -> failwith "O pedido tem de ser um objeto JSON."
+           in
+           id := Option.value ~default:`Null (List.assoc_opt "id" fields);
+           restore ();
+           apply_request fields;
+           let progress =
+             if !progress_ref then
+               Some (fun t -> respond !id (`Assoc [("progress", `Int t)]))
+             else None
+           in
+           run_single ?progress ~output:(respond !id) ()
+         with
+         | Failure msg -> respond !id (error_json msg)
+         | Yojson.Json_error msg -> respond !id (error_json ("Pedido JSON inválido: " ^ msg))
+         | ex -> respond !id (error_json ("Erro inesperado: " ^ Printexc.to_string ex)));
+        loop ()
+  in
+  loop ()
+
+(* --- Modo sweep ---
+   Corre a grelha algoritmos x quanta x max x geração x repetições dentro do mesmo
+   processo e escreve uma linha de estatísticas por execução (CSV ou NDJSON),
+   sem construir timeline nem segmentos. *)
+let sweep_mode () = !reps_ref > 0 || !algos_ref <> []
+
+let csv_header =
+  "algorithm,run,quantum,max,gen,dist,seed,total_simulation_time,total_processes_completed," ^
+  "avg_waiting_time,avg_turnaround_time,cpu_utilization,throughput,deadline_misses," ^
+  "avg_response_time,waiting_p50,waiting_p95,waiting_p99,response_p50,response_p95,response_p99," ^
+  "turnaround_p50,turnaround_p95,turnaround_p99"
+
+(* Floats escritos como no JSON (representação curta que faz round-trip) *)
+let float_str f = Yojson.Basic.to_string (`Float f)
+
+(* Uma execução do modo sweep: uma combinação de parâmetros e o número da repetição *)
+type sweep_job = {
+  job_algo : string;
+  job_run : int;
+  job_quantum : int option;
+  job_max : int option;
+  job_gen : int option;   (* None = processos lidos de --file *)
+  job_dist : string;
+  job_key : int list;     (* chave da stream aleatória desta execução (ver Random_distributions.stream) *)
+}
+
+let print_sweep_row seed job (stats : Statistics.simulation_stats) =
+  let opt_int = function Some v -> string_of_int v | None -> "" in
+  if !format_ref = "ndjson" then
+    let opt_json = function Some v -> `Int v | None -> `Null in
+    print_endline (Yojson.Basic.to_string (`Assoc [
+      ("algorithm", `String job.job_algo);
+      ("run", `Int job.job_run);
+      ("quantum", opt_json job.job_quantum);
+      ("max", opt_json job.job_max);
+      ("gen", opt_json job.job_gen);
+      ("dist", `String job.job_dist);
+      ("seed", `Int seed);
+      ("stats", stats_to_json stats);
+    ]))
+  else
+    let pcts (p : Statistics.percentiles) =
+      String.concat "," (List.map float_str [p.p50; p.p95; p.p99])
     in
+    Printf.printf "%s,%d,%s,%s,%s,%s,%d,%d,%d,%s,%s,%s,%s,%d,%s,%s,%s,%s\n"
+      job.job_algo job.job_run (opt_int job.job_quantum) (opt_int job.job_max)
+      (opt_int job.job_gen) job.job_dist seed
+      stats.total_simulation_time stats.total_processes_completed
+      (float_str stats.avg_waiting_time) (float_str stats.avg_turnaround_time)
+      (float_str stats.cpu_utilization) (float_str stats.throughput)
+      stats.deadline_misses (float_str stats.avg_response_time)
+      (pcts stats.latency.waiting) (pcts stats.latency.response) (pcts stats.latency.turnaround)
+
+(* Corre uma execução com o seu próprio contexto e gerador de aleatórios.
+   Não toca em estado global, por isso pode correr em qualquer domínio. *)
+let run_sweep_job seed file_workload job : Statistics.simulation_stats =
+  let is_realtime = is_realtime_algo job.job_algo in
+  let rng = Random_distributions.stream ~seed job.job_key in
+  let processos, workload =
+    match job.job_gen with
+    | Some n -> (processes_of_tuples is_realtime (generate_tuples ~st:rng is_realtime (job.job_dist = "exp") n), None)
+    | None ->
+        let w = Lazy.force file_workload in
+        if Workload.length w = 0 then failwith ("No valid processes loaded from file '" ^ !file_ref ^ "'.");
+        if is_realtime then (processes_of_workload is_realtime w, None) else ([], Some w)
+  in
+  let ctx = Sim_context.create ~rng processos in
+  if processos = [] && Option.is_none workload then failwith ("No valid processes loaded from file '" ^ !file_ref ^ "'.");
+  (* só as estatísticas consomem os eventos: nenhum log é guardado; como não há
+     timeline, rm/edf extrapolam sempre os hiperperíodos repetidos (resultado igual) *)
+  let collector = Statistics.create_collector ~ctx () in
+  let tempo_final, _ =
+    simulate ~sink:(Statistics.observe collector) ~listeners:[Statistics.hyperperiod_listener collector]
+      ?workload ctx job.job_algo job.job_quantum job.job_max
+  in
+  Statistics.finish collector tempo_final
 
-    (* Impressão do resultado no formato escolhido *)
-    match simulation_result with
-    | None -> failwith "Simulation failed to produce results."
-    | Some (tempo_final, log_eventos) ->
-        let stats = Statistics.calculate_statistics processos_para_stats tempo_final log_eventos in
-        let timeline_str = format_timeline_string log_eventos tempo_final in
-
-        if !human_ref then
-          print_human_readable algo filename tempo_final stats timeline_str processos_tuplos
-        else
-          let json_output =
-            `Assoc [
-              ("success", `Bool true);
-              ("results", `Assoc [
-                  ("algorithm", `String algo);
-                  ("file", `String filename);
-                  ("final_time", `Int tempo_final);
-                  ("stats", stats_to_json stats);
-                  ("timeline_string", `String timeline_str);
-                  ("processes_generated",
-                    `List (List.map (fun (id, arrival_time, burst_time, priority) ->
-                      `List [
-                        `Int id;
-                        `Int arrival_time;
-                        `Int burst_time;
-                        `Int priority
-                      ]) processos_tuplos)
-                  )
-                ])
-            ]
-          in
-          print_endline (Yojson.Basic.to_string json_output)
+let run_sweep () =
+  try
+    let algos =
+      if !algos_ref <> [] then !algos_ref
+      else if !algo_ref <> "" then [!algo_ref]
+      else failwith "É necessário --algos ou --algo."
+    in
+    let quanta = if !quanta_ref <> [] then !quanta_ref else Option.to_list !quantum_ref in
+    let maxes = if !maxes_ref <> [] then !maxes_ref else Option.to_list !max_time_ref in
+    (* None = processos lidos de --file *)
+    let gens =
+      if !gens_ref <> [] then List.map Option.some !gens_ref
+      else match !num_ref with
+        | Some n -> [Some n]
+        | None when !file_ref <> "" -> [None]
+        | None -> failwith "É necessário --file, --gen ou --gens."
+    in
+    let dists = if !dists_ref <> [] then !dists_ref else [if !exp_ref then "exp" else "normal"] in
+    List.iter (fun d ->
+      if d <> "normal" && d <> "exp" then failwith ("Distribuição desconhecida: " ^ d)
+    ) dists;
+    let reps = max 1 !reps_ref in
+    let seed = match !seed_ref with Some s -> s | None -> Random_distributions.fresh_seed () in
+    (* Chave da stream de cada execução. Com --crn só depende da repetição e da carga
+       (nº de processos e distribuição), por isso todos os algoritmos, quanta e max
+       da mesma repetição recebem exatamente os mesmos processos. *)
+    let stream_key algo_index run quantum max_time gen dist =
+      let opt = Option.value ~default:0 in
+      let workload = [run; opt gen; (if dist = "exp" then 1 else 0)] in
+      if !crn_ref then workload
+      else workload @ [algo_index; opt quantum; opt max_time]
+    in
+    (* Lista de execuções, pela mesma ordem em que as linhas são escritas *)
+    let jobs =
+      List.concat (List.mapi (fun algo_index algo ->
+        let quanta_algo =
+          if algo <> "rr" then [None]
+          else if quanta = [] then failwith "Quantum (--quantum ou --quanta) is required for Round Robin (rr)."
+          else List.map Option.some quanta
+        in
+        let maxes_algo =
+          if not (is_realtime_algo algo) then [None]
+          else if maxes = [] then failwith "Max simulation time (--max ou --maxes) is required for rm/edf."
+          else List.map Option.some maxes
+        in
+        List.concat_map (fun gen ->
+          let dists_gen = match gen with Some _ -> dists | None -> ["file"] in
+          List.concat_map (fun dist ->
+            List.concat_map (fun quantum ->
+              List.concat_map (fun max_time ->
+                List.init reps (fun i ->
+                  { job_algo = algo; job_run = i + 1; job_quantum = quantum;
+                    job_max = max_time; job_gen = gen; job_dist = dist;
+                    job_key = stream_key algo_index (i + 1) quantum max_time gen dist })
+              ) maxes_algo
+            ) quanta_algo
+          ) dists_gen
+        ) gens
+      ) algos)
+      |> Array.of_list
+    in
+    (* O ficheiro é lido uma só vez, antes de arrancar os domínios
+       (as colunas são só lidas pelas execuções) *)
+    let file_workload = lazy (read_workload !file_ref) in
+    if List.mem None gens then ignore (Lazy.force file_workload);
+    if !format_ref = "csv" then print_endline csv_header;
+    (* Execuções em lotes: cada lote corre em paralelo e as linhas são escritas
+       pela ordem da lista, por isso o output não depende do número de domínios *)
+    let domains = !domains_ref in
+    let batch = 64 * domains in
+    let total = Array.length jobs in
+    let start = ref 0 in
+    while !start < total do
+      let base = !start in
+      let len = min batch (total - base) in
+      let stats = Parallel.init ~domains len (fun k -> run_sweep_job seed file_workload jobs.(base + k)) in
+      Array.iteri (fun k s -> print_sweep_row seed jobs.(base + k) s) stats;
+      start := base + len
+    done
+  with
+  | Failure msg -> print_error_and_exit msg
+  | ex -> print_error_and_exit ("Erro inesperado: " ^ Printexc.to_string ex)
 
+(* --- Conversão de um CSV de processos para o formato binário --- *)
+let run_convert () =
+  try
+    if !file_ref = "" then failwith "É necessário --file com o CSV a converter.";
+    let n = Workload.csv_to_binary !file_ref !convert_ref in
+    print_endline (Yojson.Basic.to_string (`Assoc [
+      ("success", `Bool true);
+      ("file", `String !file_ref);
+      ("output", `String !convert_ref);
+      ("processes", `Int n);
+    ]))
   with
-  | Failure msg ->
-      let json_error = `Assoc [("success", `Bool false); ("error", `String msg)] in
-      print_endline (Yojson.Basic.to_string json_error);
-      exit 1
-  | ex ->
-      let err_msg = "Erro inesperado: " ^ Printexc.to_string ex in
-      let json_error = `Assoc [("success", `Bool false); ("error", `String err_msg)] in
-      print_endline (Yojson.Basic.to_string json_error);
-      exit 1
+  | Failure msg -> print_error_and_exit msg
+  | Sys_error msg -> print_error_and_exit ("Erro ao abrir ou ler o ficheiro: " ^ msg)
+  | ex -> print_error_and_exit ("Erro inesperado: " ^ Printexc.to_string ex)
 
 (* --- Ponto de Entrada Principal --- *)
 let () =
   Arg.parse speclist (fun anon_arg -> raise (Arg.Bad ("Argumento inesperado: " ^ anon_arg))) usage_msg;
-  run_and_output ()
+  if !convert_ref <> "" then run_convert ()
+  else if !serve_ref then run_serve ()
+  else if sweep_mode () then run_sweep () else run_and_output ()
@@ -5,6 +5,11 @@ val usage_msg : string
 val speclist : (string * Arg.spec * string) list
 val stats_to_json :
   Prob_sched_lib.Statistics.simulation_stats -> Yojson.Basic.t
+val timeline_segments :
+  ?ctx:Prob_sched_lib.Sim_context.t ->
+  Prob_sched_lib.Scheduler.timeline_event list -> int -> (int * int * int) list
 val format_timeline_string :
+  ?ctx:Prob_sched_lib.Sim_context.t ->
   Prob_sched_lib.Scheduler.timeline_event list -> int -> string
+val format_segments : (int * int * int) list -> string
 val run_and_output : unit -> unit
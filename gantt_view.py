@@ -0,0 +1,156 @@
+# Gráfico de Gantt embebido na janela (FigureCanvasTkAgg), feito para timelines grandes.
+#
+# - Os segmentos [pid, inicio, fim] são separados por processo numa só passagem (NumPy)
+#   e cada processo é desenhado com um único broken_barh (uma coleção, não uma barra
+#   por segmento).
+# - Nível de detalhe: só se desenha o que está visível e, quando há mais segmentos do
+#   que píxeis, os segmentos separados por menos de um píxel são juntados. Ao fazer
+#   zoom ou pan (barra de ferramentas do matplotlib) o desenho é refeito para a nova
+#   janela, por isso o detalhe volta a aparecer.
+# - As etiquetas "inicio-fim" só aparecem em barras com pelo menos LABEL_MIN_PX píxeis.
+# - Só se desenham as linhas (processos) visíveis, por isso milhares de processos
+#   também não pesam.
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+# Largura mínima (píxeis) de uma barra para levar etiqueta, e máximo de etiquetas por desenho
+LABEL_MIN_PX = 40
+MAX_LABELS = 300
+# Atraso (ms) antes de redesenhar depois de um zoom/pan, para juntar eventos seguidos
+REDRAW_DELAY_MS = 50
+# Linhas (processos) visíveis de início; as outras aparecem com pan/zoom na vertical
+MAX_ROWS = 20
+
+
+def nome_processo(pid):
+    return "CPU IDLE" if pid == -1 else f"P{pid}"
+
+
+def agrupar_por_processo(segments):
+    """Separa os segmentos por processo numa só passagem.
+    Devolve {pid: (inicios, fins)} com arrays NumPy ordenados por início."""
+    arr = np.asarray(segments, dtype=np.int64).reshape(-1, 3)
+    if len(arr) == 0:
+        return {}
+    # ordenados por pid e, dentro de cada processo, pelo início
+    arr = arr[np.lexsort((arr[:, 1], arr[:, 0]))]
+    pids, primeiros = np.unique(arr[:, 0], return_index=True)
+    limites = list(primeiros[1:]) + [len(arr)]
+    return {int(pid): (arr[a:b, 1], arr[a:b, 2])
+            for pid, a, b in zip(pids, primeiros, limites)}
+
+
+def segmentos_visiveis(inicios, fins, x0, x1, px):
+    """Segmentos que intersetam [x0, x1], juntando os que estão a menos de px
+    (largura de um píxel, em unidades de tempo) uns dos outros.
+    Devolve (inicios, fins, juntou), em que juntou diz se algum foi juntado."""
+    # os segmentos de um processo não se sobrepõem, por isso inícios e fins estão ordenados
+    i0 = np.searchsorted(fins, x0, side="right")
+    i1 = np.searchsorted(inicios, x1, side="left")
+    s, e = inicios[i0:i1], fins[i0:i1]
+    if len(s) > 1 and px > 0:
+        cortes = (s[1:] - e[:-1]) >= px   # intervalos visíveis entre segmentos
+        if not cortes.all():
+            return (np.concatenate((s[:1], s[1:][cortes])),
+                    np.concatenate((e[:-1][cortes], e[-1:])), True)
+    return s, e, False
+
+
+class GanttView:
+    """Gráfico de Gantt dentro de um frame do Tk, com barra de ferramentas (zoom/pan)."""
+
+    def __init__(self, master):
+        # importado aqui para o resto do módulo poder ser usado sem Tk (ex: testes)
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+        self.figure = Figure(figsize=(8, 2.5), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, master, pack_toolbar=False)
+        self.toolbar.update()
+        self.canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew")
+        self.toolbar.grid(row=1, column=0, sticky="w")
+        master.rowconfigure(0, weight=1)
+        master.columnconfigure(0, weight=1)
+
+        self.processos = {}     # pid -> (inicios, fins)
+        self.linhas = []        # pids pela ordem das linhas do gráfico
+        self.artistas = []      # coleções e etiquetas do último desenho
+        self.redesenho = None   # redesenho pendente (after)
+        self.ax.callbacks.connect("xlim_changed", lambda ax: self.agendar_redesenho())
+        self.ax.callbacks.connect("ylim_changed", lambda ax: self.agendar_redesenho())
+        # nomes das linhas sem criar um tick por processo
+        self.ax.yaxis.set_major_locator(MaxNLocator(nbins="auto", integer=True))
+        self.ax.yaxis.set_major_formatter(FuncFormatter(self.nome_linha))
+        self.canvas.mpl_connect("resize_event", lambda ev: self.agendar_redesenho())
+        self.limpar()
+
+    def nome_linha(self, y, _pos=None):
+        linha = int(round(y))
+        return nome_processo(self.linhas[linha]) if 0 <= linha < len(self.linhas) else ""
+
+    def limpar(self):
+        self.set_segments([])
+
+    def set_segments(self, segments):
+        """Mostra uma nova lista de segmentos [[pid, inicio, fim], ...]."""
+        self.processos = agrupar_por_processo(segments)
+        # processos por ordem de id, com a CPU livre (-1) no fim
+        self.linhas = sorted(self.processos, key=lambda pid: (pid == -1, pid))
+        ax = self.ax
+        ax.set_ylim(-0.5, min(max(len(self.linhas), 1), MAX_ROWS) - 0.5)
+        ax.set_xlabel("Tempo")
+        ax.grid(True, axis="x", linestyle="--", alpha=0.5)
+        if self.processos:
+            ax.set_title("Gráfico de Gantt da Execução dos Processos")
+            inicio = min(int(s[0]) for s, _ in self.processos.values())
+            fim = max(int(e[-1]) for _, e in self.processos.values())
+            ax.set_xlim(inicio, max(fim, inicio + 1))  # dispara o redesenho
+        else:
+            ax.set_title("Sem dados de timeline")
+            ax.set_xlim(0, 1)
+        # a barra de ferramentas volta a esta vista com o botão "Home"
+        self.toolbar.update()
+        self.desenhar()
+
+    def agendar_redesenho(self):
+        if self.redesenho is None:
+            self.redesenho = self.canvas.get_tk_widget().after(REDRAW_DELAY_MS, self.desenhar)
+
+    def desenhar(self):
+        """Desenha só a janela de tempo visível, com o detalhe que cabe nos píxeis."""
+        if self.redesenho is not None:
+            self.canvas.get_tk_widget().after_cancel(self.redesenho)
+            self.redesenho = None
+        for artista in self.artistas:
+            artista.remove()
+        self.artistas = []
+
+        x0, x1 = self.ax.get_xlim()
+        largura_px = max(self.ax.get_window_extent().width, 1.0)
+        px = (x1 - x0) / largura_px  # unidades de tempo por píxel
+        y0, y1 = sorted(self.ax.get_ylim())
+        primeira = max(0, int(np.ceil(y0 - 0.2)))
+        ultima = min(len(self.linhas) - 1, int(np.floor(y1 + 0.2)))
+        etiquetas = []
+        for linha in range(primeira, ultima + 1):
+            pid = self.linhas[linha]
+            inicios, fins = self.processos[pid]
+            s, e, juntou = segmentos_visiveis(inicios, fins, x0, x1, px)
+            if len(s) == 0:
+                continue
+            # uma barra nunca fica mais estreita do que um píxel (senão desaparecia)
+            larguras = np.maximum(e - s, px)
+            cor = "lightgray" if pid == -1 else f"C{linha % 10}"
+            barras = self.ax.broken_barh(np.column_stack((s, larguras)), (linha - 0.2, 0.4), facecolors=cor)
+            self.artistas.append(barras)
+            # etiquetas só nos segmentos verdadeiros (não juntados) largos o suficiente para se lerem
+            if not juntou:
+                largos = np.nonzero(e - s >= LABEL_MIN_PX * px)[0]
+                for k in largos[:MAX_LABELS - len(etiquetas)]:
+                    etiquetas.append(((s[k] + e[k]) / 2, linha, f"{s[k]}-{e[k]}"))
+        for x, y, texto in etiquetas:
+            self.artistas.append(self.ax.text(x, y, texto, va="center", ha="center", color="white", fontsize=8))
+        self.canvas.draw_idle()
@@ -2,15 +2,18 @@ import tkinter as tk
 # botões mais bonitos (ttk), caixas de diálogo (filedialog, messagebox) e texto com scroll (scrolledtext).
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 
-# Importar bibliotecas para: chamar o programa OCaml (subprocess),
-# ler a resposta em JSON (json) e mexer com ficheiros/paths (os).
-import subprocess
-import json
+# Importar bibliotecas para: mexer com ficheiros/paths (os), passar mensagens entre
+# threads (queue), numerar as simulações (itertools) e correr em segundo plano (concurrent.futures).
 import os
-# Importar a biblioteca para ler ficheiros CSV.
-import csv
-# Importar biblioteca para gráficos de Gantt
-import matplotlib.pyplot as plt
+import queue
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+# Workers prob_sched --serve que ficam vivos entre simulações
+from prob_sched_client import WorkerPool, WorkerError, SimulationJob, SimulationCancelled
+# Gráfico de Gantt embebido na janela (matplotlib + FigureCanvasTkAgg)
+from gantt_view import GanttView
+# Tabela de processos virtualizada (aguenta CSV com milhões de linhas)
+from process_table_view import VirtualTable
 
 # caminho para o programa gerado pelo Dune
 OCAML_PATH = "./_build/default/bin/prob_sched.exe"
@@ -20,59 +23,42 @@ OCAML_PATH = "./_build/default/bin/prob_sched.exe"
 
 # Função para carregar e mostrar o conteúdo do CSV na tabela
 def load_csv_to_table(filepath):
-    # Primeiro, limpar a tabela de dados anteriores
-    # Percorre todos os items ('children') da raiz da árvore e apaga-os
-    for item in process_table.get_children():
-        process_table.delete(item)
+    # A tabela é lida numa thread em segundo plano (process_table_view), aos blocos:
+    # as linhas vão aparecendo e a janela não bloqueia mesmo com milhões de processos
+    status_var.set(f"A carregar CSV '{os.path.basename(filepath)}'...")
+
+    def ao_terminar(lidas, ignoradas, erro):
+        if isinstance(erro, FileNotFoundError):
+            messagebox.showerror("Erro Ficheiro", f"Não foi possível encontrar o ficheiro:\n{filepath}")
+            status_var.set("Erro ao ler CSV: Ficheiro não encontrado.")
+        elif erro is not None:
+            messagebox.showerror("Erro CSV", f"Erro ao ler ou processar o ficheiro CSV:\n{erro}")
+            status_var.set(f"Erro ao ler CSV: {erro}")
+        elif lidas == 0:
+            messagebox.showwarning("Aviso CSV", "Ficheiro CSV parece vazio ou tem poucas colunas.")
+            status_var.set("CSV sem processos.")
+        else:
+            aviso = f", {ignoradas} linhas inválidas ignoradas" if ignoradas else ""
+            status_var.set(f"CSV '{os.path.basename(filepath)}' carregado ({lidas} processos{aviso}).")
+
+    process_table.load_csv(filepath, ao_terminar=ao_terminar)
+
+
+# Chamada depois de cada célula editada na tabela
+def ao_editar_processo(linha):
+    pid = int(process_table.rows()[linha][0])
+    status_var.set(f"Processo P{pid} alterado: a próxima simulação usa os processos da tabela.")
+
 
+# Função para aplicar o filtro escrito por cima da tabela (ex: "burst>=10 prio=2")
+def aplicar_filtro(*args):
     try:
-        # Abre o ficheiro CSV para leitura ('r'), especificando a codificação (importante!)
-        # newline='' é recomendado pela documentação do módulo csv
-        with open(filepath, mode='r', newline='', encoding='utf-8') as csvfile:
-            # Cria um leitor de CSV, assumindo que o delimitador é vírgula ','
-            # (Se o teu CSV usar ; ou outro, muda aqui: delimiter=';')
-            csv_reader = csv.reader(csvfile, delimiter=',')
-
-            # Lê a primeira linha para ver se são cabeçalhos
-            header = next(csv_reader, None)
-
-            # Valida se o cabeçalho parece correto (opcional, mas útil)
-            # Adapta estes nomes se as colunas no teu CSV forem diferentes
-            expected_headers = ["id", "start_time", "burst_time", "priority"] # ou "period" etc.
-            if not header or len(header) < 4: # Verifica se tem pelo menos 4 colunas
-                 messagebox.showwarning("Aviso CSV", "Ficheiro CSV parece vazio ou tem poucas colunas.")
-                 return # Não continua se o cabeçalho for inválido
-
-            # Se a primeira linha não parecer dados (ex: contém letras onde deviam ser números),
-            # assume que é um cabeçalho e avança. Caso contrário, processa-a como dados.
-            # Esta lógica pode precisar de ajustes dependendo do formato exato do CSV.
-            try:
-                # Tenta converter a segunda coluna (start_time) para inteiro. Se falhar, é provável que seja cabeçalho.
-                int(header[1])
-                # Se chegou aqui, a primeira linha parece ser dados, então insere-a
-                process_table.insert('', tk.END, values=header[:4]) # Insere as primeiras 4 colunas
-            except (ValueError, IndexError):
-                # Provavelmente era um cabeçalho, ignora esta linha (já foi lida com next())
-                pass # Ignora o cabeçalho
-
-            # Lê e insere as restantes linhas na tabela
-            row_count = 0
-            for row in csv_reader:
-                if len(row) >= 4: # Garante que a linha tem dados suficientes
-                    # Insere um novo item na tabela:
-                    # '' - item pai (raiz)
-                    # tk.END - inserir no fim
-                    # values - uma lista/tuplo com os valores para cada coluna (pegamos nos 4 primeiros)
-                    process_table.insert('', tk.END, values=row[:4])
-                    row_count += 1
-            status_var.set(f"CSV '{os.path.basename(filepath)}' carregado ({row_count} processos).")
-
-    except FileNotFoundError:
-        messagebox.showerror("Erro Ficheiro", f"Não foi possível encontrar o ficheiro:\n{filepath}")
-        status_var.set("Erro ao ler CSV: Ficheiro não encontrado.")
-    except Exception as e:
-        messagebox.showerror("Erro CSV", f"Erro ao ler ou processar o ficheiro CSV:\n{e}")
-        status_var.set(f"Erro ao ler CSV: {e}")
+        process_table.filtrar(filtro_var.get())
+    except ValueError as e:
+        status_var.set(str(e))
+        return
+    if filtro_var.get().strip():
+        status_var.set(f"Filtro: {len(process_table.vista)} de {len(process_table)} processos.")
 
 
 # Função para o botão 'Procurar...' para escolher ficheiro
@@ -91,7 +77,9 @@ def browse_file():
         # Atualiza o estado do botão 'Executar Simulação'
         update_run_button_state()
 
-# Função quando se carrega no botão 'Executar Simulação'
+# Função quando se carrega no botão 'Executar Simulação'.
+# A simulação não corre aqui: o pedido vai para uma fila e é corrido numa thread
+# em segundo plano, por isso a janela nunca bloqueia. Podem ficar várias na fila.
 def run_simulation():
     algo = algo_combo.get()
     fpath = file_path_var.get()
@@ -103,141 +91,198 @@ def run_simulation():
         messagebox.showerror("Erro", f"Não encontrei o executável OCaml em:\n{OCAML_PATH}\nVerifique o caminho.")
         return
 
-    # Antes de correr a simulação:
-    if gen_num > 0:
-        show_generated_processes([])  # Limpa a tabela só para geração aleatória
-    clear_results()  # Limpa só os resultados da simulação (estatísticas, timeline, etc.)
-
-    # Decide se usa ficheiro ou geração aleatória
-    if gen_num > 0:
-        cmd = [OCAML_PATH, "--algo", algo, "--gen", str(gen_num)]
-        if exp_var.get():
-            cmd.append("--exp")
+    # Decide se usa a tabela editada, o ficheiro ou a geração aleatória.
+    # O pedido vai em JSON para um worker que já está a correr (prob_sched --serve),
+    # por isso não se lança um processo novo em cada simulação.
+    if process_table.editada and len(process_table):
+        # Processos alterados na tabela (duplo clique): vão no pedido. O worker guardou
+        # checkpoints da simulação anterior e só volta a simular a partir da primeira
+        # chegada alterada (fcfs, sjf, prioridades e rr)
+        pedido = {"algo": algo, "processes": process_table.rows().tolist()}
+    elif gen_num > 0:
+        pedido = {"algo": algo, "gen": gen_num, "exp": bool(exp_var.get())}
     else:
         if not fpath or fpath == "No file selected":
             messagebox.showerror("Erro", "Por favor, escolha um ficheiro de processos ou indique um número para gerar aleatórios.")
             return
-        cmd = [OCAML_PATH, "--algo", algo, "--file", fpath]
+        pedido = {"algo": algo, "file": fpath}
+
+    try:
+        if algo == "rr":
+            pedido["quantum"] = int(quantum)
+        if algo in ("rm", "edf"):
+            pedido["max"] = int(max_time)
+    except ValueError:
+        messagebox.showerror("Erro", "O quantum e o tempo máximo têm de ser números inteiros.")
+        return
+    # O profile é barato (só relógio e contadores), por isso vai sempre ligado
+    pedido["profile"] = True
 
-    if algo == "rr":
-        cmd.extend(["--quantum", str(quantum)])
-    if algo in ("rm", "edf"):
-        cmd.extend(["--max", str(max_time)])
+    # Guarda a simulação na lista das que estão a correr ou à espera e entrega-a ao executor
+    numero = next(contador_simulacoes)
+    job = SimulationJob(pedido)
+    simulacoes_ativas[numero] = {"job": job, "algo": algo, "max": pedido.get("max"), "tempo": None}
+    simulation_executor.submit(correr_em_fundo, numero, job)
+    atualizar_progresso()
 
-    # Escreve na barra de estado em baixo o que esta a fazer
-    status_var.set(f"A executar {algo} em {os.path.basename(fpath)}...")
-    # Força a janela a atualizar
-    root.update_idletasks()
 
-    # Tenta correr o programa OCaml e ver o que acontece
+# Corre numa thread do executor: espera pela resposta do worker e põe tudo (progresso,
+# resultado ou erro) na fila lida pela janela. Aqui não se mexe em widgets do Tk.
+def correr_em_fundo(numero, job):
     try:
-        # Chama o programa OCaml, guarda o que ele escrever (stdout/stderr),
-        # diz que a saída é texto, não verifica o código de erro automaticamente (check=False),
-        # e espera no máximo 30 segundos.
-        process = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=30)
-
-        # Limpa os resultados que possam estar na janela da vez anterior.
-        clear_results() # Esta função agora só limpa os resultados da simulação, não a tabela CSV
-
-        # Se o programa OCaml deu erro (código de retorno diferente de 0)...
-        if process.returncode != 0:
-            # Mesmo com erro, tenta ver se a saída (stdout) é um JSON
-            # (pode ter a mensagem de erro lá dentro formatada em JSON)
-            try:
-                output_data = json.loads(process.stdout)
-                # Se o JSON diz explicitamente que não teve sucesso E tem uma mensagem de erro...
-                if not output_data.get("success", False) and "error" in output_data:
-                    # Mostra a mensagem de erro que veio do OCaml.
-                    messagebox.showerror("Erro da Simulação", f"Erro do OCaml:\n{output_data['error']}")
-                    status_var.set(f"Erro OCaml: {output_data['error']}") # Mensagem mais curta para status
-                else:
-                    # Se deu erro mas não veio mensagem de erro clara no JSON...
-                    # Mostra um erro mais genérico, incluindo o que o OCaml escreveu (stderr e stdout).
-                    messagebox.showerror("Erro na Execução", f"Processo OCaml falhou (código {process.returncode}).\nStderr:\n{process.stderr}\nStdout:\n{process.stdout}")
-                    status_var.set(f"Execução falhou (código {process.returncode})")
-            # Se deu erro E a saída nem sequer é JSON...
-            except json.JSONDecodeError:
-                 # Mostra mensagem a dizer que deu erro e a saída é esquisita (não JSON).
-                 messagebox.showerror("Erro na Execução", f"Processo OCaml falhou (código {process.returncode}) e a saída não é JSON válido.\nStderr:\n{process.stderr}\nStdout:\n{process.stdout}")
-                 status_var.set(f"Execução falhou (código {process.returncode}), saída inválida.")
-
-        # Se correu tudo bem com o programa OCaml (código de retorno 0)...
-        else:
-            # Tenta processar a saída JSON (que deve ter os resultados)
-            try:
-                # Transforma o texto de saída (stdout) num objeto JSON
-                output_data = json.loads(process.stdout)
-                # Se o JSON diz que teve sucesso (tem "success": true)...
-                if output_data.get("success", False):
-                    # Vai buscar o dicionário 'results' de dentro do JSON (ou um dicionário vazio se não existir)
-                    results = output_data.get("results", {})
-                    # Mostra os processos gerados (aleatórios) se existirem, senão mostra os do campo "processes"
-                    if "processes_generated" in results:
-                        show_generated_processes(results["processes_generated"])
-                    elif "processes" in results:
-                        show_generated_processes(results["processes"])
-                    else:
-                        # Limpa a tabela se não houver processos (ex: erro ou simulação sem processos)
-                        show_generated_processes([])
-                    # Vai buscar o dicionário 'stats' de dentro dos 'results' (ou vazio se não existir)
-                    stats = results.get("stats", {})
-
-                    # Põe os valores das estatísticas nos sítios certos na janela
-                    avg_wt = stats.get('avg_waiting_time')
-                    avg_wt_var.set(f"{avg_wt:.2f}" if isinstance(avg_wt, (int, float)) else "N/A")
-
-                    avg_tt = stats.get('avg_turnaround_time')
-                    avg_tt_var.set(f"{avg_tt:.2f}" if isinstance(avg_tt, (int, float)) else "N/A")
-
-                    cpu_util = stats.get('cpu_utilization')
-                    cpu_util_var.set(f"{cpu_util:.2f}" if isinstance(cpu_util, (int, float)) else "N/A")
-
-                    throughput = stats.get('throughput')
-                    throughput_var.set(f"{throughput:.4f}" if isinstance(throughput, (int, float)) else "N/A")
-
-                    deadlines = stats.get('deadline_misses')
-                    deadline_misses_var.set(f"{deadlines}" if isinstance(deadlines, int) else "N/A")
-
-                    # Atualiza a caixa de texto da timeline:
-                    timeline_text.config(state=tk.NORMAL)
-                    timeline_text.delete('1.0', tk.END)
-                    timeline_text.insert(tk.END, results.get("timeline_string", "[Dados da timeline em falta]"))
-                    timeline_text.config(state=tk.DISABLED)
-
-                    # Mostra o gráfico de Gantt
-                    mostrar_gantt(results.get("timeline_string", ""))
-
-                    # Avisa na barra de estado que terminou.
-                    status_var.set("Simulação completa.")
-                # Se o programa OCaml não deu erro (código 0), mas o JSON diz que algo correu mal ("success": false)...
-                else:
-                    # Vai buscar a mensagem de erro dentro do JSON.
-                    err_msg = output_data.get("error", "Erro desconhecido reportado pelo OCaml.")
-                    # Mostra essa mensagem de erro.
-                    messagebox.showerror("Erro da Simulação", err_msg)
-                    status_var.set(f"Erro Simulação: {err_msg}") # Mensagem mais curta
-
-            # Se correu bem (código 0) mas a saída não é JSON (muito estranho)...
-            except json.JSONDecodeError:
-                messagebox.showerror("Erro na Saída", f"Processo OCaml teve sucesso mas a saída não é JSON válido.\n{process.stdout}")
-                status_var.set("Erro ao processar a saída do OCaml.")
-            # Apanha outros erros que possam acontecer aqui a processar os resultados JSON
-            except Exception as e:
-                 messagebox.showerror("Erro no GUI", f"Erro ao processar os resultados: {e}")
-                 status_var.set("Erro ao processar resultados.")
-
-    # Apanhou o erro de ter demorado demasiado tempo (Timeout > 30s)
-    except subprocess.TimeoutExpired:
-        messagebox.showerror("Timeout", "A simulação demorou mais de 30 segundos.")
-        status_var.set("Erro: Simulação excedeu o tempo limite.")
-    # Apanhou o erro de não encontrar o ficheiro do OCaml
-    except FileNotFoundError:
-        messagebox.showerror("Erro", f"Não encontrei o executável OCaml em:\n{OCAML_PATH}\nVerifique o caminho.")
-        status_var.set("Erro: CLI OCaml não encontrado.")
-    # Apanha qualquer outro erro mesmo inesperado que aconteça.
+        resposta = simulation_pool.run(
+            job.pedido, job=job,
+            on_progress=lambda tempo: mensagens_simulacao.put(("progresso", numero, tempo)))
+        mensagens_simulacao.put(("resultado", numero, resposta))
+    except SimulationCancelled:
+        mensagens_simulacao.put(("cancelada", numero, None))
     except Exception as e:
-        messagebox.showerror("Erro", f"Ocorreu um erro inesperado: {e}")
-        status_var.set(f"Erro inesperado: {e}")
+        mensagens_simulacao.put(("erro", numero, e))
+
+
+# Chamada pelo Tk a cada 100 ms (root.after): trata as mensagens das simulações
+def verificar_simulacoes():
+    try:
+        while True:
+            tipo, numero, valor = mensagens_simulacao.get_nowait()
+            if tipo == "progresso":
+                if numero in simulacoes_ativas:
+                    simulacoes_ativas[numero]["tempo"] = valor
+                continue
+            simulacoes_ativas.pop(numero, None)
+            if tipo == "resultado":
+                try:
+                    mostrar_resultados(numero, valor)
+                # Apanha erros que possam acontecer aqui a processar os resultados JSON
+                except Exception as e:
+                    messagebox.showerror("Erro no GUI", f"Erro ao processar os resultados: {e}")
+                    status_var.set("Erro ao processar resultados.")
+            elif tipo == "cancelada":
+                status_var.set(f"Simulação #{numero} cancelada.")
+            # Não encontrou o ficheiro do OCaml
+            elif isinstance(valor, FileNotFoundError):
+                messagebox.showerror("Erro", f"Não encontrei o executável OCaml em:\n{OCAML_PATH}\nVerifique o caminho.")
+                status_var.set("Erro: CLI OCaml não encontrado.")
+            # O worker morreu ou respondeu com algo que não é JSON
+            elif isinstance(valor, WorkerError):
+                messagebox.showerror("Erro na Execução", f"Simulação #{numero}: {valor}")
+                status_var.set(f"Erro na execução: {valor}")
+            # Qualquer outro erro mesmo inesperado
+            else:
+                messagebox.showerror("Erro", f"Ocorreu um erro inesperado: {valor}")
+                status_var.set(f"Erro inesperado: {valor}")
+    except queue.Empty:
+        pass
+    atualizar_progresso()
+    root.after(100, verificar_simulacoes)
+
+
+# Barra de progresso e estado: mostra a simulação mais antiga que está a correr
+def atualizar_progresso():
+    if not simulacoes_ativas:
+        cancel_button.config(state=tk.DISABLED)
+        progress_bar.stop()
+        progress_bar.config(mode="determinate", value=0)
+        progress_var.set("")
+        return
+    cancel_button.config(state=tk.NORMAL)
+    numero = min(simulacoes_ativas)
+    sim = simulacoes_ativas[numero]
+    espera = len(simulacoes_ativas) - 1
+    fila = f" (+{espera} na fila)" if espera else ""
+    if sim["tempo"] is None:
+        progress_var.set(f"#{numero} {sim['algo']}: a correr...{fila}")
+    elif sim["max"]:
+        progress_var.set(f"#{numero} {sim['algo']}: t = {sim['tempo']} / {sim['max']}{fila}")
+    else:
+        progress_var.set(f"#{numero} {sim['algo']}: t = {sim['tempo']}{fila}")
+    # Com tempo máximo (rm/edf) a barra mostra a fração; senão só indica atividade
+    if sim["max"] and sim["tempo"] is not None:
+        progress_bar.stop()
+        progress_bar.config(mode="determinate", value=100 * min(sim["tempo"], sim["max"]) / sim["max"])
+    elif str(progress_bar.cget("mode")) != "indeterminate":
+        progress_bar.config(mode="indeterminate")
+        progress_bar.start(50)
+
+
+# Botão 'Cancelar': cancela as simulações a correr (o worker é terminado) e as que estão na fila
+def cancelar_simulacoes():
+    for sim in simulacoes_ativas.values():
+        sim["job"].cancel()
+    status_var.set("A cancelar...")
+
+
+# Mostra na janela a resposta de uma simulação
+def mostrar_resultados(numero, output_data):
+    # Limpa os resultados que possam estar na janela da vez anterior.
+    clear_results() # Esta função agora só limpa os resultados da simulação, não a tabela CSV
+
+    # Se a resposta diz que teve sucesso (tem "success": true)...
+    if output_data.get("success", False):
+        # Vai buscar o dicionário 'results' de dentro do JSON (ou um dicionário vazio se não existir)
+        results = output_data.get("results", {})
+        # Só substitui a tabela quando os processos foram gerados (aleatórios); com
+        # ficheiro ou com a tabela editada a resposta traz a lista vazia e a tabela fica
+        if results.get("processes_generated"):
+            show_generated_processes(results["processes_generated"])
+        # Vai buscar o dicionário 'stats' de dentro dos 'results' (ou vazio se não existir)
+        stats = results.get("stats", {})
+
+        # Põe os valores das estatísticas nos sítios certos na janela
+        avg_wt = stats.get('avg_waiting_time')
+        avg_wt_var.set(f"{avg_wt:.2f}" if isinstance(avg_wt, (int, float)) else "N/A")
+
+        avg_tt = stats.get('avg_turnaround_time')
+        avg_tt_var.set(f"{avg_tt:.2f}" if isinstance(avg_tt, (int, float)) else "N/A")
+
+        cpu_util = stats.get('cpu_utilization')
+        cpu_util_var.set(f"{cpu_util:.2f}" if isinstance(cpu_util, (int, float)) else "N/A")
+
+        throughput = stats.get('throughput')
+        throughput_var.set(f"{throughput:.4f}" if isinstance(throughput, (int, float)) else "N/A")
+
+        deadlines = stats.get('deadline_misses')
+        deadline_misses_var.set(f"{deadlines}" if isinstance(deadlines, int) else "N/A")
+
+        avg_rt = stats.get('avg_response_time')
+        avg_rt_var.set(f"{avg_rt:.2f}" if isinstance(avg_rt, (int, float)) else "N/A")
+
+        # Percentis p50 / p95 / p99 de todos os processos
+        pct_wait_var.set(formatar_percentis(stats.get('waiting_time_percentiles')))
+        pct_resp_var.set(formatar_percentis(stats.get('response_time_percentiles')))
+        pct_tat_var.set(formatar_percentis(stats.get('turnaround_time_percentiles')))
+
+        # Uma linha por classe de prioridade
+        by_priority_var.set(formatar_por_prioridade(stats.get('by_priority', [])))
+
+        # Segmentos [pid, inicio, fim] da execução (pid -1 = CPU livre)
+        segments = results.get("segments", [])
+
+        # Atualiza a caixa de texto da timeline:
+        timeline_text.config(state=tk.NORMAL)
+        timeline_text.delete('1.0', tk.END)
+        timeline_text.insert(tk.END, formatar_segmentos(segments) if segments else "[Dados da timeline em falta]")
+        timeline_text.config(state=tk.DISABLED)
+
+        # Tempos por fase, GC e contadores do motor (painel "Profile")
+        profile_var.set(formatar_profile(output_data.get("profile")))
+
+        # Mostra o gráfico de Gantt
+        mostrar_gantt(segments)
+
+        # Avisa na barra de estado que terminou (e de onde retomou, se usou um checkpoint)
+        retomada = (output_data.get("profile") or {}).get("engine", {}).get("resumed_at", 0)
+        if retomada:
+            status_var.set(f"Simulação #{numero} completa (retomada do checkpoint em t={retomada}).")
+        else:
+            status_var.set(f"Simulação #{numero} completa.")
+    # Se o OCaml respondeu com um erro ("success": false)...
+    else:
+        # Vai buscar a mensagem de erro dentro do JSON.
+        err_msg = output_data.get("error", "Erro desconhecido reportado pelo OCaml.")
+        # Mostra essa mensagem de erro.
+        messagebox.showerror("Erro da Simulação", f"Erro do OCaml:\n{err_msg}")
+        status_var.set(f"Erro Simulação: {err_msg}") # Mensagem mais curta
 
 
 # Função para limpar SÓ os resultados da simulação (não a tabela CSV)
@@ -248,76 +293,96 @@ def clear_results():
       cpu_util_var.set("N/A")
       throughput_var.set("N/A")
       deadline_misses_var.set("N/A")
+      avg_rt_var.set("N/A")
+      pct_wait_var.set("N/A")
+      pct_resp_var.set("N/A")
+      pct_tat_var.set("N/A")
+      by_priority_var.set("")
+      profile_var.set("")
       # Limpa a caixa de texto da timeline
       timeline_text.config(state=tk.NORMAL) # Torna editável
       timeline_text.delete('1.0', tk.END)   # Apaga tudo
       timeline_text.config(state=tk.DISABLED) # Torna só de leitura
+      # Limpa o gráfico de Gantt
+      gantt_view.limpar()
+
+
+# Texto "p50 / p95 / p99" a partir do dicionário de percentis do OCaml
+def formatar_percentis(pcts):
+    if not isinstance(pcts, dict):
+        return "N/A"
+    valores = [pcts.get(k) for k in ("p50", "p95", "p99")]
+    if not all(isinstance(v, (int, float)) for v in valores):
+        return "N/A"
+    return " / ".join(f"{v:.1f}" for v in valores)
+
+
+# Uma linha por classe de prioridade com os percentis de espera e de turnaround
+def formatar_por_prioridade(classes):
+    linhas = []
+    for c in classes:
+        linhas.append(
+            f"Prioridade {c.get('priority')} ({c.get('completed')} terminados): "
+            f"espera {formatar_percentis(c.get('waiting_time_percentiles'))}, "
+            f"resposta {formatar_percentis(c.get('response_time_percentiles'))}, "
+            f"turnaround {formatar_percentis(c.get('turnaround_time_percentiles'))}"
+        )
+    return "\n".join(linhas)
+
+
+# Texto do painel "Profile": uma linha por fase, depois o GC e os contadores do motor
+def formatar_profile(profile):
+    if not isinstance(profile, dict):
+        return "[Sem dados de profile]"
+    linhas = [f"Total: {profile.get('total_ms', 0):.3f} ms"]
+    for fase, ms in profile.get("phases_ms", {}).items():
+        linhas.append(f"  {fase:<16}{ms:>12.3f} ms")
+    linhas.append("GC:")
+    for nome, valor in profile.get("gc", {}).items():
+        linhas.append(f"  {nome:<18}{valor:>14,.0f}")
+    linhas.append("Motor:")
+    for nome, valor in profile.get("engine", {}).items():
+        linhas.append(f"  {nome:<18}{valor:>14,}")
+    return "\n".join(linhas)
+
+
+# Mostra/esconde o painel do profile (começa fechado)
+def alternar_profile():
+    if profile_frame.grid_info():  # vazio quando está escondido
+        profile_frame.grid_remove()
+        profile_toggle.config(text="▸ Profile")
+    else:
+        profile_frame.grid()
+        profile_toggle.config(text="▾ Profile")
 
 
-# Função para mostrar o gráfico de Gantt
-def mostrar_gantt(timeline_string):
-    """
-    Espera uma string da timeline no formato: [P1][P2][P2][P1]...
-    Cada bloco representa o processo ativo em cada unidade de tempo.
-    """
-    import re
+# Segmentos mostrados na caixa de texto (com milhões a caixa deixava de responder;
+# o gráfico mostra-os todos)
+MAX_SEGMENTOS_TEXTO = 5000
 
-    # Extrai os nomes dos processos na ordem
-    processos = re.findall(r'\[(.*?)\]', timeline_string)
-    if not processos:
-        messagebox.showinfo("Gantt", "Não há dados de timeline para mostrar.")
-        return
+# Função para escrever os segmentos como texto compacto, ex: [P1 0-3][- 3-5]
+def formatar_segmentos(segments):
+    texto = "".join(f"[- {inicio}-{fim}]" if pid == -1 else f"[P{pid} {inicio}-{fim}]"
+                    for pid, inicio, fim in segments[:MAX_SEGMENTOS_TEXTO])
+    if len(segments) > MAX_SEGMENTOS_TEXTO:
+        texto += f" ... (+{len(segments) - MAX_SEGMENTOS_TEXTO} segmentos, ver o gráfico)"
+    return texto
 
-    # Agrupa intervalos contínuos do mesmo processo
-    tasks = []
-    if processos:
-        atual = processos[0]
-        inicio = 0
-        for t, nome in enumerate(processos[1:], 1):
-            if nome != atual:
-                tasks.append((atual, inicio, t))
-                atual = nome
-                inicio = t
-        tasks.append((atual, inicio, len(processos)))  # último intervalo
-
-    if not tasks:
-        messagebox.showinfo("Gantt", "Não há dados de timeline para mostrar.")
-        return
 
-    # Substitui "-" por "CPU IDLE" para visualização
-    tasks = [("CPU IDLE" if nome == "-" else nome, inicio, fim) for (nome, inicio, fim) in tasks]
-
-    # Desenha o gráfico de Gantt
-    fig, ax = plt.subplots(figsize=(10, 2 + 0.5 * len(set(t[0] for t in tasks))))
-    ylabels = []
-    yticks = []
-    nomes_unicos = sorted(set(t[0] for t in tasks))
-    for idx, nome in enumerate(nomes_unicos):
-        ylabels.append(nome)
-        yticks.append(idx)
-        for tsk in tasks:
-            if tsk[0] == nome:
-                ax.barh(idx, tsk[2] - tsk[1], left=tsk[1], height=0.4, align='center')
-                ax.text((tsk[1]+tsk[2])/2, idx, f"{tsk[1]}-{tsk[2]}", va='center', ha='center', color='white', fontsize=8)
-
-    ax.set_yticks(yticks)
-    ax.set_yticklabels(ylabels)
-    ax.set_xlabel('Tempo')
-    ax.set_title('Gráfico de Gantt da Execução dos Processos')
-    ax.grid(True, axis='x', linestyle='--', alpha=0.5)
-    plt.tight_layout()
-    plt.show()
+# Função para mostrar o gráfico de Gantt (no painel da janela, não numa janela à parte)
+def mostrar_gantt(segments):
+    """
+    Espera a lista de segmentos do OCaml: [[pid, inicio, fim], ...]
+    Cada segmento é um intervalo [inicio, fim) em que o processo pid esteve a correr.
+    O GanttView só desenha o que está visível, por isso aguenta milhões de segmentos.
+    """
+    gantt_view.set_segments(segments)
 
 
 # Função para mostrar os processos gerados na tabela
 def show_generated_processes(processes):
-    # Limpa a tabela
-    for item in process_table.get_children():
-        process_table.delete(item)
-    # Adiciona cada processo à tabela
-    for proc in processes:
-        # proc = [id, start_time, burst_time, priority/period]
-        process_table.insert('', tk.END, values=proc)
+    # processes = [[id, start_time, burst_time, priority/period], ...]
+    process_table.set_rows(processes)
 
 
 # Função para atualizar o estado do botão 'Executar Simulação'
@@ -363,6 +428,14 @@ avg_tt_var = tk.StringVar(value="N/A")
 cpu_util_var = tk.StringVar(value="N/A")
 throughput_var = tk.StringVar(value="N/A")
 deadline_misses_var = tk.StringVar(value="N/A")
+avg_rt_var = tk.StringVar(value="N/A")
+# Percentis p50 / p95 / p99 dos tempos de espera, resposta e turnaround
+pct_wait_var = tk.StringVar(value="N/A")
+pct_resp_var = tk.StringVar(value="N/A")
+pct_tat_var = tk.StringVar(value="N/A")
+by_priority_var = tk.StringVar(value="")
+# Texto do painel "Profile" (tempos por fase, GC e contadores do motor)
+profile_var = tk.StringVar(value="")
 
 # Liga as variáveis ao estado do botão 'Executar Simulação'
 gen_num_var = tk.IntVar(value=0)
@@ -433,9 +506,19 @@ exp_var = tk.BooleanVar(value=False)
 exp_checkbox = ttk.Checkbutton(input_frame, text="Burst Exponencial", variable=exp_var)
 exp_checkbox.grid(row=4, column=2, sticky=tk.W, padx=5, pady=2)
 
-# --- Botão Principal ---
-run_button = ttk.Button(left_column_frame, text="Executar Simulação", command=run_simulation, state=tk.DISABLED)
-run_button.grid(row=1, column=0, pady=10) # pady=10 dá espaço vertical à volta.
+# --- Botão Principal, Cancelar e progresso ---
+run_frame = ttk.Frame(left_column_frame)
+run_frame.grid(row=1, column=0, pady=10, sticky=(tk.W, tk.E)) # pady=10 dá espaço vertical à volta.
+run_frame.columnconfigure(2, weight=1) # A barra de progresso estica
+run_button = ttk.Button(run_frame, text="Executar Simulação", command=run_simulation, state=tk.DISABLED)
+run_button.grid(row=0, column=0)
+cancel_button = ttk.Button(run_frame, text="Cancelar", command=cancelar_simulacoes, state=tk.DISABLED)
+cancel_button.grid(row=0, column=1, padx=5)
+progress_bar = ttk.Progressbar(run_frame, mode="determinate", maximum=100)
+progress_bar.grid(row=0, column=2, sticky=(tk.W, tk.E), padx=5)
+# Texto do progresso: número da simulação, tempo simulado e quantas estão na fila
+progress_var = tk.StringVar(value="")
+ttk.Label(run_frame, textvariable=progress_var).grid(row=1, column=0, columnspan=3, sticky=tk.W)
 
 # --- Secção dos Resultados ---
 output_frame = ttk.LabelFrame(left_column_frame, text="Resultados Simulação", padding="10")
@@ -458,12 +541,31 @@ ttk.Label(stats_frame, text="Throughput:").grid(row=1, column=2, sticky=tk.W, pa
 ttk.Label(stats_frame, textvariable=throughput_var).grid(row=1, column=3, sticky=tk.W)
 ttk.Label(stats_frame, text="Deadlines Falhados (apenas algoritmos de tempo real):").grid(row=2, column=0, sticky=tk.W)
 ttk.Label(stats_frame, textvariable=deadline_misses_var).grid(row=2, column=1, sticky=tk.W)
+ttk.Label(stats_frame, text="Tempo Resposta Médio:").grid(row=2, column=2, sticky=tk.W, padx=10)
+ttk.Label(stats_frame, textvariable=avg_rt_var).grid(row=2, column=3, sticky=tk.W)
+# Percentis (p50 / p95 / p99)
+ttk.Label(stats_frame, text="Espera p50/p95/p99:").grid(row=3, column=0, sticky=tk.W)
+ttk.Label(stats_frame, textvariable=pct_wait_var).grid(row=3, column=1, sticky=tk.W)
+ttk.Label(stats_frame, text="Resposta p50/p95/p99:").grid(row=4, column=0, sticky=tk.W)
+ttk.Label(stats_frame, textvariable=pct_resp_var).grid(row=4, column=1, sticky=tk.W)
+ttk.Label(stats_frame, text="Turnaround p50/p95/p99:").grid(row=5, column=0, sticky=tk.W)
+ttk.Label(stats_frame, textvariable=pct_tat_var).grid(row=5, column=1, sticky=tk.W)
+# Percentis por classe de prioridade (uma linha por classe)
+ttk.Label(stats_frame, textvariable=by_priority_var, justify=tk.LEFT).grid(row=6, column=0, columnspan=4, sticky=tk.W)
 
 # Label e Texto da Timeline (dentro do output_frame)
 ttk.Label(output_frame, text="Timeline:", font=("TkFixedFont", 10)).grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(5,0))
 timeline_text = scrolledtext.ScrolledText(output_frame, wrap=tk.WORD, height=10, state=tk.DISABLED, font=("TkFixedFont", 10))
 timeline_text.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0,5))
 
+# Painel recolhível com o profile da última execução (botão abre/fecha)
+profile_toggle = ttk.Button(output_frame, text="▸ Profile", command=alternar_profile)
+profile_toggle.grid(row=3, column=0, sticky=tk.W)
+profile_frame = ttk.Frame(output_frame)
+profile_frame.grid(row=4, column=0, sticky=(tk.W, tk.E))
+ttk.Label(profile_frame, textvariable=profile_var, justify=tk.LEFT, font=("TkFixedFont", 9)).grid(row=0, column=0, sticky=tk.W)
+profile_frame.grid_remove()  # Começa fechado; grid() volta a pô-lo no mesmo sítio
+
 # --- Barra de Estado (em baixo, na coluna da esquerda) ---
 status_bar = ttk.Label(left_column_frame, textvariable=status_var, relief=tk.SUNKEN, anchor=tk.W)
 status_bar.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(5,0)) # Ocupa a largura da coluna esquerda
@@ -479,30 +581,54 @@ table_frame.grid(row=0, column=1, rowspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pa
 table_frame.columnconfigure(0, weight=1)
 table_frame.rowconfigure(0, weight=1)
 
-# Define as colunas da tabela
-# Os IDs das colunas ('id', 'start', etc.) são usados internamente
-# O texto em 'heading' é o que aparece ao utilizador
-columns = ('id', 'start_time', 'burst_time', 'priority_period')
-process_table = ttk.Treeview(table_frame, columns=columns, show='headings') # show='headings' esconde a primeira coluna fantasma
-
-# Define os cabeçalhos e a largura inicial das colunas
-process_table.heading('id', text='ID')
-process_table.column('id', width=50, anchor=tk.CENTER)
-process_table.heading('start_time', text='Chegada')
-process_table.column('start_time', width=70, anchor=tk.CENTER)
-process_table.heading('burst_time', text='Duração')
-process_table.column('burst_time', width=70, anchor=tk.CENTER)
-process_table.heading('priority_period', text='Prioridade/Período') # Cabeçalho genérico
-process_table.column('priority_period', width=120, anchor=tk.CENTER)
-
-# Adiciona a barra de scroll vertical
-scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=process_table.yview)
-process_table.configure(yscroll=scrollbar.set)
-
-# Coloca a tabela e a scrollbar na grelha do table_frame
-process_table.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+# Tabela virtualizada: os processos ficam em arrays NumPy e o Treeview só tem as
+# linhas visíveis (clicar num cabeçalho ordena por essa coluna; duplo clique numa
+# célula edita o valor)
+process_table = VirtualTable(table_frame)
+process_table.ao_editar = ao_editar_processo
+# Mudar o número de processos a gerar volta a usar a geração em vez da tabela editada
+gen_num_var.trace_add("write", lambda *args: setattr(process_table, "editada", False))
+
+# Filtro por baixo da tabela (ex: "burst>=10 prio=2"); Enter aplica, vazio mostra tudo
+filtro_frame = ttk.Frame(table_frame)
+filtro_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+filtro_frame.columnconfigure(1, weight=1)
+ttk.Label(filtro_frame, text="Filtro:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+filtro_var = tk.StringVar()
+filtro_entry = ttk.Entry(filtro_frame, textvariable=filtro_var)
+filtro_entry.grid(row=0, column=1, sticky=(tk.W, tk.E))
+filtro_entry.bind("<Return>", aplicar_filtro)
+ttk.Button(filtro_frame, text="Aplicar", command=aplicar_filtro).grid(row=0, column=2, padx=(5, 0))
+
+
+# --- Gráfico de Gantt (por baixo das duas colunas) ---
+# Barra de ferramentas do matplotlib para zoom/pan; o detalhe é refeito a cada zoom
+gantt_frame = ttk.LabelFrame(main_frame, text="Gráfico de Gantt", padding="5")
+gantt_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(5, 0))
+main_frame.rowconfigure(4, weight=1) # O gráfico também cresce com a janela
+gantt_view = GanttView(gantt_frame)
 
 
 # --- Pôr a janela a funcionar ---
+# Workers do OCaml (prob_sched --serve): só são lançados no primeiro pedido
+# e ficam vivos até a janela fechar
+simulation_pool = WorkerPool(2, exe=OCAML_PATH)
+# Threads que esperam pelos workers (uma por worker; as restantes simulações ficam na fila)
+simulation_executor = ThreadPoolExecutor(max_workers=simulation_pool.size)
+# Mensagens (tipo, número, valor) das threads para a janela
+mensagens_simulacao = queue.Queue()
+# Simulações a correr ou na fila: número -> job, algoritmo, tempo máximo e último tempo simulado
+simulacoes_ativas = {}
+contador_simulacoes = itertools.count(1)
+
+def fechar_janela():
+    for sim in simulacoes_ativas.values():
+        sim["job"].cancel()
+    simulation_executor.shutdown(wait=False, cancel_futures=True)
+    simulation_pool.close()
+    root.destroy()
+
+root.protocol("WM_DELETE_WINDOW", fechar_janela)
+root.after(100, verificar_simulacoes)
+
 root.mainloop()
\ No newline at end of file
@@ -0,0 +1,96 @@
+(* Checkpoints do motor, para a re-simulação incremental.
+
+   Um checkpoint é o estado de uma política no topo do seu ciclo: o instante,
+   quantos processos já foram admitidos (pela ordem de chegada) e terminados, a
+   fila de prontos pela ordem de saída, o processo em execução, o trabalho que
+   falta aos processos vivos e os contadores do contexto. Os processos são
+   guardados pelo id (o índice da execução já assume ids únicos).
+
+   Quando a carga muda, tudo o que chega antes da primeira chegada afetada
+   (earliest_change) é igual nas duas cargas e o escalonamento até esse instante
+   também. Uma execução da carga nova pode por isso retomar do último checkpoint
+   anterior a esse instante e produz os mesmos eventos que uma execução desde t=0.
+   Os consumidores dos eventos (estatísticas, timeline) guardam o seu estado ao
+   lado de cada checkpoint (ver Statistics.save_collector). *)
+
+(* Processo vivo (na fila de prontos ou em execução) no instante do checkpoint *)
+type live = {
+  pid : int;
+  remaining : int;
+  state : Process.process_state;
+}
+
+type t = {
+  time : int;
+  admitted : int;                   (* processos já admitidos, pela ordem de chegada *)
+  completed : int;                  (* processos terminados *)
+  ready : live array;               (* fila de prontos, pela ordem em que sairia *)
+  running : live option;            (* processo em execução (políticas com preempção) *)
+  counters : Sim_context.counters;  (* cópia dos contadores do contexto *)
+  taken_off : (int * int option) option;  (* último processo tirado do CPU e ainda não substituído *)
+}
+
+(* Checkpoints pedidos a uma política *)
+type config = {
+  every : int;          (* tempo simulado entre dois checkpoints *)
+  save : t -> unit;     (* recebe cada checkpoint, no topo do ciclo *)
+  resume : t option;    (* checkpoint de onde a execução retoma *)
+}
+
+let copy_counters (c : Sim_context.counters) : Sim_context.counters =
+  { c with Sim_context.events = c.Sim_context.events }
+
+(* Repõe no contexto os contadores guardados no checkpoint *)
+let restore_counters (ctx : Sim_context.t) (cp : t) =
+  let c = ctx.Sim_context.counters and saved = cp.counters in
+  c.Sim_context.queue_pushes <- saved.Sim_context.queue_pushes;
+  c.Sim_context.queue_pops <- saved.Sim_context.queue_pops;
+  c.Sim_context.preemptions <- saved.Sim_context.preemptions;
+  c.Sim_context.context_switches <- saved.Sim_context.context_switches;
+  c.Sim_context.events <- saved.Sim_context.events
+
+(* Ids únicos: sem isso os processos de um checkpoint não se encontram pelo id *)
+let unique_ids (processes : Process.t list) : bool =
+  let seen = Hashtbl.create 1024 in
+  List.for_all (fun (p : Process.t) ->
+    not (Hashtbl.mem seen p.Process.id) && (Hashtbl.replace seen p.Process.id (); true)
+  ) processes
+
+(* Mesmos campos fixos (os mutáveis são o estado da simulação) *)
+let same_process (a : Process.t) (b : Process.t) =
+  a.Process.id = b.Process.id
+  && a.Process.name = b.Process.name
+  && a.Process.arrival_time = b.Process.arrival_time
+  && a.Process.burst_time = b.Process.burst_time
+  && a.Process.priority = b.Process.priority
+  && a.Process.period = b.Process.period
+  && a.Process.deadline = b.Process.deadline
+  && a.Process.instance_of = b.Process.instance_of
+
+(* A mesma ordem do Scheduler.sort_by_arrival *)
+let by_arrival (processes : Process.t list) : Process.t array =
+  Array.of_list
+    (List.stable_sort (fun (a : Process.t) (b : Process.t) ->
+       compare a.Process.arrival_time b.Process.arrival_time) processes)
+
+(* Primeira chegada afetada por passar da carga old para a carga updated: na
+   primeira posição (por ordem de chegada) em que os processos diferem, a menor
+   das duas chegadas. max_int se as cargas forem iguais. *)
+let earliest_change (old : Process.t list) (updated : Process.t list) : int =
+  let a = by_arrival old and b = by_arrival updated in
+  let n = min (Array.length a) (Array.length b) in
+  let rec first i = if i < n && same_process a.(i) b.(i) then first (i + 1) else i in
+  let i = first 0 in
+  let arrival (ps : Process.t array) =
+    if i < Array.length ps then ps.(i).Process.arrival_time else max_int
+  in
+  min (arrival a) (arrival b)
+
+(* Intervalo entre checkpoints para cerca de count checkpoints por execução:
+   a simulação acaba antes da última chegada mais a soma dos bursts *)
+let interval ?(count = 64) (processes : Process.t list) : int =
+  let last, work =
+    List.fold_left (fun (last, work) (p : Process.t) ->
+      (max last p.Process.arrival_time, work + p.Process.burst_time)) (0, 0) processes
+  in
+  max 1 ((last + work) / max 1 count)
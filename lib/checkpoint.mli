@@ -0,0 +1,44 @@
+(** Checkpoints do motor para a re-simulação incremental: uma execução sobre uma
+    carga alterada retoma do último checkpoint anterior à primeira chegada afetada *)
+
+(** Processo vivo (na fila de prontos ou em execução) no instante do checkpoint *)
+type live = {
+  pid : int;
+  remaining : int;
+  state : Process.process_state;
+}
+
+(** Estado de uma política no topo do seu ciclo *)
+type t = {
+  time : int;
+  admitted : int;                   (** processos já admitidos, pela ordem de chegada *)
+  completed : int;                  (** processos terminados *)
+  ready : live array;               (** fila de prontos, pela ordem em que sairia *)
+  running : live option;            (** processo em execução *)
+  counters : Sim_context.counters;  (** cópia dos contadores do contexto *)
+  taken_off : (int * int option) option;
+      (** último processo tirado do CPU e ainda não substituído (ver Sim_context) *)
+}
+
+(** Checkpoints pedidos a uma política: um a cada [every] unidades de tempo simulado,
+    entregues a [save]; com [resume] a execução retoma desse checkpoint *)
+type config = {
+  every : int;
+  save : t -> unit;
+  resume : t option;
+}
+
+val copy_counters : Sim_context.counters -> Sim_context.counters
+
+(** Repõe no contexto os contadores guardados no checkpoint *)
+val restore_counters : Sim_context.t -> t -> unit
+
+(** Os checkpoints só servem para cargas com ids únicos *)
+val unique_ids : Process.t list -> bool
+
+(** Primeira chegada afetada por passar da primeira carga para a segunda
+    (max_int se forem iguais). Os checkpoints anteriores a ela servem para as duas. *)
+val earliest_change : Process.t list -> Process.t list -> int
+
+(** Intervalo entre checkpoints para cerca de [count] (por omissão 64) numa execução *)
+val interval : ?count:int -> Process.t list -> int
@@ -0,0 +1,35 @@
+(* Sinks prontos a usar com o ?sink das políticas do Scheduler.
+   Os eventos são escritos à medida que são produzidos, sem guardar o log. *)
+
+open Scheduler
+
+type t = Scheduler.sink
+
+(* Envia cada evento a vários sinks, pela ordem da lista *)
+let tee (sinks : t list) : t =
+  fun event -> List.iter (fun sink -> sink event) sinks
+
+(* Código numérico do estado, usado no formato binário *)
+let state_code (s : Process.process_state) : int =
+  match s with
+  | Process.Ready -> 0
+  | Process.Running -> 1
+  | Process.Waiting -> 2
+  | Process.Terminated -> 3
+
+(* Uma linha JSON por evento, ex:
+   {"time":3,"pid":2,"state":"Running","instance":null} *)
+let ndjson (oc : out_channel) : t =
+  fun event ->
+    Printf.fprintf oc "{\"time\":%d,\"pid\":%d,\"state\":\"%s\",\"instance\":%s}\n"
+      event.time event.process_id (Process.string_of_state event.new_state)
+      (match event.instance_id with Some iid -> string_of_int iid | None -> "null")
+
+(* Registos binários de largura fixa: 4 inteiros de 32 bits big-endian por evento
+   (tempo, pid, código do estado, instância ou -1) *)
+let binary (oc : out_channel) : t =
+  fun event ->
+    output_binary_int oc event.time;
+    output_binary_int oc event.process_id;
+    output_binary_int oc (state_code event.new_state);
+    output_binary_int oc (Option.value ~default:(-1) event.instance_id)
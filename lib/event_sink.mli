@@ -0,0 +1,15 @@
+(** Sinks para o stream de eventos das políticas *)
+
+type t = Scheduler.sink
+
+(** Envia cada evento a todos os sinks da lista *)
+val tee : t list -> t
+
+(** Código numérico do estado (0 Ready, 1 Running, 2 Waiting, 3 Terminated) *)
+val state_code : Process.process_state -> int
+
+(** Escreve uma linha JSON por evento no canal *)
+val ndjson : out_channel -> t
+
+(** Escreve um registo binário de 16 bytes por evento no canal *)
+val binary : out_channel -> t
@@ -83,46 +83,9 @@ let rec read_float_range prompt min max =
 (* Funções para ler dados de processos de um ficheiro. *)
 
 (*
- * processa_linha_dados: Tenta extrair os dados (id, inicio, burst, prioridade) de uma linha.
- * Argumentos:
- * linha_num: int - O número da linha atual (para mensagens de erro).
- * str_linha: string - O conteúdo da linha.
- * Retorna:
- * (int * int * int * int) option - Uma tupla com os 4 inteiros se sucesso, None se erro.
- * Formato esperado da linha: "id,arrival_time,burst_time,priority"
- *)
- let processa_linha_dados (linha_num : int) (str_linha : string) : (int * int * int * int) option =
-  try
-    match String.split_on_char ',' str_linha with
-    | [id_str; inicio_str; burst_str; priority_str] ->
-        let id_val = int_of_string (String.trim id_str) in
-        let inicio_val = int_of_string (String.trim inicio_str) in
-        let burst_val = int_of_string (String.trim burst_str) in
-        let priority_val = int_of_string (String.trim priority_str) in
-
-        (* Retorna a tupla com os dados extraídos, dentro de Some *)
-        Some (id_val, inicio_val, burst_val, priority_val)
-
-    | _ ->
-        Printf.eprintf
-          "Aviso: Linha %d ignorada - formato inválido (esperava 4 campos: id,inicio,burst,prioridade): %s\n"
-          linha_num str_linha;
-        None
-  with
-  | Failure msg -> (* Erro na conversão int_of_string *)
-      Printf.eprintf
-        "Aviso: Linha %d ignorada - erro na conversão de número (%s): %s\n"
-        linha_num msg str_linha;
-      None
-  | ex -> (* Outros erros *)
-      Printf.eprintf
-        "Aviso: Linha %d ignorada - erro inesperado (%s): %s\n"
-        linha_num (Printexc.to_string ex) str_linha;
-      None
-
-(*
- * ler_ficheiro_dados_processos: Lê um ficheiro linha a linha e retorna uma lista
+ * ler_ficheiro_dados_processos: Lê um ficheiro de processos (CSV ou binário) e retorna uma lista
  * de tuplas, cada uma contendo os dados (id, inicio, burst, prioridade) de uma linha válida.
+ * A leitura é feita pelo Workload numa só passagem; as linhas inválidas são resumidas num único aviso.
  * Argumentos:
  * nome_ficheiro: string - O caminho para o ficheiro a ser lido.
  * Retorna:
@@ -130,71 +93,15 @@ let rec read_float_range prompt min max =
  * Retorna lista vazia se o ficheiro não puder ser aberto ou não contiver linhas válidas.
  *)
 let ler_ficheiro_dados_processos (nome_ficheiro : string) : (int * int * int * int) list =
-  let lista_dados = ref [] in (* Acumulador para as tuplas de dados *)
-  let linha_num = ref 0 in
-  try
-    let ic = open_in nome_ficheiro in
-    try
-      while true do
-        let linha = input_line ic in
-        incr linha_num;
-        (* Chama a função que processa a linha e retorna a tupla de dados ou None *)
-        match processa_linha_dados !linha_num linha with
-        | Some dados_tupla -> lista_dados := dados_tupla :: !lista_dados (* Adiciona a tupla à lista *)
-        | None -> () (* Ignora linhas inválidas *)
-      done;
-      !lista_dados (* Unreachable code *)
-    with End_of_file ->
-      close_in ic;
-      List.rev !lista_dados (* Inverte para manter a ordem original *)
-  with Sys_error msg ->
+  try Workload.to_tuples (Workload.load nome_ficheiro)
+  with Sys_error msg | Failure msg ->
     Printf.eprintf "Erro ao abrir ou ler o ficheiro '%s': %s\n" nome_ficheiro msg;
     [] (* Retorna lista vazia em caso de erro *)
 
-    (*
- * processa_linha_dados_rt: Tenta extrair os dados (id, inicio, burst, periodo) de uma linha.
- * Argumentos:
- * linha_num: int - O número da linha atual (para mensagens de erro).
- * str_linha: string - O conteúdo da linha.
- * Retorna:
- * (int * int * int * int) option - Uma tupla com id, inicio, burst, periodo se sucesso, None se erro.
- * Formato esperado da linha: "id,arrival_time,burst_time,period"
- *)
-let processa_linha_dados_rt (linha_num : int) (str_linha : string) : (int * int * int * int) option =
-  try
-    match String.split_on_char ',' str_linha with
-    (* Atualizado para refletir que o 4º campo é periodo_str *)
-    | [id_str; inicio_str; burst_str; periodo_str] ->
-        let id_val = int_of_string (String.trim id_str) in
-        let inicio_val = int_of_string (String.trim inicio_str) in
-        let burst_val = int_of_string (String.trim burst_str) in
-        (* Converte o quarto campo como periodo_val *)
-        let periodo_val = int_of_string (String.trim periodo_str) in
-
-        (* Retorna a tupla com os dados extraídos (incluindo o período), dentro de Some *)
-        Some (id_val, inicio_val, burst_val, periodo_val)
-
-    | _ ->
-        Printf.eprintf
-          (* Mensagem de erro atualizada para mencionar 'periodo' *)
-          "Aviso: Linha %d ignorada - formato inválido (esperava 4 campos: id,inicio,burst,periodo): %s\n"
-          linha_num str_linha;
-        None
-  with
-  | Failure msg -> (* Erro na conversão int_of_string *)
-      Printf.eprintf
-        "Aviso: Linha %d ignorada - erro na conversão de número (%s): %s\n"
-        linha_num msg str_linha;
-      None
-  | ex -> (* Outros erros *)
-      Printf.eprintf
-        "Aviso: Linha %d ignorada - erro inesperado (%s): %s\n"
-        linha_num (Printexc.to_string ex) str_linha;
-      None
-
 (*
- * ler_ficheiro_dados_processos_rt: Lê um ficheiro linha a linha e retorna uma lista
- * de tuplas, cada uma contendo os dados (id, inicio, burst, periodo) de uma linha válida.
+ * ler_ficheiro_dados_processos_rt: Lê um ficheiro de processos de tempo real (CSV ou binário) e
+ * retorna uma lista de tuplas, cada uma contendo os dados (id, inicio, burst, periodo).
+ * O formato é o mesmo do ficheiro normal, com o período no 4º campo.
  * Argumentos:
  * nome_ficheiro: string - O caminho para o ficheiro a ser lido.
  * Retorna:
@@ -202,23 +109,4 @@ let processa_linha_dados_rt (linha_num : int) (str_linha : string) : (int * int
  * Retorna lista vazia se o ficheiro não puder ser aberto ou não contiver linhas válidas.
  *)
 let ler_ficheiro_dados_processos_rt (nome_ficheiro : string) : (int * int * int * int) list =
-  let lista_dados = ref [] in (* Acumulador para as tuplas de dados *)
-  let linha_num = ref 0 in
-  try
-    let ic = open_in nome_ficheiro in
-    try
-      while true do
-        let linha = input_line ic in
-        incr linha_num;
-        (* Chama a versão _rt da função que processa a linha *)
-        match processa_linha_dados_rt !linha_num linha with
-        | Some dados_tupla -> lista_dados := dados_tupla :: !lista_dados (* Adiciona a tupla à lista *)
-        | None -> () (* Ignora linhas inválidas *)
-      done;
-      !lista_dados (* Unreachable code *)
-    with End_of_file ->
-      close_in ic;
-      List.rev !lista_dados (* Inverte para manter a ordem original *)
-  with Sys_error msg ->
-    Printf.eprintf "Erro ao abrir ou ler o ficheiro '%s': %s\n" nome_ficheiro msg;
-    [] (* Retorna lista vazia em caso de erro *)
\ No newline at end of file
+  ler_ficheiro_dados_processos nome_ficheiro
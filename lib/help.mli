@@ -10,7 +10,5 @@ val read_float : string -> float
 val read_float_range : string -> float -> float -> float
 
 (* ler de um ficheiro *)
-val processa_linha_dados : int -> string -> (int * int * int * int) option
 val ler_ficheiro_dados_processos : string -> (int * int * int * int) list
-val processa_linha_dados_rt : int -> string -> (int * int * int * int) option
 val ler_ficheiro_dados_processos_rt : string -> (int * int * int * int) list
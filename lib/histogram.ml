@@ -0,0 +1,82 @@
+(* Histograma log-linear (estilo HDR) para estimar percentis com memória fixa.
+   Valores até 127 têm um balde cada (exatos); acima disso cada potência de 2
+   é dividida em 64 baldes, o que dá um erro relativo inferior a 1%.
+   O array de contagens só cresce até ao balde do maior valor visto
+   (no máximo ~3700 baldes para inteiros de 63 bits), por isso a memória
+   não depende do número de valores adicionados. *)
+
+type t = {
+  mutable counts : int array;
+  mutable total : int;
+  mutable min_value : int;
+  mutable max_value : int;
+}
+
+let exact_limit = 128   (* valores abaixo disto têm balde próprio *)
+let sub_buckets = 64    (* baldes por potência de 2 acima do limite *)
+
+let create () : t =
+  { counts = Array.make exact_limit 0; total = 0; min_value = max_int; max_value = 0 }
+
+(* Número de bits significativos de v (v > 0) *)
+let bit_length v =
+  let rec loop v n = if v = 0 then n else loop (v lsr 1) (n + 1) in
+  loop v 0
+
+(* Balde de um valor (>= 0) *)
+let bucket_of v =
+  if v < exact_limit then v
+  else
+    let shift = bit_length v - 7 in
+    let top = v lsr shift in           (* entre 64 e 127 *)
+    exact_limit + ((shift - 1) * sub_buckets) + (top - sub_buckets)
+
+(* Intervalo [menor, maior] de valores que caem no balde b *)
+let bucket_range b =
+  if b < exact_limit then (b, b)
+  else
+    let shift = ((b - exact_limit) / sub_buckets) + 1 in
+    let top = sub_buckets + ((b - exact_limit) mod sub_buckets) in
+    (top lsl shift, ((top + 1) lsl shift) - 1)
+
+(* Adiciona um valor (negativos contam como 0) *)
+let add (h : t) (v : int) : unit =
+  let v = max 0 v in
+  let b = bucket_of v in
+  if b >= Array.length h.counts then begin
+    let bigger = Array.make (b + 1) 0 in
+    Array.blit h.counts 0 bigger 0 (Array.length h.counts);
+    h.counts <- bigger
+  end;
+  h.counts.(b) <- h.counts.(b) + 1;
+  h.total <- h.total + 1;
+  if v < h.min_value then h.min_value <- v;
+  if v > h.max_value then h.max_value <- v
+
+let count (h : t) : int = h.total
+
+(* Percentil q (entre 0 e 1): valor médio do balde onde cai a posição ceil(q * total),
+   limitado ao mínimo e máximo vistos. 0.0 se o histograma estiver vazio. *)
+let quantile (h : t) (q : float) : float =
+  if h.total = 0 then 0.0
+  else begin
+    let rank = max 1 (min h.total (int_of_float (Float.ceil (q *. float_of_int h.total)))) in
+    let rec find b seen =
+      let seen = seen + h.counts.(b) in
+      if seen >= rank || b = Array.length h.counts - 1 then b else find (b + 1) seen
+    in
+    let lo, hi = bucket_range (find 0 0) in
+    let lo = max lo h.min_value and hi = min hi h.max_value in
+    (float_of_int lo +. float_of_int hi) /. 2.0
+  end
+
+let copy (h : t) : t = { h with counts = Array.copy h.counts }
+
+(* Repete times vezes o que foi adicionado desde a cópia previous
+   (usado quando a simulação extrapola hiperperíodos repetidos) *)
+let repeat_since (h : t) (previous : t) (times : int) : unit =
+  Array.iteri (fun b n ->
+    let before = if b < Array.length previous.counts then previous.counts.(b) else 0 in
+    h.counts.(b) <- n + ((n - before) * times)
+  ) h.counts;
+  h.total <- h.total + ((h.total - previous.total) * times)
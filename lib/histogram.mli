@@ -0,0 +1,21 @@
+(** Histograma log-linear (estilo HDR) para percentis com memória fixa *)
+
+type t
+
+val create : unit -> t
+
+(** Adiciona um valor (negativos contam como 0) *)
+val add : t -> int -> unit
+
+(** Número de valores adicionados *)
+val count : t -> int
+
+(** Percentil aproximado (q entre 0 e 1, ex: 0.95); erro relativo < 1% *)
+val quantile : t -> float -> float
+
+(** Cópia independente *)
+val copy : t -> t
+
+(** [repeat_since h previous times] repete [times] vezes os valores adicionados
+    a [h] desde a cópia [previous] *)
+val repeat_since : t -> t -> int -> unit
@@ -0,0 +1,34 @@
+(* Pool simples de domínios (OCaml 5) para correr execuções independentes em paralelo.
+   Cada resultado fica guardado na posição do seu índice, por isso o resultado
+   final é o mesmo qualquer que seja o domínio que correu cada execução. *)
+
+(* Número de domínios a usar por omissão (um por core disponível) *)
+let default_domains () = Domain.recommended_domain_count ()
+
+(* Calcula [f i] para i = 0 .. n-1 usando até [domains] domínios (incluindo o atual).
+   Cada domínio vai buscando o próximo índice livre a um contador atómico.
+   Se alguma chamada lançar uma exceção, as restantes deixam de ser iniciadas
+   e a primeira exceção é relançada depois de todos os domínios terminarem. *)
+let init ?(domains = default_domains ()) (n : int) (f : int -> 'a) : 'a array =
+  if n <= 0 then [||]
+  else begin
+    let results = Array.make n None in
+    let next = Atomic.make 0 in
+    let error = Atomic.make None in
+    let rec worker () =
+      let i = Atomic.fetch_and_add next 1 in
+      if i < n && Option.is_none (Atomic.get error) then begin
+        (match f i with
+         | v -> results.(i) <- Some v
+         | exception ex -> ignore (Atomic.compare_and_set error None (Some ex)));
+        worker ()
+      end
+    in
+    let helpers = List.init (max 0 (min domains n - 1)) (fun _ -> Domain.spawn worker) in
+    worker ();
+    List.iter Domain.join helpers;
+    (match Atomic.get error with
+     | Some ex -> raise ex
+     | None -> ());
+    Array.map (function Some v -> v | None -> failwith "Parallel.init: resultado em falta") results
+  end
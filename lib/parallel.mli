@@ -0,0 +1,2 @@
+val default_domains : unit -> int
+val init : ?domains:int -> int -> (int -> 'a) -> 'a array
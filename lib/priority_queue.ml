@@ -1,67 +1,167 @@
-(* Implementação de Fila de Prioridade usando uma Lista Ordenada. *)
+(* Implementação de Fila de Prioridade usando um heap binário (min-heap) sobre um array. *)
+
+(* Nó guardado no heap. Também serve de "handle" para remover um elemento
+   ou alterar a sua prioridade depois de inserido. *)
+type 'a handle = {
+  value : 'a;                 (* O elemento guardado *)
+  mutable priority : int;     (* Prioridade atual (menor valor = maior prioridade) *)
+  mutable seq : int;          (* Ordem de inserção: desempata prioridades iguais (FIFO) *)
+  mutable pos : int;          (* Posição atual no array, -1 se já não está na fila *)
+}
 
 (* ('a t) é o tipo da fila de prioridade para elementos do tipo 'a *)
 type 'a t = {
-  mutable items : 'a list;      (* Lista ordenada (menor valor de prioridade primeiro) *)
-  priority_func : 'a -> int;  (* Função que extrai o valor da prioridade de um elemento *)
+  mutable heap : 'a handle option array;  (* heap.(0) é sempre o elemento com maior prioridade *)
+  mutable count : int;             (* Número de elementos (as posições >= count ficam a None) *)
+  mutable next_seq : int;          (* Próximo número de sequência a atribuir *)
+  priority_func : 'a -> int;       (* Função que extrai o valor da prioridade de um elemento *)
 }
 
 (* Cria uma fila de prioridade vazia.
    Requer uma função que determine a prioridade (int) de um elemento ('a). *)
 let create (priority_func : 'a -> int) : 'a t =
-  { items = []; priority_func }
+  { heap = [||]; count = 0; next_seq = 0; priority_func }
 
-(* Verifica se a fila está vazia. *)
+(* Verifica se a fila está vazia. Complexidade: O(1). *)
 let is_empty (pq : 'a t) : bool =
-  pq.items = [] (* Mais idiomático e ligeiramente mais eficiente que List.length pq.items = 0 *)
+  pq.count = 0
+
+(* Devolve o número de elementos na fila. Complexidade: O(1). *)
+let size (pq : 'a t) : int =
+  pq.count
+
+(* a vem antes de b? Menor prioridade primeiro; em caso de empate, o mais antigo. *)
+let before a b =
+  a.priority < b.priority || (a.priority = b.priority && a.seq < b.seq)
+
+(* Nó na posição i (< count). As posições livres ficam a None, para que os nós
+   que saem da fila não fiquem presos no array e possam ser recolhidos pelo GC. *)
+let node pq i =
+  match pq.heap.(i) with
+  | Some n -> n
+  | None -> invalid_arg "Priority_queue: posição livre"
+
+(* Troca as posições i e j (as próprias opções mudam de sítio, sem alocar) *)
+let swap pq i j =
+  let a = pq.heap.(i) in
+  pq.heap.(i) <- pq.heap.(j);
+  pq.heap.(j) <- a;
+  (node pq i).pos <- i;
+  (node pq j).pos <- j
+
+(* Sobe o nó na posição i até repor a propriedade do heap *)
+let rec sift_up pq i =
+  if i > 0 then begin
+    let parent = (i - 1) / 2 in
+    if before (node pq i) (node pq parent) then begin
+      swap pq i parent;
+      sift_up pq parent
+    end
+  end
+
+(* Desce o nó na posição i até repor a propriedade do heap *)
+let rec sift_down pq i =
+  let left = (2 * i) + 1 in
+  if left < pq.count then begin
+    let right = left + 1 in
+    let child =
+      if right < pq.count && before (node pq right) (node pq left) then right else left
+    in
+    if before (node pq child) (node pq i) then begin
+      swap pq i child;
+      sift_down pq child
+    end
+  end
+
+(* Garante espaço para mais um elemento, duplicando a capacidade quando necessário *)
+let grow pq =
+  let capacity = Array.length pq.heap in
+  if pq.count = capacity then begin
+    let new_heap = Array.make (max 16 (2 * capacity)) None in
+    Array.blit pq.heap 0 new_heap 0 pq.count;
+    pq.heap <- new_heap
+  end
+
+(* Adiciona um item à fila e devolve o seu handle.
+   Complexidade: O(log n) (amortizado, por causa do crescimento do array). *)
+let push (pq : 'a t) (item : 'a) : 'a handle =
+  let h = { value = item; priority = pq.priority_func item; seq = pq.next_seq; pos = pq.count } in
+  pq.next_seq <- pq.next_seq + 1;
+  grow pq;
+  pq.heap.(pq.count) <- Some h;
+  pq.count <- pq.count + 1;
+  sift_up pq h.pos;
+  h
 
 (* Adiciona um item à fila, mantendo a ordem de prioridade.
-   Itens com menor valor numérico de prioridade ficam mais perto do início da lista.
-   Complexidade: O(n), onde n é o número de items na fila, pois pode percorrer a lista. *)
+   Itens com a mesma prioridade saem pela ordem em que entraram. *)
 let add (pq : 'a t) (item : 'a) : unit =
-  let priority = pq.priority_func item in
-  let rec insert_sorted current_list =
-    match current_list with
-    | [] -> [item] (* Se a lista está vazia, o novo item é a lista *)
-    | head :: tail ->
-        if priority <= pq.priority_func head then
-          item :: head :: tail (* Encontrou a posição: insere antes do 'head' *)
-        else
-          head :: insert_sorted tail (* Continua a procurar na cauda ('tail') *)
-  in
-  pq.items <- insert_sorted pq.items (* Atualiza a lista interna mutável *)
+  ignore (push pq item)
+
+(* Retira o nó na posição i, pondo o último no seu lugar; a posição que fica
+   livre no fim do array é limpa *)
+let remove_at pq i =
+  let removed = node pq i in
+  pq.count <- pq.count - 1;
+  let last = pq.heap.(pq.count) in
+  pq.heap.(pq.count) <- None;
+  if i < pq.count then begin
+    pq.heap.(i) <- last;
+    let moved = node pq i in
+    moved.pos <- i;
+    sift_down pq i;
+    sift_up pq moved.pos
+  end;
+  removed.pos <- -1;
+  removed
 
 (* Remove e devolve o elemento com maior prioridade (menor valor numérico).
    Lança Not_found se a fila estiver vazia.
-   Complexidade: O(1), pois o elemento está sempre na cabeça da lista. *)
+   Complexidade: O(log n). *)
 let take (pq : 'a t) : 'a =
-  match pq.items with
-  | [] -> raise Not_found (* Ou poderia devolver 'a option *)
-  | head :: tail ->
-      pq.items <- tail; (* Atualiza a lista removendo a cabeça *)
-      head
+  if pq.count = 0 then raise Not_found;
+  (remove_at pq 0).value
 
 (* Devolve (sem remover) o elemento com maior prioridade (menor valor numérico).
    Lança Not_found se a fila estiver vazia.
    Complexidade: O(1). *)
 let peek (pq : 'a t) : 'a =
-  match pq.items with
-  | [] -> raise Not_found (* Ou poderia devolver 'a option *)
-  | head :: _ -> head
+  if pq.count = 0 then raise Not_found;
+  (node pq 0).value
 
 (* Devolve (sem remover) o elemento com maior prioridade (menor valor numérico) como opção.
    Devolve None se a fila estiver vazia.
    Complexidade: O(1). *)
 let peek_opt (pq : 'a t) : 'a option =
-  match pq.items with
-  | [] -> None
-  | h :: _ -> Some h
+  if pq.count = 0 then None else Some (node pq 0).value
 
-(* Devolve o número de elementos na fila.
-   Complexidade: O(n) para List.length. Se for chamado frequentemente,
-   poderia manter-se um campo 'size' mutável para ter O(1). *)
-let size (pq : 'a t) : int =
-  List.length pq.items
+(* Indica se o handle ainda está nesta fila (um handle de outra fila nunca está) *)
+let mem (pq : 'a t) (h : 'a handle) : bool =
+  h.pos >= 0 && h.pos < pq.count && node pq h.pos == h
+
+(* Remove da fila o elemento do handle. Não faz nada se já tiver saído (ou se o
+   handle for de outra fila).
+   Complexidade: O(log n). *)
+let remove (pq : 'a t) (h : 'a handle) : unit =
+  if mem pq h then ignore (remove_at pq h.pos)
 
+(* Muda a prioridade do elemento do handle, mantendo a sua posição de desempate.
+   Complexidade: O(log n). *)
+let update (pq : 'a t) (h : 'a handle) (priority : int) : unit =
+  if mem pq h then begin
+    h.priority <- priority;
+    sift_up pq h.pos;
+    sift_down pq h.pos
+  end
+
+(* Verifica se algum elemento satisfaz o predicado. Complexidade: O(n). *)
 let exists (pq : 'a t) (pred : 'a -> bool) : bool =
-  List.exists pred pq.items
\ No newline at end of file
+  let rec loop i = i < pq.count && (pred (node pq i).value || loop (i + 1)) in
+  loop 0
+
+(* Devolve os elementos pela ordem em que sairiam da fila, sem os remover.
+   Complexidade: O(n log n). *)
+let to_list (pq : 'a t) : 'a list =
+  let nodes = Array.init pq.count (node pq) in
+  Array.sort (fun a b -> if before a b then -1 else if before b a then 1 else 0) nodes;
+  Array.to_list (Array.map (fun node -> node.value) nodes)
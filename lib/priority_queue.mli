@@ -1,9 +1,19 @@
-type 'a t = { mutable items : 'a list; priority_func : 'a -> int; }
+(** Handle de um elemento inserido com push: permite removê-lo ou mudar a sua prioridade *)
+type 'a handle
+
+(** Fila de prioridade (heap binário); menor prioridade sai primeiro, empates por ordem de inserção *)
+type 'a t
+
 val create : ('a -> int) -> 'a t
 val is_empty : 'a t -> bool
 val add : 'a t -> 'a -> unit
+val push : 'a t -> 'a -> 'a handle
 val take : 'a t -> 'a
 val peek : 'a t -> 'a
 val peek_opt : 'a t -> 'a option
 val size : 'a t -> int
+val mem : 'a t -> 'a handle -> bool
+val remove : 'a t -> 'a handle -> unit
+val update : 'a t -> 'a handle -> int -> unit
 val exists : 'a t -> ('a -> bool) -> bool
+val to_list : 'a t -> 'a list
@@ -13,6 +13,7 @@ type t = {
   mutable turnaround_time : int option; (*tempo desde que o processo aparece até acabar *)
   period : int option; (* para o rate monotonic (tempo real)*)
   deadline : int option; (*tempo limite onde precisa ser executado (usado no EDF e para a estatistica deadlines missed)*)
+  instance_of : int option; (* id da tarefa periódica de onde veio esta instância (None se não for instância) *)
 }
 
 let string_of_state (s : process_state) : string =
@@ -45,6 +46,7 @@ let create  (*~ significa argumento obrigatorio e ? significa opcional (e podes
     turnaround_time = None;
     period;
     deadline;
+    instance_of = None;
   }
 
 (* Funções auxiliares *)
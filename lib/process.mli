@@ -12,6 +12,7 @@ type t = {
   mutable turnaround_time : int option;
   period : int option;
   deadline : int option;
+  instance_of : int option;
 }
 val string_of_state : process_state -> string
 val create :
@@ -1,7 +1,7 @@
-val prioridade_ponderada : unit -> int
+val prioridade_ponderada : Random.State.t -> int
 
-val generate_processes : int -> (int * int * int * int) list
-val generate_processes_rt : int -> (int * int * int * int) list
+val generate_processes : ?st:Random.State.t -> int -> (int * int * int * int) list
+val generate_processes_rt : ?st:Random.State.t -> int -> (int * int * int * int) list
 
-val generate_processes_exp : int -> (int * int * int * int) list
-val generate_processes_rt_exp : int -> (int * int * int * int) list
+val generate_processes_exp : ?st:Random.State.t -> int -> (int * int * int * int) list
+val generate_processes_rt_exp : ?st:Random.State.t -> int -> (int * int * int * int) list
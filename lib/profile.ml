@@ -0,0 +1,49 @@
+(* Medição das fases de uma execução para o --profile: tempos com relógio
+   monotónico e contadores do GC desde o início da medição. Cada fase custa
+   duas leituras do relógio, por isso pode ficar ligado em produção.
+   O relógio vem do mtime (o Unix do OCaml só tem gettimeofday, que pode andar
+   para trás se a hora do sistema for acertada). *)
+
+let monotonic_ns () : int64 = Mtime_clock.now_ns ()
+
+type t = {
+  started : int64;
+  gc_start : Gc.stat;
+  mutable phases : (string * int64) list;  (* nanossegundos por fase, pela ordem inversa *)
+}
+
+let create () : t = { started = monotonic_ns (); gc_start = Gc.quick_stat (); phases = [] }
+
+let ms ns = Int64.to_float ns /. 1e6
+
+(* Corre f e soma a sua duração à fase name (mesmo que f lance uma exceção) *)
+let time (p : t) (name : string) (f : unit -> 'a) : 'a =
+  let start = monotonic_ns () in
+  Fun.protect f ~finally:(fun () ->
+    let elapsed = Int64.sub (monotonic_ns ()) start in
+    p.phases <-
+      (if List.mem_assoc name p.phases then
+         List.map (fun (n, ns) -> if n = name then (n, Int64.add ns elapsed) else (n, ns)) p.phases
+       else (name, elapsed) :: p.phases))
+
+(* Duração de cada fase em milissegundos, pela ordem em que começaram *)
+let phases_ms (p : t) : (string * float) list =
+  List.rev_map (fun (name, ns) -> (name, ms ns)) p.phases
+
+(* Tempo total desde create, em milissegundos *)
+let total_ms (p : t) : float = ms (Int64.sub (monotonic_ns ()) p.started)
+
+(* Contadores do GC desde create (o tamanho do heap é o atual e o pico) *)
+let gc_counters (p : t) : (string * float) list =
+  let now = Gc.quick_stat () in
+  let s = p.gc_start in
+  [
+    ("minor_words", now.Gc.minor_words -. s.Gc.minor_words);
+    ("promoted_words", now.Gc.promoted_words -. s.Gc.promoted_words);
+    ("major_words", now.Gc.major_words -. s.Gc.major_words);
+    ("minor_collections", float_of_int (now.Gc.minor_collections - s.Gc.minor_collections));
+    ("major_collections", float_of_int (now.Gc.major_collections - s.Gc.major_collections));
+    ("compactions", float_of_int (now.Gc.compactions - s.Gc.compactions));
+    ("heap_words", float_of_int now.Gc.heap_words);
+    ("top_heap_words", float_of_int now.Gc.top_heap_words);
+  ]
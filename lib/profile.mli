@@ -0,0 +1,21 @@
+(** Tempos por fase (relógio monotónico) e contadores do GC para o --profile *)
+
+type t
+
+(** Relógio monotónico, em nanossegundos *)
+val monotonic_ns : unit -> int64
+
+(** Começa uma medição *)
+val create : unit -> t
+
+(** [time p name f] corre [f] e soma a sua duração à fase [name] *)
+val time : t -> string -> (unit -> 'a) -> 'a
+
+(** Duração de cada fase em milissegundos, pela ordem em que começaram *)
+val phases_ms : t -> (string * float) list
+
+(** Milissegundos desde [create] *)
+val total_ms : t -> float
+
+(** Contadores do GC desde [create] (heap_words e top_heap_words são absolutos) *)
+val gc_counters : t -> (string * float) list
@@ -1,32 +1,43 @@
-(* Inicializa o gerador de aleatórios com uma semente *)
-let () = Random.self_init ()
+(* Todas as funções recebem o estado do gerador (Random.State.t) da execução,
+   em vez de usarem o gerador global: execuções em paralelo não partilham estado. *)
 
 (* Exponencial: usa inversa da função de distribuição acumulada (CDF) *)
-let exponential lambda =
-  let u = Random.float 1.0 in
+let exponential st lambda =
+  let u = Random.State.float st 1.0 in
   -. (log (1.0 -. u)) /. lambda
 
 (* Poisson: usa método de Knuth *)
-let poisson lambda =
+let poisson st lambda =
   let l = exp (-.lambda) in
   let rec loop k p =
     if p <= l then k - 1
-    else loop (k + 1) (p *. Random.float 1.0)
+    else loop (k + 1) (p *. Random.State.float st 1.0)
   in
   loop 0 1.0
 
 (* Normal: método Box-Muller *)
-let normal ~mu ~sigma =
-  let u1 = Random.float 1.0 in
-  let u2 = Random.float 1.0 in
+let normal st ~mu ~sigma =
+  let u1 = Random.State.float st 1.0 in
+  let u2 = Random.State.float st 1.0 in
   let z0 = sqrt (-2.0 *. log u1) *. cos (2.0 *. Float.pi *. u2) in
   mu +. sigma *. z0
 
 (* Uniforme: entre min e max *)
-let uniforme min max =
-  min + Random.int (max - min + 1)
+let uniforme st min max =
+  min + Random.State.int st (max - min + 1)
 
 (* Prioridade ponderada: por exemplo, 70% chance de ser prioridade 1, 30% de ser prioridade 2 *)
-let prioridade_ponderada () =
-  let r = Random.float 1.0 in
-  if r < 0.7 then 1 else 2
\ No newline at end of file
+let prioridade_ponderada st =
+  let r = Random.State.float st 1.0 in
+  if r < 0.7 then 1 else 2
+
+(* Semente nova (30 bits), usada quando o utilizador não indica --seed.
+   É devolvida para poder ser mostrada e a execução repetida. *)
+let fresh_seed () =
+  Random.State.bits (Random.State.make_self_init ())
+
+(* Stream independente derivada da semente e de uma chave (ex: repetição, nº de processos).
+   A mesma (semente, chave) dá sempre a mesma sequência, seja qual for a ordem
+   ou o domínio em que as execuções correm. *)
+let stream ~seed (key : int list) : Random.State.t =
+  Random.State.make (Array.of_list (seed :: key))
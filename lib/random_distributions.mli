@@ -1,14 +1,22 @@
+(** Todas as funções recebem o estado do gerador da execução ([Random.State.t]) *)
+
 (** Gera um valor exponencial com parâmetro lambda *)
-val exponential : float -> float
+val exponential : Random.State.t -> float -> float
 
 (** Gera um valor Poisson com parâmetro lambda *)
-val poisson : float -> int
+val poisson : Random.State.t -> float -> int
 
 (** Gera um valor normal (Gaussiano) com média [mu] e desvio padrão [sigma] *)
-val normal : mu:float -> sigma:float -> float
+val normal : Random.State.t -> mu:float -> sigma:float -> float
 
 (** Gera um valor inteiro uniforme entre [min] e [max] (inclusive) *)
-val uniforme : int -> int -> int
+val uniforme : Random.State.t -> int -> int -> int
 
 (** Gera uma prioridade ponderada (exemplo: 70% chance de ser 1, 30% de ser 2) *)
-val prioridade_ponderada : unit -> int
\ No newline at end of file
+val prioridade_ponderada : Random.State.t -> int
+
+(** Gera uma semente nova (para quando não é indicada nenhuma) *)
+val fresh_seed : unit -> int
+
+(** Cria o gerador determinado pela semente [seed] e pela chave dada *)
+val stream : seed:int -> int list -> Random.State.t
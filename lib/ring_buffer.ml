@@ -0,0 +1,44 @@
+(* Fila FIFO sobre um array circular: push e pop em O(1) (amortizado no crescimento).
+   Usada como fila de prontos do Round Robin. As posições livres ficam a None, para
+   que os elementos que saem da fila possam ser recolhidos pelo GC. *)
+
+type 'a t = {
+  mutable data : 'a option array;   (* data.(head) é o elemento mais antigo *)
+  mutable head : int;
+  mutable length : int;
+}
+
+let create () : 'a t = { data = [||]; head = 0; length = 0 }
+
+let is_empty (q : 'a t) : bool = q.length = 0
+
+let length (q : 'a t) : int = q.length
+
+(* Duplica a capacidade, copiando os elementos por ordem para o início do novo array *)
+let grow q =
+  let capacity = Array.length q.data in
+  let new_data = Array.make (max 16 (2 * capacity)) None in
+  for i = 0 to q.length - 1 do
+    new_data.(i) <- q.data.((q.head + i) mod capacity)
+  done;
+  q.data <- new_data;
+  q.head <- 0
+
+(* Acrescenta um elemento ao fim da fila *)
+let push (q : 'a t) (x : 'a) : unit =
+  if q.length = Array.length q.data then grow q;
+  q.data.((q.head + q.length) mod Array.length q.data) <- Some x;
+  q.length <- q.length + 1
+
+(* Remove e devolve o elemento do início da fila. Lança Not_found se estiver vazia. *)
+let pop (q : 'a t) : 'a =
+  if q.length = 0 then raise Not_found;
+  let x = q.data.(q.head) in
+  q.data.(q.head) <- None;
+  q.head <- (q.head + 1) mod Array.length q.data;
+  q.length <- q.length - 1;
+  Option.get x
+
+(* Elementos pela ordem em que sairiam da fila, sem os remover *)
+let to_list (q : 'a t) : 'a list =
+  List.init q.length (fun i -> Option.get q.data.((q.head + i) mod Array.length q.data))
@@ -0,0 +1,16 @@
+(** Fila FIFO sobre um array circular (push/pop em O(1)) *)
+
+type 'a t
+
+val create : unit -> 'a t
+val is_empty : 'a t -> bool
+val length : 'a t -> int
+
+(** Acrescenta ao fim da fila *)
+val push : 'a t -> 'a -> unit
+
+(** Remove e devolve o primeiro elemento; lança [Not_found] se a fila estiver vazia *)
+val pop : 'a t -> 'a
+
+(** Elementos pela ordem em que sairiam da fila, sem os remover *)
+val to_list : 'a t -> 'a list
@@ -0,0 +1,247 @@
+open Process
+
+(* Testes analíticos de escalonabilidade para rm e edf, sem simular.
+
+   Cada tarefa periódica tem offset (chegada da primeira instância), custo C (burst),
+   período T e deadline relativo D (cada instância libertada em t tem deadline t + D,
+   como nos motores do Scheduler).
+
+   Os testes assumem a libertação síncrona (todas as tarefas no mesmo instante),
+   que é o pior caso: um "escalonável" vale para quaisquer offsets. Um "não
+   escalonável" só é exato se as tarefas forem síncronas; com offsets diferentes
+   (ou, no rm, períodos iguais, que o simulador alterna tick a tick) o resultado
+   passa a inconclusivo e é preciso simular. *)
+
+type verdict = Schedulable | Unschedulable | Inconclusive
+
+type task = {
+  task_id : int;
+  offset : int;
+  wcet : int;
+  period : int;
+  deadline : int;
+}
+
+type task_result = {
+  task : task;
+  response_time : int option;  (* pior tempo de resposta (None: não calculado ou ilimitado) *)
+}
+
+type report = {
+  utilization : float;
+  liu_layland_bound : float option;  (* só no rm *)
+  tests : (string * verdict) list;   (* cada teste feito, pela ordem *)
+  tasks : task_result list;
+  verdict : verdict;
+}
+
+let string_of_verdict = function
+  | Schedulable -> "schedulable"
+  | Unschedulable -> "unschedulable"
+  | Inconclusive -> "inconclusive"
+
+(* Limites para não ficar preso em períodos de ocupado enormes: acima disto o teste
+   é inconclusivo *)
+let max_busy_period = 1 lsl 40
+let max_demand_points = 1_000_000
+
+(* Margem nas comparações da utilização (soma de floats) com 1 e com o limite de
+   Liu & Layland: dentro da margem decidem os testes exatos *)
+let epsilon = 1e-9
+
+(* Tarefas periódicas a partir dos processos (None se algum não for periódico) *)
+let tasks_of_processes (processes : t list) : task list option =
+  let rec loop acc (ps : t list) =
+    match ps with
+    | [] -> Some (List.rev acc)
+    | { id; arrival_time; burst_time; period = Some period; deadline = Some deadline; _ } :: rest
+      when period > 0 && burst_time >= 0 && deadline > 0 ->
+        loop ({ task_id = id; offset = arrival_time; wcet = burst_time; period; deadline } :: acc) rest
+    | _ -> None
+  in
+  loop [] processes
+
+let utilization (tasks : task list) : float =
+  List.fold_left (fun acc t -> acc +. (float_of_int t.wcet /. float_of_int t.period)) 0.0 tasks
+
+(* Limite de Liu & Layland para n tarefas: n (2^(1/n) - 1) *)
+let liu_layland (n : int) : float =
+  if n = 0 then 1.0
+  else float_of_int n *. ((2.0 ** (1.0 /. float_of_int n)) -. 1.0)
+
+let synchronous tasks =
+  match tasks with
+  | [] -> true
+  | t :: rest -> List.for_all (fun u -> u.offset = t.offset) rest
+
+let ceil_div a b = (a + b - 1) / b
+
+(* Menor ponto fixo de w = base + soma de ceil(w / T) * C das tarefas dadas,
+   a partir de start (None se passar de max_busy_period) *)
+let fixed_point base interfering start =
+  let rec iterate w =
+    let next =
+      List.fold_left (fun acc t -> acc + (ceil_div w t.period * t.wcet)) base interfering
+    in
+    if next > max_busy_period then None
+    else if next = w then Some w
+    else iterate next
+  in
+  iterate (max start 1)
+
+(* Análise do tempo de resposta (rm, prioridade pelo período) da primeira
+   instância no instante crítico: R = C + soma de ceil(R / T) * C das tarefas com
+   período menor ou igual. As tarefas com período igual contam como interferência,
+   o que majora a alternância tick a tick do simulador. None se não convergir. *)
+let response_time (tasks : task list) (ti : task) : int option =
+  let higher = List.filter (fun t -> t != ti && t.period <= ti.period) tasks in
+  if utilization (ti :: higher) > 1.0 +. epsilon then None
+  else fixed_point ti.wcet higher ti.wcet
+
+(* Procura o primeiro deadline absoluto d (até limit) em que a procura do
+   processador excede d: soma de (floor((d - D) / T) + 1) * C. *)
+let demand_ok (tasks : task list) (limit : int) : verdict =
+  let points = ref [] in
+  let count = ref 0 in
+  (try
+     List.iter (fun t ->
+       let d = ref t.deadline in
+       while !d <= limit do
+         incr count;
+         if !count > max_demand_points then raise Exit;
+         points := !d :: !points;
+         d := !d + t.period
+       done
+     ) tasks
+   with Exit -> ());
+  if !count > max_demand_points then Inconclusive
+  else
+    let demand d =
+      List.fold_left (fun acc t ->
+        if d < t.deadline then acc else acc + ((((d - t.deadline) / t.period) + 1) * t.wcet)
+      ) 0 tasks
+    in
+    if List.exists (fun d -> demand d > d) (List.sort_uniq compare !points) then Unschedulable
+    else Schedulable
+
+(* Pior tempo de resposta no EDF (Spuri): dentro do período de ocupado síncrono
+   de comprimento busy, uma instância de ti libertada em a (só interessam os a em
+   que um deadline absoluto de alguma tarefa coincide com a + D) termina no fim do
+   período de ocupado com deadlines até a + D:
+     L(a) = (1 + floor(a / T)) * C + soma, das outras tarefas com D' <= a + D,
+            de min(ceil(L / T'), 1 + floor((a + D - D') / T')) * C'
+   e o tempo de resposta é o maior max(C, L(a) - a). Os deadlines iguais contam
+   como interferência, o que majora a alternância tick a tick do simulador.
+   None se houver demasiados pontos ou o ponto fixo não convergir. *)
+let edf_response_time (tasks : task list) (busy : int) (ti : task) : int option =
+  let points = ref [] in
+  let count = ref 0 in
+  (try
+     List.iter (fun t ->
+       (* primeiro k com k T' + D' - D >= 0 *)
+       let first = if t.deadline >= ti.deadline then 0 else ceil_div (ti.deadline - t.deadline) t.period in
+       let a = ref ((first * t.period) + t.deadline - ti.deadline) in
+       while !a < busy do
+         incr count;
+         if !count > max_demand_points then raise Exit;
+         points := !a :: !points;
+         a := !a + t.period
+       done
+     ) tasks
+   with Exit -> ());
+  if !count > max_demand_points then None
+  else
+    let finish a =
+      let own = (1 + (a / ti.period)) * ti.wcet in
+      let others = List.filter (fun t -> t != ti && t.deadline <= a + ti.deadline) tasks in
+      let rec iterate w =
+        let next =
+          List.fold_left (fun acc t ->
+            acc + (min (ceil_div w t.period) (1 + ((a + ti.deadline - t.deadline) / t.period)) * t.wcet)
+          ) own others
+        in
+        if next > max_busy_period then None
+        else if next = w then Some w
+        else iterate next
+      in
+      iterate own
+    in
+    List.fold_left (fun acc a ->
+      match acc, finish a with
+      | Some r, Some l -> Some (max r (max ti.wcet (l - a)))
+      | _ -> None
+    ) (Some ti.wcet) (List.sort_uniq compare !points)
+
+(* Resultado final: o primeiro teste conclusivo decide *)
+let decide tests =
+  match List.find_opt (fun (_, v) -> v <> Inconclusive) tests with
+  | Some (_, v) -> v
+  | None -> Inconclusive
+
+(* Rate Monotonic: utilização > 1, limite de Liu & Layland e análise do tempo de resposta *)
+let analyze_rm (tasks : task list) : report =
+  let u = utilization tasks in
+  let bound = liu_layland (List.length tasks) in
+  let results = List.map (fun t -> { task = t; response_time = response_time tasks t }) tasks in
+  let rta =
+    (* se uma instância não terminar dentro do período, a seguinte da mesma tarefa
+       alterna com ela no simulador e a análise deixa de ser exata *)
+    let within limit r = match r.response_time with Some rt -> rt <= limit | None -> false in
+    if List.for_all (fun r -> within (min r.task.deadline r.task.period) r) results then Schedulable
+    else
+      let distinct_periods =
+        List.length (List.sort_uniq compare (List.map (fun t -> t.period) tasks)) = List.length tasks
+      in
+      let misses = List.exists (fun r -> r.response_time <> None && not (within r.task.deadline r)) results in
+      (* com offsets ou períodos iguais a análise só majora os tempos de resposta *)
+      if misses && synchronous tasks && distinct_periods then Unschedulable else Inconclusive
+  in
+  let tests = [
+    ("utilization", if u > 1.0 +. epsilon then Unschedulable else Inconclusive);
+    ("liu_layland", if u <= bound -. epsilon then Schedulable else Inconclusive);
+    ("response_time", rta);
+  ] in
+  { utilization = u; liu_layland_bound = Some bound; tests; tasks = results; verdict = decide tests }
+
+(* EDF: utilização (exata quando D >= T), análise da procura do processador e
+   tempos de resposta de Spuri *)
+let analyze_edf (tasks : task list) : report =
+  let u = utilization tasks in
+  let implicit = List.for_all (fun t -> t.deadline >= t.period) tasks in
+  let utilization_test =
+    if u > 1.0 +. epsilon then Unschedulable
+    else if implicit && u <= 1.0 -. epsilon then Schedulable
+    else Inconclusive
+  in
+  (* período de ocupado síncrono *)
+  let busy =
+    if u > 1.0 +. epsilon || tasks = [] then None
+    else fixed_point 0 tasks (List.fold_left (fun acc t -> acc + t.wcet) 0 tasks)
+  in
+  let demand_test =
+    if u > 1.0 +. epsilon then Unschedulable
+    else if tasks = [] then Schedulable
+    else
+      (* basta verificar os deadlines dentro do período de ocupado síncrono *)
+      match busy with
+      | None -> Inconclusive
+      | Some busy ->
+          (match demand_ok tasks busy with
+           | Unschedulable when not (synchronous tasks) -> Inconclusive
+           | v -> v)
+  in
+  let tests = [("utilization", utilization_test); ("processor_demand", demand_test)] in
+  let results =
+    List.map (fun t ->
+      { task = t; response_time = Option.bind busy (fun busy -> edf_response_time tasks busy t) }
+    ) tasks
+  in
+  { utilization = u; liu_layland_bound = None; tests; tasks = results; verdict = decide tests }
+
+(* Análise para o algoritmo dado ("rm" ou "edf"). None se não se aplicar
+   (outro algoritmo ou processos não periódicos). *)
+let analyze (algo : string) (processes : t list) : report option =
+  match algo, tasks_of_processes processes with
+  | "rm", Some tasks -> Some (analyze_rm tasks)
+  | "edf", Some tasks -> Some (analyze_edf tasks)
+  | _ -> None
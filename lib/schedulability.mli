@@ -0,0 +1,44 @@
+(** Testes analíticos de escalonabilidade para rm e edf (sem simular) *)
+
+type verdict = Schedulable | Unschedulable | Inconclusive
+
+(** Tarefa periódica: offset, custo (burst), período e deadline relativo *)
+type task = {
+  task_id : int;
+  offset : int;
+  wcet : int;
+  period : int;
+  deadline : int;
+}
+
+type task_result = {
+  task : task;
+  response_time : int option;  (** pior tempo de resposta (None: não calculado ou ilimitado) *)
+}
+
+type report = {
+  utilization : float;
+  liu_layland_bound : float option;
+  tests : (string * verdict) list;
+  tasks : task_result list;
+  verdict : verdict;
+}
+
+val string_of_verdict : verdict -> string
+
+(** Tarefas a partir dos processos (None se algum não for periódico) *)
+val tasks_of_processes : Process.t list -> task list option
+
+val utilization : task list -> float
+
+(** Limite de Liu & Layland para n tarefas *)
+val liu_layland : int -> float
+
+(** Utilização, Liu & Layland e análise do tempo de resposta *)
+val analyze_rm : task list -> report
+
+(** Utilização, análise da procura do processador e tempos de resposta (Spuri) *)
+val analyze_edf : task list -> report
+
+(** Análise para "rm" ou "edf"; None para outros algoritmos ou processos não periódicos *)
+val analyze : string -> Process.t list -> report option
@@ -1,15 +1,13 @@
 open Process
 
-(* Global variables for instance tracking *)
-let all_instances = ref []
-let completed_instances = ref []
-let next_instance_id = ref 1000
+(* O estado de cada execução (instâncias, índice) vive num Sim_context.t.
+   Sem ~ctx usa-se Sim_context.default, só para uso sequencial. *)
 
 (* Function to get completed instances - for use in statistics *)
-let get_completed_instances () = !completed_instances
+let get_completed_instances ?(ctx = Sim_context.default) () = ctx.Sim_context.completed_instances
 
 (* Function to get all instances - for use in statistics *)
-let get_all_instances () = !all_instances
+let get_all_instances ?(ctx = Sim_context.default) () = ctx.Sim_context.all_instances
 
 type timeline_event = {
   time : int;
@@ -18,6 +16,9 @@ type timeline_event = {
   instance_id : int option; (* Para identificar instâncias de processos periódicos *)
 }
 
+(* Destino dos eventos: função chamada com cada evento, pela ordem do tempo *)
+type sink = timeline_event -> unit
+
 (* Função auxiliar para obter o valor de uma opção ou lançar erro *)
 let get_option_value opt err_msg =
   match opt with
@@ -25,16 +26,16 @@ let get_option_value opt err_msg =
   | None -> failwith err_msg
 
 (* Function to generate next instance ID *)
-let get_next_instance_id () =
-  let current = !next_instance_id in
-  incr next_instance_id;
+let get_next_instance_id ?(ctx = Sim_context.default) () =
+  let current = ctx.Sim_context.next_instance_id in
+  ctx.Sim_context.next_instance_id <- current + 1;
   current
 
 (* Função auxiliar para gerar ID estruturado para instância de processo periódico *)
 let get_structured_instance_id process_id instance_count =
   (process_id * 1000) + instance_count
 
-let gerar_instancias_periodicas processos tempo_max =
+let gerar_instancias_periodicas ?(ctx = Sim_context.default) processos tempo_max =
   let instancias = ref [] in
   List.iter (fun p ->
     match p.period, p.deadline with
@@ -44,6 +45,7 @@ let gerar_instancias_periodicas processos tempo_max =
             let instance_id = get_structured_instance_id p.id instance_count in
             let nova_inst = { p with
               id = instance_id;
+              instance_of = Some p.id;
               name = p.name ^ "_inst" ^ string_of_int instance_count;
               arrival_time = t;
               deadline = Some (t + dl);
@@ -62,48 +64,255 @@ let gerar_instancias_periodicas processos tempo_max =
         gera p.arrival_time 1
     | _ -> instancias := p :: !instancias
   ) processos;
+  ctx.Sim_context.all_instances <- !instancias;
   !instancias
 
-let log_event schedule_log t pid state =
-  schedule_log := { time = t; process_id = pid; new_state = state; instance_id = None } :: !schedule_log
-
-let log_event_with_instance schedule_log t pid state instance_id =
-  let display_id = 
-    if instance_id >= 1000 then
-      (* For real-time instances, use the original process ID stored in priority *)
-      (match List.find_opt (fun p -> p.id = instance_id) !all_instances with
-       | Some p -> p.priority  (* priority contains original process ID *)
-       | None -> pid)
-    else 
-      pid
+(* Índice id -> processo da execução (ctx.process_index), reconstruído no início
+   de cada política. Permite encontrar em O(1) o processo ou instância a que um
+   evento se refere. *)
+let index_processes ?(ctx = Sim_context.default) processes =
+  let index = ctx.Sim_context.process_index in
+  Hashtbl.reset index;
+  List.iter (fun p -> Hashtbl.replace index p.id p) processes
+
+let find_process ?(ctx = Sim_context.default) id = Hashtbl.find_opt ctx.Sim_context.process_index id
+
+(* ID a mostrar: o da tarefa original no caso de instâncias periódicas *)
+let display_id ?(ctx = Sim_context.default) id =
+  match find_process ~ctx id with
+  | Some { instance_of = Some original; _ } -> original
+  | _ -> id
+
+(* Destino dos eventos de uma política: o sink dado pelo chamador (callback, escritor
+   NDJSON/binário, estatísticas...) ou, sem sink, uma lista devolvida no fim como antes.
+   Com sink a lista devolvida fica vazia e a memória não cresce com o horizonte.
+   Cada evento também conta nos contadores do contexto (eventos, trocas de contexto
+   e preempções). Só há preempção quando o processo tirado do CPU (Ready) é
+   substituído por outro: no rr, um processo sozinho volta a correr no fim do
+   quantum sem contar. O último processo tirado do CPU fica no contexto
+   (ctx.taken_off), para os checkpoints o guardarem com os contadores. *)
+let event_output ?(ctx = Sim_context.default) (sink : sink option) =
+  let c = ctx.Sim_context.counters in
+  ctx.Sim_context.taken_off <- None;
+  let count ev =
+    c.events <- c.events + 1;
+    match ev.new_state with
+    | Running ->
+        c.context_switches <- c.context_switches + 1;
+        (match ctx.Sim_context.taken_off with
+         | Some key when key <> (ev.process_id, ev.instance_id) -> c.preemptions <- c.preemptions + 1
+         | _ -> ());
+        ctx.Sim_context.taken_off <- None
+    | Ready when ev.process_id <> -1 -> ctx.Sim_context.taken_off <- Some (ev.process_id, ev.instance_id)
+    | _ -> ()
+  in
+  match sink with
+  | Some emit -> ((fun ev -> count ev; emit ev), fun () -> [])
+  | None ->
+      let schedule_log = ref [] in
+      ((fun ev -> count ev; schedule_log := ev :: !schedule_log), fun () -> List.rev !schedule_log)
+
+(* Operações na fila de prontos, contadas no contexto *)
+let push ctx queue p =
+  let c = ctx.Sim_context.counters in
+  c.queue_pushes <- c.queue_pushes + 1;
+  Priority_queue.add queue p
+
+let pop ctx queue =
+  let c = ctx.Sim_context.counters in
+  c.queue_pops <- c.queue_pops + 1;
+  Priority_queue.take queue
+
+let ring_push ctx queue p =
+  let c = ctx.Sim_context.counters in
+  c.queue_pushes <- c.queue_pushes + 1;
+  Ring_buffer.push queue p
+
+let ring_pop ctx queue =
+  let c = ctx.Sim_context.counters in
+  c.queue_pops <- c.queue_pops + 1;
+  Ring_buffer.pop queue
+
+let log_event emit t pid state =
+  emit { time = t; process_id = pid; new_state = state; instance_id = None }
+
+let log_event_with_instance ?(ctx = Sim_context.default) emit t pid state instance_id =
+  let shown_id =
+    (* For real-time instances, use the original task ID from the index *)
+    match find_process ~ctx instance_id with
+    | Some { instance_of = Some original; _ } -> original
+    | _ -> pid
   in
-  schedule_log := { 
+  emit { 
     time = t; 
-    process_id = display_id;  (* Use display_id instead of raw process_id *)
+    process_id = shown_id;  (* Use shown_id instead of raw process_id *)
     new_state = state; 
     instance_id = Some instance_id 
-  } :: !schedule_log
+  }
 
 let reset_process p =
   p.state <- Ready;
+  p.remaining_burst_time <- p.burst_time;
   p.waiting_time <- 0;
   p.completion_time <- None;
   p.turnaround_time <- None
 
-let sort_by_arrival = List.sort (fun p1 p2 -> compare p1.arrival_time p2.arrival_time)
+(* Prepara uma execução: reconstrói o índice e limpa o estado dos processos *)
+let prepare_run ?(ctx = Sim_context.default) processes =
+  index_processes ~ctx processes;
+  List.iter reset_process processes
+
+(* Ordenação estável: os empates ficam pela ordem da lista (Checkpoint.earliest_change conta com isso) *)
+let sort_by_arrival = List.stable_sort (fun p1 p2 -> compare p1.arrival_time p2.arrival_time)
+
+(* Cursor de chegadas: os processos são ordenados por chegada uma única vez e
+   admitidos por essa ordem, à medida que o tempo avança. Cada processo é
+   visitado uma vez, em vez de se filtrar a lista dos que faltam chegar a cada passo.
+   Os processos vêm de uma lista (arrivals_of) ou das colunas de uma carga lida de
+   ficheiro (arrivals_of_workload), onde cada processo só é criado quando é admitido. *)
+type arrivals = {
+  count : int;                   (* processos da execução *)
+  arrival_at : int -> int;       (* chegada do i-ésimo processo, por ordem de chegada *)
+  process_at : int -> t;         (* i-ésimo processo, por ordem de chegada *)
+  finished : t -> unit;          (* chamada quando um processo termina *)
+  mutable next : int;            (* primeiro processo ainda não admitido *)
+}
 
-let fcfs (processes : t list) : int * timeline_event list =
+(* Cursor sobre uma lista: prepara a execução (índice e estado dos processos) *)
+let arrivals_of ?(ctx = Sim_context.default) processes =
+  prepare_run ~ctx processes;
+  let pending = Array.of_list (sort_by_arrival processes) in
+  { count = Array.length pending;
+    arrival_at = (fun i -> pending.(i).arrival_time);
+    process_at = (fun i -> pending.(i));
+    finished = ignore;
+    next = 0 }
+
+(* Cursor sobre as colunas de uma carga: os processos são criados à medida que são
+   admitidos e, com sink, saem do índice quando terminam (as estatísticas e a
+   timeline já os leram no evento Terminated). A memória fica proporcional aos
+   processos vivos e não ao tamanho do ficheiro. A ordem por chegada é a mesma de
+   sort_by_arrival; se o ficheiro já estiver ordenado não é preciso nenhum array. *)
+let arrivals_of_workload ?(ctx = Sim_context.default) ~keep (w : Workload.t) =
+  let n = Workload.length w in
+  let rec sorted i = i >= n - 1 || (Workload.arrival w i <= Workload.arrival w (i + 1) && sorted (i + 1)) in
+  let row =
+    if sorted 0 then Fun.id
+    else begin
+      let order = Array.init n Fun.id in
+      Array.stable_sort (fun a b -> compare (Workload.arrival w a) (Workload.arrival w b)) order;
+      fun i -> order.(i)
+    end
+  in
+  let index = ctx.Sim_context.process_index in
+  Hashtbl.reset index;
+  { count = n;
+    arrival_at = (fun i -> Workload.arrival w (row i));
+    process_at = (fun i ->
+      let r = row i in
+      let p =
+        Process.create ~id:(Workload.id w r) ~arrival_time:(Workload.arrival w r)
+          ~burst_time:(Workload.burst w r) ~priority:(Workload.param w r) ()
+      in
+      Hashtbl.replace index p.id p;
+      p);
+    finished = (if keep then ignore else fun p -> Hashtbl.remove index p.id);
+    next = 0 }
+
+let has_pending a = a.next < a.count
+
+(* Chegada do próximo processo por admitir (max_int se já não houver) *)
+let next_arrival_time a =
+  if has_pending a then a.arrival_at a.next else max_int
+
+(* Retira o próximo processo por admitir *)
+let take_next a =
+  let p = a.process_at a.next in
+  a.next <- a.next + 1;
+  p
+
+(* Admite (passa a f, por ordem de chegada) todos os processos que chegaram até ao instante time *)
+let admit a time f =
+  while has_pending a && a.arrival_at a.next <= time do
+    f (take_next a)
+  done
+
+(* Checkpoints de uma política (ver Checkpoint). Devolve a função a chamar no topo
+   do ciclo, que guarda um checkpoint a cada config.every unidades de tempo.
+   Com config.resume o estado é reposto já aqui, depois de prepare_run: os
+   admitidos que não estão vivos terminaram, os vivos voltam à fila (restore) com o
+   trabalho que lhes faltava, e o tempo, o cursor de chegadas e os contadores
+   passam a ser os do checkpoint (com o último processo tirado do CPU, de que
+   depende a contagem das preempções). Os campos de conclusão dos processos já
+   terminados não são repostos: só as estatísticas os leem, no evento Terminated.
+   O chamador garante que os processos admitidos até ao checkpoint são os mesmos. *)
+let live_of p = { Checkpoint.pid = p.id; remaining = p.remaining_burst_time; state = p.state }
+
+let checkpointer ctx (config : Checkpoint.config option) incoming time completed
+    ~(ready : unit -> t list) ~(running : unit -> t option) ~(restore : t list -> t option -> unit) =
+  match config with
+  | None -> ignore
+  | Some config when Hashtbl.length ctx.Sim_context.process_index <> incoming.count ->
+      (* ids repetidos: os processos de um checkpoint não se encontrariam pelo id *)
+      if Option.is_some config.Checkpoint.resume then failwith "Checkpoints precisam de ids de processo únicos.";
+      ignore
+  | Some config ->
+      let next = ref 0 in
+      (match config.Checkpoint.resume with
+       | None -> ()
+       | Some cp ->
+           for i = 0 to cp.Checkpoint.admitted - 1 do
+             let p = incoming.process_at i in
+             p.state <- Terminated;
+             p.remaining_burst_time <- 0
+           done;
+           let revive (l : Checkpoint.live) =
+             match find_process ~ctx l.Checkpoint.pid with
+             | Some p ->
+                 p.remaining_burst_time <- l.Checkpoint.remaining;
+                 p.state <- l.Checkpoint.state;
+                 p
+             | None -> failwith ("Checkpoint com um processo que não está na carga: " ^ string_of_int l.Checkpoint.pid)
+           in
+           let ready_processes = List.map revive (Array.to_list cp.Checkpoint.ready) in
+           restore ready_processes (Option.map revive cp.Checkpoint.running);
+           time := cp.Checkpoint.time;
+           completed := cp.Checkpoint.completed;
+           incoming.next <- cp.Checkpoint.admitted;
+           Checkpoint.restore_counters ctx cp;
+           ctx.Sim_context.taken_off <- cp.Checkpoint.taken_off;
+           next := cp.Checkpoint.time + config.Checkpoint.every);
+      fun () ->
+        if !time >= !next then begin
+          config.Checkpoint.save {
+            Checkpoint.time = !time;
+            admitted = incoming.next;
+            completed = !completed;
+            ready = Array.of_list (List.map live_of (ready ()));
+            running = Option.map live_of (running ());
+            counters = Checkpoint.copy_counters ctx.Sim_context.counters;
+            taken_off = ctx.Sim_context.taken_off;
+          };
+          next := !time + config.Checkpoint.every
+        end
+
+let run_fcfs ctx sink checkpoints incoming : int * timeline_event list =
   let time = ref 0 in
-  let schedule_log = ref [] in
-  let sorted_procs = sort_by_arrival processes in
-  List.iter reset_process processes;
-  List.iter (fun p ->
+  let emit, collected_log = event_output ~ctx sink in
+  let completed_count = ref 0 in
+  let checkpoint =
+    checkpointer ctx checkpoints incoming time completed_count
+      ~ready:(fun () -> []) ~running:(fun () -> None) ~restore:(fun _ _ -> ())
+  in
+  while has_pending incoming do
+    checkpoint ();
+    let p = take_next incoming in
     if !time < p.arrival_time then (
-      log_event schedule_log !time (-1) Waiting;
+      log_event emit !time (-1) Waiting;
       time := p.arrival_time;
-      log_event schedule_log !time (-1) Ready;
+      log_event emit !time (-1) Ready;
     );
-    log_event schedule_log !time p.id Running;
+    log_event emit !time p.id Running;
     p.state <- Running;
     let wait = !time - p.arrival_time in
     let completion = !time + p.burst_time in
@@ -113,35 +322,35 @@ let fcfs (processes : t list) : int * timeline_event list =
     p.turnaround_time <- Some turnaround;
     p.remaining_burst_time <- 0;
     time := completion;
-    log_event schedule_log !time p.id Terminated;
+    log_event emit !time p.id Terminated;
     p.state <- Terminated;
-  ) sorted_procs;
-  (!time, List.rev !schedule_log)
+    incoming.finished p;
+    incr completed_count;
+  done;
+  (!time, collected_log ())
 
-let sjf (processes : t list) : int * timeline_event list =
+let run_sjf ctx sink checkpoints incoming : int * timeline_event list =
   let time = ref 0 in
-  let schedule_log = ref [] in
+  let emit, collected_log = event_output ~ctx sink in
   let completed_count = ref 0 in
-  let num_processes = List.length processes in
-  let incoming = ref (sort_by_arrival processes) in
-  let ready_queue = ref [] in
-  List.iter reset_process processes;
+  let num_processes = incoming.count in
+  let ready_queue = Priority_queue.create (fun p -> p.burst_time) in
+  let checkpoint =
+    checkpointer ctx checkpoints incoming time completed_count
+      ~ready:(fun () -> Priority_queue.to_list ready_queue) ~running:(fun () -> None)
+      ~restore:(fun ready _ -> List.iter (Priority_queue.add ready_queue) ready)
+  in
   while !completed_count < num_processes do
-    let arrived_now = List.filter (fun p -> p.arrival_time <= !time) !incoming in
-    if arrived_now <> [] then (
-      ready_queue := List.rev_append arrived_now !ready_queue;
-      incoming := List.filter (fun p -> p.arrival_time > !time) !incoming
-    );
-    if !ready_queue <> [] then begin
-      ready_queue := List.sort (fun p1 p2 -> compare p1.burst_time p2.burst_time) !ready_queue;
-      let p = List.hd !ready_queue in
-      ready_queue := List.tl !ready_queue;
+    checkpoint ();
+    admit incoming !time (push ctx ready_queue);
+    if not (Priority_queue.is_empty ready_queue) then begin
+      let p = pop ctx ready_queue in
       if !time < p.arrival_time then (
-        log_event schedule_log !time (-1) Waiting;
+        log_event emit !time (-1) Waiting;
         time := p.arrival_time;
-        log_event schedule_log !time (-1) Ready;
+        log_event emit !time (-1) Ready;
       );
-      log_event schedule_log !time p.id Running;
+      log_event emit !time p.id Running;
       p.state <- Running;
       let completion = !time + p.burst_time in
       let wait = !time - p.arrival_time in
@@ -150,44 +359,45 @@ let sjf (processes : t list) : int * timeline_event list =
       p.completion_time <- Some completion;
       p.turnaround_time <- Some turnaround;
       p.remaining_burst_time <- 0;
-      log_event schedule_log completion p.id Terminated;
+      log_event emit completion p.id Terminated;
       p.state <- Terminated;
+      incoming.finished p;
       time := completion;
       incr completed_count;
-    end else if !incoming <> [] then (
-      let next_arrival = (List.hd !incoming).arrival_time in
+    end else if has_pending incoming then (
+      let next_arrival = next_arrival_time incoming in
       if next_arrival > !time then (
-        log_event schedule_log !time (-1) Waiting;
+        log_event emit !time (-1) Waiting;
         time := next_arrival;
-        log_event schedule_log !time (-1) Ready;
+        log_event emit !time (-1) Ready;
       )
     ) else if !completed_count < num_processes then
       failwith "Erro na simulação SJF: Loop ativo sem processos prontos ou futuros."
   done;
-  (!time, List.rev !schedule_log)
+  (!time, collected_log ())
 
-let priority_non_preemptive (processes : t list) : int * timeline_event list =
+let run_priority_non_preemptive ctx sink checkpoints incoming : int * timeline_event list =
   let time = ref 0 in
-  let schedule_log = ref [] in
+  let emit, collected_log = event_output ~ctx sink in
   let completed_count = ref 0 in
-  let num_processes = List.length processes in
-  let incoming = ref (sort_by_arrival processes) in
+  let num_processes = incoming.count in
   let ready_queue = Priority_queue.create (fun p -> p.priority) in
-  List.iter reset_process processes;
+  let checkpoint =
+    checkpointer ctx checkpoints incoming time completed_count
+      ~ready:(fun () -> Priority_queue.to_list ready_queue) ~running:(fun () -> None)
+      ~restore:(fun ready _ -> List.iter (Priority_queue.add ready_queue) ready)
+  in
   while !completed_count < num_processes do
-    let arrived_now = List.filter (fun p -> p.arrival_time <= !time) !incoming in
-    if arrived_now <> [] then (
-      List.iter (fun p -> Priority_queue.add ready_queue p) arrived_now;
-      incoming := List.filter (fun p -> p.arrival_time > !time) !incoming
-    );
+    checkpoint ();
+    admit incoming !time (push ctx ready_queue);
     if not (Priority_queue.is_empty ready_queue) then begin
-      let p = Priority_queue.take ready_queue in
+      let p = pop ctx ready_queue in
       if !time < p.arrival_time then (
-        log_event schedule_log !time (-1) Waiting;
+        log_event emit !time (-1) Waiting;
         time := p.arrival_time;
-        log_event schedule_log !time (-1) Ready;
+        log_event emit !time (-1) Ready;
       );
-      log_event schedule_log !time p.id Running;
+      log_event emit !time p.id Running;
       p.state <- Running;
       let completion = !time + p.burst_time in
       let wait = !time - p.arrival_time in
@@ -196,259 +406,533 @@ let priority_non_preemptive (processes : t list) : int * timeline_event list =
       p.completion_time <- Some completion;
       p.turnaround_time <- Some turnaround;
       p.remaining_burst_time <- 0;
-      log_event schedule_log completion p.id Terminated;
+      log_event emit completion p.id Terminated;
       p.state <- Terminated;
+      incoming.finished p;
       time := completion;
       incr completed_count;
-    end else if !incoming <> [] then (
-      let next_arrival = (List.hd !incoming).arrival_time in
+    end else if has_pending incoming then (
+      let next_arrival = next_arrival_time incoming in
       if next_arrival > !time then (
-        log_event schedule_log !time (-1) Waiting;
+        log_event emit !time (-1) Waiting;
         time := next_arrival;
-        log_event schedule_log !time (-1) Ready;
+        log_event emit !time (-1) Ready;
       )
     ) else if !completed_count < num_processes then
       failwith "Erro na simulação Prioridade NP: Loop ativo sem processos prontos ou futuros."
   done;
-  (!time, List.rev !schedule_log)
+  (!time, collected_log ())
 
-let priority_preemptive (processes : t list) : int * timeline_event list =
+(* Motor orientado a eventos: o tempo salta diretamente para a próxima decisão
+   (chegada ou fim do processo em execução) em vez de avançar tick a tick.
+   A seleção e a preempção são as mesmas da versão por tick. *)
+let run_priority_preemptive ctx sink checkpoints incoming : int * timeline_event list =
   let time = ref 0 in
-  let schedule_log = ref [] in
+  let emit, collected_log = event_output ~ctx sink in
   let completed_count = ref 0 in
-  let num_processes = List.length processes in
-  let incoming = ref (sort_by_arrival processes) in
-  let ready_queue = ref [] in
-  List.iter reset_process processes;
+  let num_processes = incoming.count in
+  let ready_queue = Priority_queue.create (fun p -> p.priority) in
   let running_process = ref None in
+  let checkpoint =
+    checkpointer ctx checkpoints incoming time completed_count
+      ~ready:(fun () -> Priority_queue.to_list ready_queue) ~running:(fun () -> !running_process)
+      ~restore:(fun ready running ->
+        List.iter (Priority_queue.add ready_queue) ready;
+        running_process := running)
+  in
   while !completed_count < num_processes do
-    let arrived_now = List.filter (fun p -> p.arrival_time = !time) !incoming in
-    if arrived_now <> [] then (
-      ready_queue := List.rev_append arrived_now !ready_queue;
-      incoming := List.filter (fun p -> p.arrival_time > !time) !incoming
-    );
+    checkpoint ();
+    admit incoming !time (push ctx ready_queue);
     let preempt_needed =
-      match !running_process, !ready_queue with
-      | Some rp, rq when rq <> [] ->
-          let best_ready = List.fold_left (fun acc p -> if p.priority < acc.priority then p else acc) (List.hd rq) (List.tl rq) in
-          best_ready.priority < rp.priority
-      | None, rq when rq <> [] -> true
-      | _ -> false
+      match !running_process, Priority_queue.peek_opt ready_queue with
+      | Some rp, Some best_ready -> best_ready.priority < rp.priority
+      | None, Some _ -> true
+      | _, None -> false
     in
     if preempt_needed then (
       (match !running_process with
       | Some rp ->
           rp.state <- Ready;
-          ready_queue := rp :: !ready_queue;
-          log_event schedule_log !time rp.id Ready
+          push ctx ready_queue rp;
+          log_event emit !time rp.id Ready
       | None -> ());
-      let best_ready, rest =
-        match !ready_queue with
-        | [] -> failwith "ready_queue vazio na preempção"
-        | hd :: tl ->
-            List.fold_left
-              (fun (best, others) p ->
-                if p.priority < best.priority then (p, best :: others)
-                else (best, p :: others)
-              )
-              (hd, [])
-              tl
+      let best_ready =
+        try pop ctx ready_queue
+        with Not_found -> failwith "ready_queue vazio na preempção"
       in
-      ready_queue := rest;
       best_ready.state <- Running;
-      log_event schedule_log !time best_ready.id Running;
+      log_event emit !time best_ready.id Running;
       running_process := Some best_ready;
     );
     (match !running_process with
     | Some rp ->
-        rp.remaining_burst_time <- rp.remaining_burst_time - 1;
+        (* corre até terminar ou até à próxima chegada (único ponto onde pode haver preempção) *)
+        let next_arrival = next_arrival_time incoming in
+        let slice = min rp.remaining_burst_time (next_arrival - !time) in
+        rp.remaining_burst_time <- rp.remaining_burst_time - slice;
+        time := !time + slice;
         if rp.remaining_burst_time = 0 then (
-          let completion = !time + 1 in
+          let completion = !time in
           rp.state <- Terminated;
           rp.completion_time <- Some completion;
           rp.turnaround_time <- Some (completion - rp.arrival_time);
           rp.waiting_time <- completion - rp.arrival_time - rp.burst_time;
-          log_event schedule_log completion rp.id Terminated;
+          log_event emit completion rp.id Terminated;
+          incoming.finished rp;
           running_process := None;
           incr completed_count;
         )
     | None ->
-        if !ready_queue = [] && !incoming <> [] then (
-          log_event schedule_log !time (-1) Waiting
-        )
+        if has_pending incoming && Priority_queue.is_empty ready_queue then begin
+          (* CPU livre até à próxima chegada: um só evento por intervalo, as
+             estatísticas contam o tempo livre pela duração do intervalo *)
+          let arrival = next_arrival_time incoming in
+          if arrival > !time then log_event emit !time (-1) Waiting;
+          time := max !time arrival
+        end else incr time
     );
-    incr time;
   done;
-  (!time, List.rev !schedule_log)
+  (!time, collected_log ())
 
-let round_robin (processes : t list) ~(quantum : int) : int * timeline_event list =
+let run_round_robin ctx sink checkpoints incoming ~quantum : int * timeline_event list =
   let time = ref 0 in
-  let schedule_log = ref [] in
+  let emit, collected_log = event_output ~ctx sink in
   let completed_count = ref 0 in
-  let num_processes = List.length processes in
-  let incoming = ref (sort_by_arrival processes) in
-  let ready_queue = ref [] in
-  List.iter reset_process processes;
+  let num_processes = incoming.count in
+  let ready_queue = Ring_buffer.create () in
+  let checkpoint =
+    checkpointer ctx checkpoints incoming time completed_count
+      ~ready:(fun () -> Ring_buffer.to_list ready_queue) ~running:(fun () -> None)
+      ~restore:(fun ready _ -> List.iter (Ring_buffer.push ready_queue) ready)
+  in
   while !completed_count < num_processes do
-    let arrived_now = List.filter (fun p -> p.arrival_time <= !time) !incoming in
-    if arrived_now <> [] then (
-      ready_queue := !ready_queue @ arrived_now;
-      incoming := List.filter (fun p -> p.arrival_time > !time) !incoming
-    );
-    if !ready_queue <> [] then begin
-      let p = List.hd !ready_queue in
-      ready_queue := List.tl !ready_queue;
+    checkpoint ();
+    admit incoming !time (ring_push ctx ready_queue);
+    if not (Ring_buffer.is_empty ready_queue) then begin
+      let p = ring_pop ctx ready_queue in
       if !time < p.arrival_time then (
-        log_event schedule_log !time (-1) Waiting;
+        log_event emit !time (-1) Waiting;
         time := p.arrival_time;
-        log_event schedule_log !time (-1) Ready;
+        log_event emit !time (-1) Ready;
       );
-      log_event schedule_log !time p.id Running;
+      log_event emit !time p.id Running;
       p.state <- Running;
       let exec_time = min quantum p.remaining_burst_time in
       p.remaining_burst_time <- p.remaining_burst_time - exec_time;
       time := !time + exec_time;
-      let arrived_during = List.filter (fun p -> p.arrival_time > (!time - exec_time) && p.arrival_time <= !time) !incoming in
-      if arrived_during <> [] then (
-        ready_queue := !ready_queue @ arrived_during;
-        incoming := List.filter (fun p -> not (List.memq p arrived_during)) !incoming
-      );
+      (* quem chegou durante a fatia entra na fila antes do processo interrompido *)
+      admit incoming !time (ring_push ctx ready_queue);
       if p.remaining_burst_time = 0 then begin
         p.state <- Terminated;
         p.completion_time <- Some !time;
         p.turnaround_time <- Some (!time - p.arrival_time);
         p.waiting_time <- !time - p.arrival_time - p.burst_time;
-        log_event schedule_log !time p.id Terminated;
+        log_event emit !time p.id Terminated;
+        incoming.finished p;
         incr completed_count;
       end else begin
         p.state <- Ready;
-        log_event schedule_log !time p.id Ready;
-        ready_queue := !ready_queue @ [p];
+        log_event emit !time p.id Ready;
+        ring_push ctx ready_queue p;
       end
-    end else if !incoming <> [] then (
-      let next_arrival = (List.hd !incoming).arrival_time in
+    end else if has_pending incoming then (
+      let next_arrival = next_arrival_time incoming in
       if next_arrival > !time then (
-        log_event schedule_log !time (-1) Waiting;
+        log_event emit !time (-1) Waiting;
         time := next_arrival;
-        log_event schedule_log !time (-1) Ready;
+        log_event emit !time (-1) Ready;
       )
     )
   done;
-  (!time, List.rev !schedule_log)
+  (!time, collected_log ())
+
+let fcfs ?(ctx = Sim_context.default) ?sink ?checkpoints (processes : t list) : int * timeline_event list =
+  run_fcfs ctx sink checkpoints (arrivals_of ~ctx processes)
+
+let sjf ?(ctx = Sim_context.default) ?sink ?checkpoints (processes : t list) : int * timeline_event list =
+  run_sjf ctx sink checkpoints (arrivals_of ~ctx processes)
+
+let priority_non_preemptive ?(ctx = Sim_context.default) ?sink ?checkpoints (processes : t list) : int * timeline_event list =
+  run_priority_non_preemptive ctx sink checkpoints (arrivals_of ~ctx processes)
+
+let priority_preemptive ?(ctx = Sim_context.default) ?sink ?checkpoints (processes : t list) : int * timeline_event list =
+  run_priority_preemptive ctx sink checkpoints (arrivals_of ~ctx processes)
+
+let round_robin ?(ctx = Sim_context.default) ?sink ?checkpoints (processes : t list) ~(quantum : int) : int * timeline_event list =
+  run_round_robin ctx sink checkpoints (arrivals_of ~ctx processes) ~quantum
+
+(* Políticas não periódicas, para correr sobre uma carga lida de ficheiro *)
+type policy =
+  | Fcfs
+  | Sjf
+  | Priority_non_preemptive
+  | Priority_preemptive
+  | Round_robin of int  (* quantum *)
+
+(* Corre a política diretamente sobre as colunas da carga, sem construir a lista
+   de processos (ver arrivals_of_workload). Com sink só os processos vivos ficam
+   no índice; sem sink o log é devolvido e todos ficam, como nas outras funções. *)
+let run_workload ?(ctx = Sim_context.default) ?sink (policy : policy) (w : Workload.t) : int * timeline_event list =
+  let incoming = arrivals_of_workload ~ctx ~keep:(Option.is_none sink) w in
+  match policy with
+  | Fcfs -> run_fcfs ctx sink None incoming
+  | Sjf -> run_sjf ctx sink None incoming
+  | Priority_non_preemptive -> run_priority_non_preemptive ctx sink None incoming
+  | Priority_preemptive -> run_priority_preemptive ctx sink None incoming
+  | Round_robin quantum -> run_round_robin ctx sink None incoming ~quantum
+
+(* Chave EDF: deadline absoluto mais cedo primeiro (sem deadline vai para o fim) *)
+let deadline_key p =
+  match p.deadline with
+  | Some d -> d
+  | None -> max_int
+
+(* Chave RM: período mais curto primeiro (sem período vai para o fim) *)
+let period_key p =
+  match p.period with
+  | Some per -> per
+  | None -> max_int
 
-let edf ?(tempo_max=max_int) (processes : t list) : int * timeline_event list =
+(* Motor orientado a eventos partilhado pelo EDF e pelo RM.
+   Em vez de avançar um tick de cada vez, o processo escolhido corre até ao
+   próximo ponto de decisão: a próxima chegada (ou libertação de instância),
+   o fim do seu burst ou tempo_max. Quando outro processo pronto tem a mesma
+   chave que o escolhido, a versão por tick alternava entre eles a cada
+   unidade de tempo, por isso nesse caso a fatia é de 1 tick (o processo volta
+   à fila com um número de sequência novo, ficando atrás dos empatados).
+   Só se registam eventos quando o processo em execução muda. *)
+let realtime_event_driven ctx sink key_fn tempo_max (processes : t list) : int * timeline_event list =
   let time = ref 0 in
-  let schedule_log = ref [] in
+  let emit, collected_log = event_output ~ctx sink in
   let completed_count = ref 0 in
   let num_processes = List.length processes in
-  let incoming = ref (sort_by_arrival processes) in
-  let ready_queue = ref [] in
-  List.iter reset_process processes;
+  let incoming = arrivals_of ~ctx processes in
+  let ready_queue = Priority_queue.create key_fn in
+  let current = ref None in (* processo que correu na fatia anterior e não terminou *)
   while !completed_count < num_processes && !time < tempo_max do
-    let arrived_now = List.filter (fun p -> p.arrival_time <= !time) !incoming in
-    if arrived_now <> [] then (
-      ready_queue := !ready_queue @ arrived_now;
-      incoming := List.filter (fun p -> p.arrival_time > !time) !incoming
-    );
-    if !ready_queue <> [] then begin
-      ready_queue := List.sort (fun p1 p2 ->
-        match p1.deadline, p2.deadline with
-        | Some d1, Some d2 -> compare d1 d2
-        | Some _, None -> -1
-        | None, Some _ -> 1
-        | None, None -> 0
-      ) !ready_queue;
-      let p = List.hd !ready_queue in
-      ready_queue := List.tl !ready_queue;
-      if !time < p.arrival_time then (
-        log_event schedule_log !time (-1) Waiting;
-        time := p.arrival_time;
-        log_event schedule_log !time (-1) Ready;
-      );
-      log_event schedule_log !time p.id Running;
+    admit incoming !time (push ctx ready_queue);
+    if not (Priority_queue.is_empty ready_queue) then begin
+      let p = pop ctx ready_queue in
+      (match !current with
+       | Some c when c == p -> ()
+       | Some c ->
+           log_event emit !time c.id Ready;
+           log_event emit !time p.id Running
+       | None -> log_event emit !time p.id Running);
       p.state <- Running;
-      let exec_time = 1 in
-      p.remaining_burst_time <- p.remaining_burst_time - exec_time;
-      time := !time + exec_time;
+      let slice =
+        match Priority_queue.peek_opt ready_queue with
+        | Some q when key_fn q = key_fn p -> 1
+        | _ ->
+            let next_arrival = next_arrival_time incoming in
+            min p.remaining_burst_time (min (next_arrival - !time) (tempo_max - !time))
+      in
+      p.remaining_burst_time <- p.remaining_burst_time - slice;
+      time := !time + slice;
       if p.remaining_burst_time = 0 then begin
         p.state <- Terminated;
         p.completion_time <- Some !time;
         p.turnaround_time <- Some (!time - p.arrival_time);
         p.waiting_time <- !time - p.arrival_time - p.burst_time;
-        log_event schedule_log !time p.id Terminated;
+        log_event emit !time p.id Terminated;
+        current := None;
         incr completed_count;
       end else begin
         p.state <- Ready;
-        log_event schedule_log !time p.id Ready;
-        ready_queue := !ready_queue @ [p];
+        push ctx ready_queue p;
+        current := Some p;
       end
-    end else if !incoming <> [] then (
-      let next_arrival = (List.hd !incoming).arrival_time in
+    end else if has_pending incoming then (
+      let next_arrival = next_arrival_time incoming in
       if next_arrival > !time then (
-        log_event schedule_log !time (-1) Waiting;
+        log_event emit !time (-1) Waiting;
         time := next_arrival;
-        log_event schedule_log !time (-1) Ready;
+        log_event emit !time (-1) Ready;
       )
     )
   done;
-  (!time, List.rev !schedule_log)
+  (!time, collected_log ())
+
+let edf ?(ctx = Sim_context.default) ?sink ?(tempo_max=max_int) (processes : t list) : int * timeline_event list =
+  realtime_event_driven ctx sink deadline_key tempo_max processes
+
+let rate_monotonic ?(ctx = Sim_context.default) ?sink ?(tempo_max=max_int) (processes : t list) : int * timeline_event list =
+  realtime_event_driven ctx sink period_key tempo_max processes
+
+(* ------------------------------------------------------------------------- *)
+(* Libertação preguiçosa de instâncias periódicas e extrapolação por hiperperíodo.
 
-let rate_monotonic ?(tempo_max=max_int) (processes : t list) : int * timeline_event list =
+   Em vez de gerar todas as instâncias até tempo_max antes de começar (como
+   gerar_instancias_periodicas), cada tarefa guarda o instante da sua próxima
+   libertação e a instância só é criada quando chega esse instante. As instâncias
+   partilham o nome da tarefa e são registadas no índice da execução à medida que
+   são libertadas, para que as estatísticas e a timeline as encontrem.
+
+   Com ~extrapolate, o motor compara o estado do escalonamento (fila de prontos,
+   trabalho restante, deadlines e próximas libertações, relativos ao instante) no
+   início de cada hiperperíodo (mmc dos períodos), a contar da última primeira
+   libertação. Se dois inícios seguidos tiverem o mesmo estado, o escalonamento é
+   periódico a partir daí: os hiperperíodos inteiros que ainda cabem antes de
+   tempo_max (menos um, de margem) são saltados de uma vez e só o resto é simulado.
+   Os listeners recebem o início de cada hiperperíodo e o salto, para poderem
+   repetir o que acumularam no último hiperperíodo (ver Statistics). *)
+
+(* Salto feito pelo motor periódico *)
+type hyperperiod_skip = {
+  skip_from : int;                 (* instante em que o salto foi feito (antes de avançar) *)
+  hyperperiod : int;               (* duração do hiperperíodo *)
+  repeats : int;                   (* número de hiperperíodos saltados *)
+  renamed : (int * int) list;      (* (id antigo, id novo) das instâncias em curso *)
+}
+
+type hyperperiod_listener = {
+  on_boundary : int -> unit;             (* início de um hiperperíodo (estado ainda diferente) *)
+  on_skip : hyperperiod_skip -> unit;    (* o último hiperperíodo repete-se [repeats] vezes *)
+}
+
+(* Tarefa com a sua próxima libertação *)
+type periodic_task = {
+  task : t;
+  index : int;                  (* posição na lista de tarefas *)
+  mutable next_release : int;   (* max_int quando já não há mais instâncias *)
+}
+
+let rec gcd a b = if b = 0 then a else gcd b (a mod b)
+
+(* Hiperperíodo (mmc dos períodos). None se alguma tarefa não for periódica ou se
+   o mmc passar de limit (por omissão max_int) *)
+let hyperperiod ?(limit = max_int) (tasks : t list) : int option =
+  let rec loop acc = function
+    | [] -> Some acc
+    | { period = Some per; deadline = Some _; _ } :: rest when per > 0 ->
+        let g = gcd acc per in
+        if acc / g > limit / per then None else loop (acc / g * per) rest
+    | _ -> None
+  in
+  loop 1 tasks
+
+(* Motor orientado a eventos (o mesmo de realtime_event_driven) com libertação
+   preguiçosa das instâncias. Produz os mesmos eventos que gerar_instancias_periodicas
+   seguido de realtime_event_driven, exceto nos hiperperíodos saltados.
+   Cada instância tem um id sequencial (ctx.next_instance_id, a começar acima do
+   maior id das tarefas, por isso nunca colide com uma tarefa nem com outra
+   instância); os eventos levam o id da tarefa e, em instance_id, o da instância.
+   Com sink, as instâncias saem do índice quando terminam. *)
+let realtime_periodic ctx sink key_fn tempo_max ~extrapolate ~listeners (tasks : t list) : int * timeline_event list =
   let time = ref 0 in
-  let schedule_log = ref [] in
-  let completed_count = ref 0 in
-  let num_processes = List.length processes in
-  let incoming = ref (sort_by_arrival processes) in
-  let ready_queue = ref [] in
-  List.iter reset_process processes;
-  while !completed_count < num_processes && !time < tempo_max do
-    let arrived_now = List.filter (fun p -> p.arrival_time <= !time) !incoming in
-    if arrived_now <> [] then (
-      ready_queue := !ready_queue @ arrived_now;
-      incoming := List.filter (fun p -> p.arrival_time > !time) !incoming
-    );
-    if !ready_queue <> [] then begin
-      ready_queue := List.sort (fun p1 p2 ->
-        match p1.period, p2.period with
-        | Some per1, Some per2 -> compare per1 per2
-        | Some _, None -> -1
-        | None, Some _ -> 1
-        | None, None -> 0
-      ) !ready_queue;
-      let p = List.hd !ready_queue in
-      ready_queue := List.tl !ready_queue;
-      if !time < p.arrival_time then (
-        log_event schedule_log !time (-1) Waiting;
-        time := p.arrival_time;
-        log_event schedule_log !time (-1) Ready;
-      );
-      log_event schedule_log !time p.id Running;
+  let emit, collected_log = event_output ~ctx sink in
+  let keep = Option.is_none sink in
+  let log_job p state =
+    match p.instance_of with
+    | Some task -> emit { time = !time; process_id = task; new_state = state; instance_id = Some p.id }
+    | None -> log_event emit !time p.id state
+  in
+  let ready_queue = Priority_queue.create key_fn in
+  let current = ref None in
+  Hashtbl.reset ctx.Sim_context.process_index;
+  ctx.Sim_context.all_instances <- [];
+  ctx.Sim_context.next_instance_id <- 1 + List.fold_left (fun acc p -> max acc p.id) 0 tasks;
+  let tasks =
+    Array.of_list (List.mapi (fun index p ->
+      (match p.period, p.deadline with
+       | Some _, Some _ -> ()
+       | _ -> reset_process p);  (* tarefas não periódicas correm uma vez, tal como estão *)
+      let first =
+        match p.period, p.deadline with
+        | Some _, Some _ when p.arrival_time >= tempo_max -> max_int
+        | _ -> p.arrival_time
+      in
+      { task = p; index; next_release = first }
+    ) tasks)
+  in
+  let register p = Hashtbl.replace ctx.Sim_context.process_index p.id p in
+  (* cria a instância que a tarefa liberta agora e agenda a seguinte *)
+  let release pt =
+    let p = pt.task in
+    let t = pt.next_release in
+    match p.period, p.deadline with
+    | Some per, Some dl ->
+        pt.next_release <- (if t + per < tempo_max then t + per else max_int);
+        let inst = { p with
+          id = get_next_instance_id ~ctx ();
+          instance_of = Some p.id;
+          arrival_time = t;
+          deadline = Some (t + dl);
+          remaining_burst_time = p.burst_time;
+          state = Ready;
+          completion_time = None;
+          turnaround_time = None;
+          waiting_time = 0;
+        } in
+        register inst;
+        inst
+    | _ ->
+        pt.next_release <- max_int;
+        register p;
+        p
+  in
+  (* tarefas com libertações por fazer, pela próxima libertação *)
+  let releases = Priority_queue.create (fun pt -> pt.next_release) in
+  let schedule_releases () =
+    Array.iter (fun pt -> if pt.next_release <> max_int then Priority_queue.add releases pt) tasks
+  in
+  schedule_releases ();
+  let next_release_time () =
+    match Priority_queue.peek_opt releases with
+    | Some pt -> pt.next_release
+    | None -> max_int
+  in
+  (* liberta tudo o que chega até now: por instante de libertação e, no mesmo
+     instante, da última tarefa para a primeira (a ordem da lista ordenada de
+     gerar_instancias_periodicas, que desempata a fila de prontos) *)
+  let admit_releases now =
+    while next_release_time () <= now do
+      let earliest = next_release_time () in
+      let due = ref [] in
+      while next_release_time () = earliest do
+        due := Priority_queue.take releases :: !due
+      done;
+      List.iter (fun pt ->
+        push ctx ready_queue (release pt);
+        if pt.next_release <> max_int then Priority_queue.add releases pt
+      ) (List.sort (fun a b -> compare b.index a.index) !due)
+    done
+  in
+  (* deteção do hiperperíodo *)
+  let h =
+    if extrapolate && Array.length tasks > 0 then
+      hyperperiod ~limit:tempo_max (Array.to_list (Array.map (fun pt -> pt.task) tasks))
+    else None
+  in
+  let next_boundary =
+    ref (match h with
+         | Some _ -> Array.fold_left (fun acc pt -> max acc pt.task.arrival_time) 0 tasks
+         | None -> max_int)
+  in
+  let previous_state = ref None in
+  (* estado relativo ao instante b: próximas libertações e, pela ordem da fila,
+     os trabalhos prontos (tarefa, restante, chegada, deadline, se é o atual) *)
+  let state_at b =
+    let relative t = if t = max_int then max_int else t - b in
+    let releases = Array.to_list (Array.map (fun pt -> relative pt.next_release) tasks) in
+    let jobs =
+      List.map (fun p ->
+        (p.instance_of, p.remaining_burst_time, p.arrival_time - b,
+         relative (deadline_key p),
+         match !current with Some c -> c == p | None -> false)
+      ) (Priority_queue.to_list ready_queue)
+    in
+    (releases, jobs)
+  in
+  (* avança k hiperperíodos: os trabalhos em curso passam a ser as instâncias
+     correspondentes k hiperperíodos mais tarde, com ids novos *)
+  let skip hp k =
+    let shift = k * hp in
+    let from = !time in
+    let jobs = Priority_queue.to_list ready_queue in
+    while not (Priority_queue.is_empty ready_queue) do
+      ignore (Priority_queue.take ready_queue)
+    done;
+    let renamed = ref [] in
+    List.iter (fun p ->
+      Hashtbl.remove ctx.Sim_context.process_index p.id;
+      let moved = { p with
+        id = (if Option.is_some p.instance_of then get_next_instance_id ~ctx () else p.id);
+        arrival_time = p.arrival_time + shift;
+        deadline = Option.map (fun d -> d + shift) p.deadline;
+      } in
+      register moved;
+      renamed := (p.id, moved.id) :: !renamed;
+      (match !current with
+       | Some c when c == p -> current := Some moved
+       | _ -> ());
+      Priority_queue.add ready_queue moved
+    ) jobs;
+    while not (Priority_queue.is_empty releases) do
+      ignore (Priority_queue.take releases)
+    done;
+    Array.iter (fun pt ->
+      if pt.next_release <> max_int then begin
+        let next = pt.next_release + shift in
+        pt.next_release <- (if next < tempo_max then next else max_int)
+      end
+    ) tasks;
+    schedule_releases ();
+    time := !time + shift;
+    let info = { skip_from = from; hyperperiod = hp; repeats = k; renamed = List.rev !renamed } in
+    List.iter (fun l -> l.on_skip info) listeners
+  in
+  (* chamado no topo do ciclo, antes das libertações do instante atual *)
+  let check_boundaries () =
+    match h with
+    | None -> ()
+    | Some hp ->
+        while !time >= !next_boundary do
+          let b = !next_boundary in
+          let state = state_at b in
+          let k = ((tempo_max - !time) / hp) - 1 in
+          if !previous_state = Some state && k >= 1 then begin
+            skip hp k;
+            next_boundary := max_int
+          end else if b > tempo_max - hp then
+            next_boundary := max_int  (* já não cabe nenhum salto *)
+          else begin
+            List.iter (fun l -> l.on_boundary b) listeners;
+            previous_state := Some state;
+            next_boundary := b + hp
+          end
+        done
+  in
+  while (next_release_time () <> max_int || not (Priority_queue.is_empty ready_queue))
+        && !time < tempo_max do
+    check_boundaries ();
+    admit_releases !time;
+    if not (Priority_queue.is_empty ready_queue) then begin
+      let p = pop ctx ready_queue in
+      (match !current with
+       | Some c when c == p -> ()
+       | Some c ->
+           log_job c Ready;
+           log_job p Running
+       | None -> log_job p Running);
       p.state <- Running;
-      let exec_time = 1 in
-      p.remaining_burst_time <- p.remaining_burst_time - exec_time;
-      time := !time + exec_time;
+      let slice =
+        match Priority_queue.peek_opt ready_queue with
+        | Some q when key_fn q = key_fn p -> 1
+        | _ ->
+            (* também pára no início do próximo hiperperíodo, para comparar o estado;
+               o processo continua a ser o escolhido, por isso não há eventos a mais *)
+            let stop = min (next_release_time ()) (min tempo_max !next_boundary) in
+            min p.remaining_burst_time (stop - !time)
+      in
+      p.remaining_burst_time <- p.remaining_burst_time - slice;
+      time := !time + slice;
       if p.remaining_burst_time = 0 then begin
         p.state <- Terminated;
         p.completion_time <- Some !time;
         p.turnaround_time <- Some (!time - p.arrival_time);
         p.waiting_time <- !time - p.arrival_time - p.burst_time;
-        log_event schedule_log !time p.id Terminated;
-        incr completed_count;
+        log_job p Terminated;
+        if not keep then Hashtbl.remove ctx.Sim_context.process_index p.id;
+        current := None;
       end else begin
         p.state <- Ready;
-        log_event schedule_log !time p.id Ready;
-        ready_queue := !ready_queue @ [p];
+        push ctx ready_queue p;
+        current := Some p;
       end
-    end else if !incoming <> [] then (
-      let next_arrival = (List.hd !incoming).arrival_time in
-      if next_arrival > !time then (
-        log_event schedule_log !time (-1) Waiting;
+    end else begin
+      let next_arrival = next_release_time () in
+      if next_arrival > !time && next_arrival <> max_int then (
+        log_event emit !time (-1) Waiting;
         time := next_arrival;
-        log_event schedule_log !time (-1) Ready;
+        log_event emit !time (-1) Ready;
       )
-    )
+    end
   done;
-  (!time, List.rev !schedule_log)
-
+  (!time, collected_log ())
 
+let edf_periodic ?(ctx = Sim_context.default) ?sink ?(extrapolate = false) ?(listeners = []) ~tempo_max (tasks : t list) : int * timeline_event list =
+  realtime_periodic ctx sink deadline_key tempo_max ~extrapolate ~listeners tasks
 
+let rate_monotonic_periodic ?(ctx = Sim_context.default) ?sink ?(extrapolate = false) ?(listeners = []) ~tempo_max (tasks : t list) : int * timeline_event list =
+  realtime_periodic ctx sink period_key tempo_max ~extrapolate ~listeners tasks
@@ -7,30 +7,74 @@ type timeline_event = {
   instance_id : int option;
 }
 
-val all_instances : t list ref
-val completed_instances : t list ref
-val next_instance_id : int ref
-
-val get_completed_instances : unit -> t list
-val get_all_instances : unit -> t list
+val get_completed_instances : ?ctx:Sim_context.t -> unit -> t list
+val get_all_instances : ?ctx:Sim_context.t -> unit -> t list
 
 val get_option_value : 'a option -> string -> 'a
-val get_next_instance_id : unit -> int
+val get_next_instance_id : ?ctx:Sim_context.t -> unit -> int
 val get_structured_instance_id : int -> int -> int
 
-val gerar_instancias_periodicas : t list -> int -> t list
+val gerar_instancias_periodicas : ?ctx:Sim_context.t -> t list -> int -> t list
+
+val index_processes : ?ctx:Sim_context.t -> t list -> unit
+val find_process : ?ctx:Sim_context.t -> int -> t option
+val display_id : ?ctx:Sim_context.t -> int -> int
+
+(* Destino dos eventos: função chamada com cada evento, pela ordem do tempo *)
+type sink = timeline_event -> unit
 
-val log_event : timeline_event list ref -> int -> int -> process_state -> unit
-val log_event_with_instance : timeline_event list ref -> int -> int -> process_state -> int -> unit
+val event_output : ?ctx:Sim_context.t -> sink option -> sink * (unit -> timeline_event list)
+val log_event : sink -> int -> int -> process_state -> unit
+val log_event_with_instance : ?ctx:Sim_context.t -> sink -> int -> int -> process_state -> int -> unit
 
 val reset_process : t -> unit
+val prepare_run : ?ctx:Sim_context.t -> t list -> unit
 
 val sort_by_arrival : t list -> t list
 
-val fcfs : t list -> int * timeline_event list
-val sjf : t list -> int * timeline_event list
-val priority_non_preemptive : t list -> int * timeline_event list
-val priority_preemptive : t list -> int * timeline_event list
-val round_robin : t list -> quantum:int -> int * timeline_event list
-val edf : ?tempo_max:int -> t list -> int * timeline_event list
-val rate_monotonic : ?tempo_max:int -> t list -> int * timeline_event list
+(* Com ?checkpoints as políticas guardam checkpoints periódicos e podem retomar de um
+   (ver Checkpoint); ao retomar, o log devolvido sem sink só tem os eventos seguintes *)
+val fcfs : ?ctx:Sim_context.t -> ?sink:sink -> ?checkpoints:Checkpoint.config -> t list -> int * timeline_event list
+val sjf : ?ctx:Sim_context.t -> ?sink:sink -> ?checkpoints:Checkpoint.config -> t list -> int * timeline_event list
+val priority_non_preemptive :
+  ?ctx:Sim_context.t -> ?sink:sink -> ?checkpoints:Checkpoint.config -> t list -> int * timeline_event list
+val priority_preemptive :
+  ?ctx:Sim_context.t -> ?sink:sink -> ?checkpoints:Checkpoint.config -> t list -> int * timeline_event list
+val round_robin :
+  ?ctx:Sim_context.t -> ?sink:sink -> ?checkpoints:Checkpoint.config -> t list -> quantum:int -> int * timeline_event list
+
+(* As mesmas políticas sobre uma carga lida de ficheiro: os processos são criados a
+   partir das colunas à medida que chegam e, com sink, saem do índice quando terminam *)
+type policy =
+  | Fcfs
+  | Sjf
+  | Priority_non_preemptive
+  | Priority_preemptive
+  | Round_robin of int
+
+val run_workload : ?ctx:Sim_context.t -> ?sink:sink -> policy -> Workload.t -> int * timeline_event list
+
+val edf : ?ctx:Sim_context.t -> ?sink:sink -> ?tempo_max:int -> t list -> int * timeline_event list
+val rate_monotonic : ?ctx:Sim_context.t -> ?sink:sink -> ?tempo_max:int -> t list -> int * timeline_event list
+
+(* Libertação preguiçosa de instâncias periódicas, com extrapolação por hiperperíodo *)
+type hyperperiod_skip = {
+  skip_from : int;
+  hyperperiod : int;
+  repeats : int;
+  renamed : (int * int) list;
+}
+
+type hyperperiod_listener = {
+  on_boundary : int -> unit;
+  on_skip : hyperperiod_skip -> unit;
+}
+
+val hyperperiod : ?limit:int -> t list -> int option
+
+val edf_periodic :
+  ?ctx:Sim_context.t -> ?sink:sink -> ?extrapolate:bool -> ?listeners:hyperperiod_listener list ->
+  tempo_max:int -> t list -> int * timeline_event list
+val rate_monotonic_periodic :
+  ?ctx:Sim_context.t -> ?sink:sink -> ?extrapolate:bool -> ?listeners:hyperperiod_listener list ->
+  tempo_max:int -> t list -> int * timeline_event list
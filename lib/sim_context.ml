@@ -0,0 +1,47 @@
+(* Estado de uma execução da simulação.
+   Cada execução tem o seu próprio contexto (tabelas de instâncias, índice de
+   processos, gerador de aleatórios e cópias dos processos), por isso várias
+   execuções podem correr em paralelo, em domínios diferentes, sem partilharem
+   estado mutável. *)
+
+(* Contadores do motor, lidos pelo --profile. São só incrementos de inteiros,
+   por isso ficam sempre ligados. *)
+type counters = {
+  mutable queue_pushes : int;      (* inserções na fila de prontos *)
+  mutable queue_pops : int;        (* remoções da fila de prontos *)
+  mutable preemptions : int;       (* processos substituídos por outro antes de terminar *)
+  mutable context_switches : int;  (* processos postos a correr *)
+  mutable events : int;            (* eventos da timeline emitidos *)
+}
+
+type t = {
+  rng : Random.State.t;                          (* gerador de aleatórios desta execução *)
+  processes : Process.t list;                    (* cópias privadas dos processos *)
+  mutable all_instances : Process.t list;        (* instâncias periódicas geradas *)
+  mutable completed_instances : Process.t list;  (* instâncias terminadas *)
+  mutable next_instance_id : int;                (* próximo ID sequencial de instância *)
+  process_index : (int, Process.t) Hashtbl.t;    (* id -> processo/instância desta execução *)
+  counters : counters;                           (* contadores do motor nesta execução *)
+  mutable taken_off : (int * int option) option; (* (pid, instância) tirado do CPU, até ao despacho seguinte *)
+}
+
+(* Cópia de um processo: os campos mutáveis deixam de ser partilhados com o original *)
+let copy_process (p : Process.t) : Process.t =
+  { p with Process.state = p.Process.state }
+
+(* Cria o contexto de uma execução com cópias dos processos dados *)
+let create ?(rng = Random.State.make_self_init ()) (processes : Process.t list) : t =
+  {
+    rng;
+    processes = List.map copy_process processes;
+    all_instances = [];
+    completed_instances = [];
+    next_instance_id = 1000;
+    process_index = Hashtbl.create 1024;
+    counters = { queue_pushes = 0; queue_pops = 0; preemptions = 0; context_switches = 0; events = 0 };
+    taken_off = None;
+  }
+
+(* Contexto usado quando o chamador não indica nenhum.
+   Serve apenas para uso sequencial (compatível com a API antiga). *)
+let default = create []
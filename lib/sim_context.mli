@@ -0,0 +1,22 @@
+type counters = {
+  mutable queue_pushes : int;
+  mutable queue_pops : int;
+  mutable preemptions : int;
+  mutable context_switches : int;
+  mutable events : int;
+}
+
+type t = {
+  rng : Random.State.t;
+  processes : Process.t list;
+  mutable all_instances : Process.t list;
+  mutable completed_instances : Process.t list;
+  mutable next_instance_id : int;
+  process_index : (int, Process.t) Hashtbl.t;
+  counters : counters;
+  mutable taken_off : (int * int option) option;
+}
+
+val copy_process : Process.t -> Process.t
+val create : ?rng:Random.State.t -> Process.t list -> t
+val default : t
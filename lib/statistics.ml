@@ -1,6 +1,25 @@
 open Process
 open Scheduler
 
+(* percentis (aproximados, ver Histogram) de uma métrica *)
+type percentiles = {
+  p50 : float;
+  p95 : float;
+  p99 : float;
+}
+
+(* percentis dos tempos de espera, de resposta (primeira execução - chegada) e de turnaround *)
+type latency = {
+  waiting : percentiles;
+  response : percentiles;
+  turnaround : percentiles;
+}
+
+type priority_stats = {
+  completed : int;
+  class_latency : latency;
+}
+
 (* tipo que define os dados que a simulacao vai dar *)
 type simulation_stats = {
   total_simulation_time : int;
@@ -10,64 +29,282 @@ type simulation_stats = {
   cpu_utilization : float;
   throughput : float;
   deadline_misses : int;
+  avg_response_time : float;
+  latency : latency;                          (* percentis de todos os processos terminados *)
+  by_priority : (int * priority_stats) list;  (* percentis por classe de prioridade *)
 }
 
 (* funcao para dizer se um processo é uma instancia de outro nos algoritmos de tempo real *)
 let is_realtime_instance p =
-  p.id >= 1000  (* têm sempre IDs >= 1000  (x001, x002, ...)*)
-
-(* funcao que da o numero total de processos dependendo se o algoritmo é de tempo real ou nao *)
-let get_completed_processes processes =
-  let completed_instances = Scheduler.get_completed_instances () in
-  let is_realtime = List.exists is_realtime_instance processes in
-  if is_realtime && completed_instances <> [] then
-    completed_instances
+  Option.is_some p.instance_of  (* marcado por gerar_instancias_periodicas *)
+
+(* Histogramas de uma métrica de latência *)
+type latency_histograms = {
+  waiting_h : Histogram.t;
+  response_h : Histogram.t;
+  turnaround_h : Histogram.t;
+}
+
+let create_latency_histograms () =
+  { waiting_h = Histogram.create (); response_h = Histogram.create (); turnaround_h = Histogram.create () }
+
+let percentiles_of h =
+  { p50 = Histogram.quantile h 0.50; p95 = Histogram.quantile h 0.95; p99 = Histogram.quantile h 0.99 }
+
+let latency_of hs =
+  { waiting = percentiles_of hs.waiting_h;
+    response = percentiles_of hs.response_h;
+    turnaround = percentiles_of hs.turnaround_h }
+
+(* Consumidor do stream de eventos: as estatísticas são calculadas à medida que a
+   simulação corre, numa só passagem, sem guardar o log nem a lista de terminados.
+   Pode ser usado como sink das políticas (Statistics.observe c).
+   A memória usada é fixa, exceto a tabela de primeiras execuções, que só tem
+   os processos que já começaram e ainda não terminaram.
+   O tempo livre vem da duração dos intervalos: um evento com pid -1 (Waiting)
+   abre um intervalo de CPU livre, que fecha no evento seguinte. *)
+type collector = {
+  ctx : Sim_context.t;
+  mutable idle_time : int;                   (* tempo de CPU livre nos intervalos já fechados *)
+  mutable idle_since : int option;           (* início do intervalo livre em curso *)
+  mutable missed : (int * int, unit) Hashtbl.t;  (* (id, deadline absoluto) falhados *)
+  mutable pending : ((int * int) * int) list; (* terminados sem completion_time: (chave, deadline) *)
+  mutable completed_count : int;             (* processos/instâncias terminados *)
+  mutable total_waiting : int;
+  mutable total_turnaround : int;
+  mutable total_response : int;
+  mutable first_run : (int, int) Hashtbl.t;  (* id -> instante da primeira execução *)
+  mutable overall : latency_histograms;
+  mutable classes : (int, int ref * latency_histograms) Hashtbl.t;  (* prioridade -> (terminados, histogramas) *)
+  mutable extra_misses : int;                (* deadline misses dos hiperperíodos extrapolados *)
+  mutable snapshot : snapshot option;        (* contadores no início do último hiperperíodo *)
+}
+
+(* Cópia dos contadores no início de um hiperperíodo (ver hyperperiod_listener) *)
+and snapshot = {
+  s_idle : int;
+  s_completed : int;
+  s_waiting : int;
+  s_turnaround : int;
+  s_response : int;
+  s_missed : int;
+  s_overall : latency_histograms;
+  s_classes : (int * (int * latency_histograms)) list;
+}
+
+let create_collector ?(ctx = Sim_context.default) () : collector =
+  { ctx; idle_time = 0; idle_since = None; missed = Hashtbl.create 10; pending = [];
+    completed_count = 0; total_waiting = 0; total_turnaround = 0; total_response = 0;
+    first_run = Hashtbl.create 64; overall = create_latency_histograms ();
+    classes = Hashtbl.create 8; extra_misses = 0; snapshot = None }
+
+(* deadline absoluto de um processo ou instância *)
+let absolute_deadline p deadline =
+  if is_realtime_instance p then
+    match p.deadline with
+    | Some d -> d  (* para instâncias RT, deadline já é absoluto *)
+    | None -> p.arrival_time + deadline
   else
-    List.filter (fun p -> 
-      match p.completion_time with 
-      | Some _ -> true 
-      | None -> false
-    ) processes
-
-(* calcula as estatísticas da simulação a partir dos processos e do log *)
-let calculate_statistics (processos : t list) (tempo_final : int) (log : timeline_event list) : simulation_stats =
-  (* obtém apenas os processos/instâncias terminados *)
-  let completed = get_completed_processes processos in
-  (* filtra apenas os que têm completion_time e turnaround_time definidos *)
-  let valid_for_stats = List.filter (fun p -> 
-    match p.completion_time, p.turnaround_time with
-    | Some _, Some _ -> true
-    | _ -> false
-  ) completed in
-  (* número total de processos/instâncias terminados *)
-  let total_completed = List.length valid_for_stats in
-  (* soma total dos tempos de espera *)
-  let total_waiting_time =
-    List.fold_left (fun acc p -> acc + p.waiting_time) 0 valid_for_stats
+    p.arrival_time + deadline
+
+(* Acrescenta os tempos de um processo terminado aos histogramas *)
+let add_latency hs ~waiting ~response ~turnaround =
+  Histogram.add hs.waiting_h waiting;
+  Histogram.add hs.response_h response;
+  Histogram.add hs.turnaround_h turnaround
+
+(* Regista um processo/instância terminado (só os que têm completion e turnaround definidos) *)
+let record_completion (c : collector) key_id p =
+  match p.completion_time, p.turnaround_time with
+  | Some _, Some turnaround ->
+      (* tempo de resposta: da chegada até à primeira vez que correu *)
+      let response =
+        match Hashtbl.find_opt c.first_run key_id with
+        | Some t -> t - p.arrival_time
+        | None -> p.waiting_time
+      in
+      Hashtbl.remove c.first_run key_id;
+      c.completed_count <- c.completed_count + 1;
+      c.total_waiting <- c.total_waiting + p.waiting_time;
+      c.total_turnaround <- c.total_turnaround + turnaround;
+      c.total_response <- c.total_response + response;
+      add_latency c.overall ~waiting:p.waiting_time ~response ~turnaround;
+      let count, hs =
+        match Hashtbl.find_opt c.classes p.priority with
+        | Some entry -> entry
+        | None ->
+            let entry = (ref 0, create_latency_histograms ()) in
+            Hashtbl.replace c.classes p.priority entry;
+            entry
+      in
+      incr count;
+      add_latency hs ~waiting:p.waiting_time ~response ~turnaround
+  | _ -> ()
+
+(* Processa um evento (usar como sink: [Statistics.observe c]) *)
+let observe (c : collector) (event : timeline_event) : unit =
+  (* o evento seguinte a um Waiting com pid -1 fecha o intervalo livre *)
+  (match c.idle_since with
+   | Some since ->
+       c.idle_time <- c.idle_time + (event.time - since);
+       c.idle_since <- None
+   | None -> ());
+  if event.process_id = -1 && event.new_state = Process.Waiting then c.idle_since <- Some event.time;
+  let key_id = match event.instance_id with Some iid -> iid | None -> event.process_id in
+  match event.new_state with
+  | Process.Running ->
+      if not (Hashtbl.mem c.first_run key_id) then Hashtbl.replace c.first_run key_id event.time
+  | Process.Terminated -> (
+      let pid = event.process_id in
+      let instance_id = event.instance_id in
+      (* encontra o processo/instância correspondente no índice da execução *)
+      match Scheduler.find_process ~ctx:c.ctx key_id with
+      | Some p -> (
+          record_completion c key_id p;
+          match p.deadline, p.completion_time with
+          | Some deadline, Some ct ->
+              let abs_deadline = absolute_deadline p deadline in
+              (* verifica se terminou depois do deadline *)
+              if ct > abs_deadline then
+                let key = match instance_id with
+                          | Some iid -> (iid, abs_deadline)
+                          | None -> (pid, abs_deadline)
+                in
+                Hashtbl.replace c.missed key ()
+          | Some deadline, None ->
+              (* sem completion_time: só no fim se sabe se a simulação passou o deadline *)
+              let abs_deadline = absolute_deadline p deadline in
+              let key = match instance_id with
+                        | Some iid -> (iid, abs_deadline)
+                        | None -> (pid, abs_deadline)
+              in
+              c.pending <- (key, abs_deadline) :: c.pending
+          | _ -> ()
+        )
+      | None -> ()
+    )
+  | _ -> ()
+
+let copy_latency_histograms hs =
+  { waiting_h = Histogram.copy hs.waiting_h;
+    response_h = Histogram.copy hs.response_h;
+    turnaround_h = Histogram.copy hs.turnaround_h }
+
+let repeat_latency_histograms hs previous times =
+  Histogram.repeat_since hs.waiting_h previous.waiting_h times;
+  Histogram.repeat_since hs.response_h previous.response_h times;
+  Histogram.repeat_since hs.turnaround_h previous.turnaround_h times
+
+let missed_count (c : collector) = Hashtbl.length c.missed + c.extra_misses
+
+(* Listener do motor periódico (Scheduler.edf_periodic / rate_monotonic_periodic):
+   no início de cada hiperperíodo guarda uma cópia dos contadores e, quando o motor
+   salta k hiperperíodos, soma k vezes o que foi acumulado desde essa cópia.
+   O resultado é o mesmo que se os hiperperíodos saltados tivessem sido simulados. *)
+let hyperperiod_listener (c : collector) : Scheduler.hyperperiod_listener =
+  let on_boundary _ =
+    c.snapshot <- Some {
+      s_idle = c.idle_time;
+      s_completed = c.completed_count;
+      s_waiting = c.total_waiting;
+      s_turnaround = c.total_turnaround;
+      s_response = c.total_response;
+      s_missed = missed_count c;
+      s_overall = copy_latency_histograms c.overall;
+      s_classes =
+        Hashtbl.fold (fun prio (count, hs) acc -> (prio, (!count, copy_latency_histograms hs)) :: acc)
+          c.classes [];
+    }
   in
-  (* soma total dos tempos de turnaround *)
-  let total_turnaround_time =
-    List.fold_left (fun acc p ->
-      match p.turnaround_time with
-      | Some tat -> acc + tat
-      | None -> acc
-    ) 0 valid_for_stats
+  let on_skip (skip : Scheduler.hyperperiod_skip) =
+    match c.snapshot with
+    | None -> ()
+    | Some s ->
+        let k = skip.repeats in
+        let repeat now before = now + ((now - before) * k) in
+        c.extra_misses <- c.extra_misses + ((missed_count c - s.s_missed) * k);
+        c.idle_time <- repeat c.idle_time s.s_idle;
+        c.completed_count <- repeat c.completed_count s.s_completed;
+        c.total_waiting <- repeat c.total_waiting s.s_waiting;
+        c.total_turnaround <- repeat c.total_turnaround s.s_turnaround;
+        c.total_response <- repeat c.total_response s.s_response;
+        repeat_latency_histograms c.overall s.s_overall k;
+        Hashtbl.iter (fun prio (count, hs) ->
+          let before_count, before_hs =
+            match List.assoc_opt prio s.s_classes with
+            | Some entry -> entry
+            | None -> (0, create_latency_histograms ())
+          in
+          count := repeat !count before_count;
+          repeat_latency_histograms hs before_hs k
+        ) c.classes;
+        (* as instâncias em curso mudaram de id: a primeira execução passa para o novo,
+           deslocada pelos hiperperíodos saltados *)
+        let shift = k * skip.hyperperiod in
+        List.iter (fun (old_id, new_id) ->
+          match Hashtbl.find_opt c.first_run old_id with
+          | Some t ->
+              Hashtbl.remove c.first_run old_id;
+              Hashtbl.replace c.first_run new_id (t + shift)
+          | None -> ()
+        ) skip.renamed;
+        c.snapshot <- None
   in
+  { Scheduler.on_boundary; on_skip }
+
+(* Estado do collector guardado ao lado de um checkpoint do motor (ver Checkpoint):
+   uma cópia independente das tabelas e dos histogramas *)
+type collector_state = collector
+
+let copy_collector (c : collector) : collector =
+  let classes = Hashtbl.create (Hashtbl.length c.classes) in
+  Hashtbl.iter (fun prio (count, hs) ->
+    Hashtbl.replace classes prio (ref !count, copy_latency_histograms hs)
+  ) c.classes;
+  { c with
+    missed = Hashtbl.copy c.missed;
+    first_run = Hashtbl.copy c.first_run;
+    overall = copy_latency_histograms c.overall;
+    classes }
+
+let save_collector (c : collector) : collector_state = copy_collector c
+
+(* Repõe no collector (de outra execução) o estado guardado; o estado pode ser
+   reposto várias vezes, por isso é copiado outra vez *)
+let restore_collector (c : collector) (state : collector_state) : unit =
+  let s = copy_collector state in
+  c.idle_time <- s.idle_time;
+  c.idle_since <- s.idle_since;
+  c.missed <- s.missed;
+  c.pending <- s.pending;
+  c.completed_count <- s.completed_count;
+  c.total_waiting <- s.total_waiting;
+  c.total_turnaround <- s.total_turnaround;
+  c.total_response <- s.total_response;
+  c.first_run <- s.first_run;
+  c.overall <- s.overall;
+  c.classes <- s.classes;
+  c.extra_misses <- s.extra_misses;
+  c.snapshot <- s.snapshot
+
+(* calcula as estatísticas finais a partir do que o collector acumulou *)
+let finish (c : collector) (tempo_final : int) : simulation_stats =
+  (* número total de processos/instâncias terminados *)
+  let total_completed = c.completed_count in
   (* tempo total de simulação em float *)
   let total_time = float_of_int tempo_final in
-  (* tempo total em que a CPU esteve ocupada *)
-  let idle_time = List.fold_left (fun acc ev -> if ev.process_id = -1 then acc + 1 else acc) 0 log in
+  (* tempo total em que a CPU esteve livre (com o intervalo ainda aberto, até ao fim) *)
+  let idle_time =
+    match c.idle_since with
+    | Some since when tempo_final > since -> c.idle_time + (tempo_final - since)
+    | _ -> c.idle_time
+  in
   (* percentagem de utilização da CPU *)
   let cpu_utilization =
     if tempo_final > 0 then (1.0 -. (float_of_int idle_time /. total_time)) *. 100.0 else 0.0
   in
-  (* tempo médio de espera *)
-  let avg_waiting_time =
-    if total_completed > 0 then (float_of_int total_waiting_time) /. (float_of_int total_completed) else 0.0
-  in
-  (* tempo médio de turnaround *)
-  let avg_turnaround_time =
-    if total_completed > 0 then (float_of_int total_turnaround_time) /. (float_of_int total_completed) else 0.0
+  let average total =
+    if total_completed > 0 then (float_of_int total) /. (float_of_int total_completed) else 0.0
   in
   (* throughput: processos terminados por unidade de tempo *)
   let throughput =
@@ -75,73 +312,36 @@ let calculate_statistics (processos : t list) (tempo_final : int) (log : timelin
   in
   (* calcula o número de deadline misses *)
   let deadline_misses =
-    let missed_set = Hashtbl.create 10 in
-    List.iter (fun event ->
-      match event.new_state with
-      | Process.Terminated -> (
-          let pid = event.process_id in
-          let instance_id = event.instance_id in
-          (* encontra o processo/instância correspondente *)
-          let find_process =
-            match instance_id with
-            | Some iid -> 
-                if !Scheduler.all_instances <> [] then
-                  List.find_opt (fun p -> p.id = iid) !Scheduler.all_instances
-                else
-                  List.find_opt (fun p -> p.id = pid) processos
-            | None -> 
-                List.find_opt (fun p -> p.id = pid) processos
-          in
-          match find_process with
-          | Some p -> (
-              match p.deadline, p.completion_time with
-              | Some deadline, Some ct ->
-                  (* calcula o deadline absoluto *)
-                  let abs_deadline = 
-                    if is_realtime_instance p then
-                      match p.deadline with
-                      | Some d -> d  (* para instâncias RT, deadline já é absoluto *)
-                      | None -> p.arrival_time + deadline
-                    else
-                      p.arrival_time + deadline
-                  in
-                  (* verifica se terminou depois do deadline *)
-                  if ct > abs_deadline then
-                    let key = match instance_id with
-                              | Some iid -> (iid, abs_deadline)
-                              | None -> (pid, abs_deadline)
-                    in
-                    Hashtbl.replace missed_set key true
-              | Some deadline, None ->
-                  (* caso não tenha completion_time, verifica se a simulação passou o deadline *)
-                  let abs_deadline = 
-                    if is_realtime_instance p then
-                      match p.deadline with
-                      | Some d -> d
-                      | None -> p.arrival_time + deadline
-                    else 
-                      p.arrival_time + deadline
-                  in
-                  if tempo_final > abs_deadline then
-                    let key = match instance_id with
-                              | Some iid -> (iid, abs_deadline)
-                              | None -> (pid, abs_deadline)
-                    in
-                    Hashtbl.replace missed_set key true
-              | _ -> ()
-            )
-          | None -> ()
-        )
-      | _ -> ()
-    ) log;
-    Hashtbl.length missed_set
+    let missed_set = Hashtbl.copy c.missed in
+    List.iter (fun (key, abs_deadline) ->
+      if tempo_final > abs_deadline then Hashtbl.replace missed_set key ()
+    ) c.pending;
+    Hashtbl.length missed_set + c.extra_misses
+  in
+  (* percentis por classe de prioridade, ordenados pela prioridade *)
+  let by_priority =
+    Hashtbl.fold (fun prio (count, hs) acc ->
+      (prio, { completed = !count; class_latency = latency_of hs }) :: acc
+    ) c.classes []
+    |> List.sort (fun (a, _) (b, _) -> compare a b)
   in
   {
     total_simulation_time = tempo_final;
     total_processes_completed = total_completed;
-    avg_waiting_time;
-    avg_turnaround_time;
+    avg_waiting_time = average c.total_waiting;
+    avg_turnaround_time = average c.total_turnaround;
     cpu_utilization;
     throughput;
     deadline_misses;
+    avg_response_time = average c.total_response;
+    latency = latency_of c.overall;
+    by_priority;
   }
+
+(* calcula as estatísticas da simulação a partir do log completo
+   (a lista de processos já não é precisa: tudo vem dos eventos, mas mantém-se
+   o parâmetro para não mudar a interface) *)
+let calculate_statistics ?(ctx = Sim_context.default) (_processos : t list) (tempo_final : int) (log : timeline_event list) : simulation_stats =
+  let c = create_collector ~ctx () in
+  List.iter (observe c) log;
+  finish c tempo_final
@@ -1,3 +1,22 @@
+(* percentis (aproximados) de uma métrica *)
+type percentiles = {
+  p50 : float;
+  p95 : float;
+  p99 : float;
+}
+
+(* percentis dos tempos de espera, de resposta e de turnaround *)
+type latency = {
+  waiting : percentiles;
+  response : percentiles;
+  turnaround : percentiles;
+}
+
+type priority_stats = {
+  completed : int;
+  class_latency : latency;
+}
+
 type simulation_stats = {
   total_simulation_time : int;
   total_processes_completed : int;
@@ -6,7 +25,30 @@ type simulation_stats = {
   cpu_utilization : float;
   throughput : float;
   deadline_misses : int;
+  avg_response_time : float;
+  latency : latency;
+  by_priority : (int * priority_stats) list;
 }
 
 val calculate_statistics :
+  ?ctx:Sim_context.t ->
   Process.t list -> int -> Scheduler.timeline_event list -> simulation_stats
+
+(* Estatísticas calculadas em stream: o collector é usado como sink das políticas
+   (Statistics.observe c) e o log não precisa de ser guardado *)
+type collector
+
+val create_collector : ?ctx:Sim_context.t -> unit -> collector
+val observe : collector -> Scheduler.timeline_event -> unit
+val finish : collector -> int -> simulation_stats
+
+(* Estado do collector para guardar ao lado de um checkpoint do motor (Checkpoint):
+   restore_collector repõe-no noutro collector, para retomar a partir do checkpoint *)
+type collector_state
+
+val save_collector : collector -> collector_state
+val restore_collector : collector -> collector_state -> unit
+
+(* Listener para Scheduler.edf_periodic / rate_monotonic_periodic com ~extrapolate:
+   repete nas estatísticas os hiperperíodos que o motor saltou *)
+val hyperperiod_listener : collector -> Scheduler.hyperperiod_listener
@@ -0,0 +1,233 @@
+(* Carga de trabalho lida de ficheiro, guardada em colunas compactas.
+   Cada coluna é um Bigarray de int32 (4 bytes por valor), por isso um traço com
+   milhões de processos não cria uma string, lista ou tuplo por linha.
+
+   Há dois formatos de ficheiro:
+   - CSV "id,chegada,burst,prioridade" (ou período para rm/edf), lido numa só passagem;
+   - binário de largura fixa, mapeado em memória com Unix.map_file, que abre em
+     tempo praticamente constante. Tem um cabeçalho de 4 int32
+     (magic, versão, número de processos, marca da ordem de bytes) seguido das
+     4 colunas, cada uma com n int32. Os valores são escritos na ordem de bytes
+     da máquina que criou o ficheiro, indicada pela marca; numa máquina com a
+     ordem contrária as colunas são convertidas ao abrir (já não são mapeadas). *)
+
+type column = (int32, Bigarray.int32_elt, Bigarray.c_layout) Bigarray.Array1.t
+
+type t = {
+  ids : column;
+  arrivals : column;
+  bursts : column;
+  params : column;   (* prioridade, ou período no caso de rm/edf *)
+}
+
+let magic = 0x50534348l   (* "PSCH" *)
+let version = 2l
+let byte_order = 0x01020304l  (* marca escrita na ordem de bytes de quem criou o ficheiro *)
+let header_size = 4       (* tamanho do cabeçalho, em int32 *)
+let int32_max = 0x7fffffff
+
+let create_column n : column = Bigarray.Array1.create Bigarray.int32 Bigarray.c_layout n
+
+(* Número de processos *)
+let length (w : t) : int = Bigarray.Array1.dim w.ids
+
+(* Acesso aos campos do processo na posição i *)
+let id (w : t) i = Int32.to_int (Bigarray.Array1.get w.ids i)
+let arrival (w : t) i = Int32.to_int (Bigarray.Array1.get w.arrivals i)
+let burst (w : t) i = Int32.to_int (Bigarray.Array1.get w.bursts i)
+let param (w : t) i = Int32.to_int (Bigarray.Array1.get w.params i)
+
+(* Lista de tuplos (id, chegada, burst, prioridade/período), como os antigos leitores *)
+let to_tuples (w : t) : (int * int * int * int) list =
+  List.init (length w) (fun i -> (id w i, arrival w i, burst w i, param w i))
+
+(* Duplica a capacidade de uma coluna, mantendo os primeiros n valores *)
+let grow (col : column) (n : int) : column =
+  let bigger = create_column (max 1024 (2 * Bigarray.Array1.dim col)) in
+  Bigarray.Array1.blit (Bigarray.Array1.sub col 0 n) (Bigarray.Array1.sub bigger 0 n);
+  bigger
+
+(* Os ids identificam os processos durante a simulação (índice da execução,
+   estatísticas, checkpoints), por isso um id repetido é recusado ao carregar *)
+let check_unique_ids (w : t) (filename : string) : unit =
+  let ids = Array.init (length w) (id w) in
+  Array.sort Int.compare ids;
+  for i = 1 to Array.length ids - 1 do
+    if ids.(i) = ids.(i - 1) then
+      failwith (Printf.sprintf "ID de processo repetido (%d) em '%s'." ids.(i) filename)
+  done
+
+(* Leitura do CSV numa só passagem, por blocos de 64 KiB.
+   Os inteiros são lidos diretamente dos bytes (sem split nem trim) e vão logo para
+   as colunas. Linhas em branco são ignoradas; linhas inválidas (ex: cabeçalho)
+   são contadas e resumidas num único aviso.
+   Lança Sys_error se o ficheiro não puder ser aberto e Failure se houver ids repetidos. *)
+let load_csv (filename : string) : t =
+  let ic = open_in_bin filename in
+  Fun.protect ~finally:(fun () -> close_in_noerr ic) (fun () ->
+    let cols = Array.init 4 (fun _ -> create_column 1024) in
+    let count = ref 0 in
+    let invalid = ref 0 in
+    let first_invalid = ref 0 in
+    let line = ref 1 in
+    (* estado da linha atual *)
+    let fields = Array.make 4 0 in
+    let nfield = ref 0 in
+    let value = ref 0 in
+    let digits = ref 0 in
+    let negative = ref false in
+    let ended = ref false in   (* já apareceu espaço depois dos dígitos deste campo *)
+    let bad = ref false in
+    let blank = ref true in
+    let reset_field () =
+      value := 0; digits := 0; negative := false; ended := false
+    in
+    let end_field () =
+      if !digits = 0 || !value > int32_max || !nfield >= 4 then bad := true
+      else fields.(!nfield) <- (if !negative then - !value else !value);
+      incr nfield;
+      reset_field ()
+    in
+    let end_line () =
+      if not !blank then begin
+        end_field ();
+        if !bad || !nfield <> 4 then begin
+          if !invalid = 0 then first_invalid := !line;
+          incr invalid
+        end else begin
+          if !count = Bigarray.Array1.dim cols.(0) then
+            Array.iteri (fun k col -> cols.(k) <- grow col !count) cols;
+          Array.iteri (fun k col -> Bigarray.Array1.set col !count (Int32.of_int fields.(k))) cols;
+          incr count
+        end
+      end;
+      incr line;
+      nfield := 0; bad := false; blank := true;
+      reset_field ()
+    in
+    let buf = Bytes.create 65536 in
+    let rec loop () =
+      let n = input ic buf 0 (Bytes.length buf) in
+      if n > 0 then begin
+        for i = 0 to n - 1 do
+          match Bytes.unsafe_get buf i with
+          | '\n' -> end_line ()
+          | ' ' | '\t' | '\r' -> if !digits > 0 then ended := true
+          | '0' .. '9' as c ->
+              blank := false;
+              if !ended then bad := true
+              else begin
+                (* acima de int32_max deixa de acumular: o campo já é inválido *)
+                if !value <= int32_max then value := (!value * 10) + (Char.code c - 48);
+                incr digits
+              end
+          | '-' ->
+              blank := false;
+              if !digits > 0 || !negative then bad := true else negative := true
+          | ',' ->
+              blank := false;
+              end_field ()
+          | _ ->
+              blank := false;
+              bad := true
+        done;
+        loop ()
+      end
+    in
+    loop ();
+    end_line ();  (* última linha, se não terminar em '\n' *)
+    if !invalid > 0 then
+      Printf.eprintf
+        "Aviso: %d linha(s) ignorada(s) em '%s' - formato inválido (esperava 4 inteiros: id,inicio,burst,prioridade/periodo); primeira: linha %d\n"
+        !invalid filename !first_invalid;
+    let n = !count in
+    let col k = Bigarray.Array1.sub cols.(k) 0 n in
+    let w = { ids = col 0; arrivals = col 1; bursts = col 2; params = col 3 } in
+    check_unique_ids w filename;
+    w)
+
+(* Inverte a ordem dos bytes de um int32 *)
+let swap32 (x : int32) : int32 =
+  let byte k = Int32.logand (Int32.shift_right_logical x (8 * k)) 0xffl in
+  Int32.logor (Int32.shift_left (byte 0) 24)
+    (Int32.logor (Int32.shift_left (byte 1) 16)
+       (Int32.logor (Int32.shift_left (byte 2) 8) (byte 3)))
+
+(* Abre um ficheiro binário mapeando-o em memória (mapeamento privado, só leitura).
+   Na mesma ordem de bytes as colunas apontam diretamente para o mapeamento: nada
+   é copiado. Na ordem contrária cada coluna é copiada com os bytes invertidos. *)
+let load_binary (filename : string) : t =
+  let fd = Unix.openfile filename [Unix.O_RDONLY] 0 in
+  Fun.protect ~finally:(fun () -> Unix.close fd) (fun () ->
+    let data =
+      Bigarray.array1_of_genarray
+        (Unix.map_file fd Bigarray.int32 Bigarray.c_layout false [| -1 |])
+    in
+    let size = Bigarray.Array1.dim data in
+    let invalid () = failwith ("Ficheiro binário de processos inválido: " ^ filename) in
+    if size < header_size then invalid ();
+    let swapped =
+      if Bigarray.Array1.get data 0 = magic && Bigarray.Array1.get data 3 = byte_order then false
+      else if Bigarray.Array1.get data 0 = swap32 magic && Bigarray.Array1.get data 3 = swap32 byte_order then true
+      else invalid ()
+    in
+    let header k = if swapped then swap32 (Bigarray.Array1.get data k) else Bigarray.Array1.get data k in
+    if header 1 <> version then
+      failwith ("Versão do ficheiro binário de processos não suportada: " ^ filename);
+    let n = Int32.to_int (header 2) in
+    if n < 0 || size < header_size + (4 * n) then
+      failwith ("Ficheiro binário de processos truncado: " ^ filename);
+    let col k =
+      let mapped = Bigarray.Array1.sub data (header_size + (k * n)) n in
+      if not swapped then mapped
+      else begin
+        let c = create_column n in
+        for i = 0 to n - 1 do
+          Bigarray.Array1.unsafe_set c i (swap32 (Bigarray.Array1.unsafe_get mapped i))
+        done;
+        c
+      end
+    in
+    let w = { ids = col 0; arrivals = col 1; bursts = col 2; params = col 3 } in
+    check_unique_ids w filename;
+    w)
+
+(* Escreve a carga no formato binário (o ficheiro é criado já com o tamanho final
+   e preenchido através de um mapeamento partilhado) *)
+let save_binary (w : t) (filename : string) : unit =
+  let n = length w in
+  let fd = Unix.openfile filename [Unix.O_RDWR; Unix.O_CREAT; Unix.O_TRUNC] 0o644 in
+  Fun.protect ~finally:(fun () -> Unix.close fd) (fun () ->
+    let data =
+      Bigarray.array1_of_genarray
+        (Unix.map_file fd Bigarray.int32 Bigarray.c_layout true [| header_size + (4 * n) |])
+    in
+    Bigarray.Array1.set data 0 magic;
+    Bigarray.Array1.set data 1 version;
+    Bigarray.Array1.set data 2 (Int32.of_int n);
+    Bigarray.Array1.set data 3 byte_order;
+    List.iteri (fun k col ->
+      Bigarray.Array1.blit col (Bigarray.Array1.sub data (header_size + (k * n)) n)
+    ) [w.ids; w.arrivals; w.bursts; w.params])
+
+(* O ficheiro começa pelo magic do formato binário (em qualquer ordem de bytes)? *)
+let is_binary (filename : string) : bool =
+  let ic = open_in_bin filename in
+  Fun.protect ~finally:(fun () -> close_in_noerr ic) (fun () ->
+    in_channel_length ic >= 4 * header_size
+    && begin
+      let b = Bytes.create 4 in
+      really_input ic b 0 4;
+      let m = Bytes.get_int32_ne b 0 in
+      m = magic || m = swap32 magic
+    end)
+
+(* Lê um ficheiro de processos em qualquer dos dois formatos *)
+let load (filename : string) : t =
+  if is_binary filename then load_binary filename else load_csv filename
+
+(* Converte um CSV de processos para o formato binário. Devolve o número de processos. *)
+let csv_to_binary (csv_file : string) (bin_file : string) : int =
+  let w = load_csv csv_file in
+  save_binary w bin_file;
+  length w
@@ -0,0 +1,42 @@
+(** Carga de trabalho em colunas compactas (Bigarray de int32) *)
+
+type column = (int32, Bigarray.int32_elt, Bigarray.c_layout) Bigarray.Array1.t
+
+type t = {
+  ids : column;
+  arrivals : column;
+  bursts : column;
+  params : column;   (** prioridade, ou período no caso de rm/edf *)
+}
+
+(** Número de processos *)
+val length : t -> int
+
+(** Campos do processo na posição dada *)
+val id : t -> int -> int
+val arrival : t -> int -> int
+val burst : t -> int -> int
+val param : t -> int -> int
+
+(** Tuplos (id, chegada, burst, prioridade/período) pela ordem do ficheiro *)
+val to_tuples : t -> (int * int * int * int) list
+
+(** Lê um CSV numa só passagem (lança [Sys_error] se não o conseguir abrir e
+    [Failure] se houver ids repetidos) *)
+val load_csv : string -> t
+
+(** Abre um ficheiro no formato binário, mapeado em memória ([Failure] se houver
+    ids repetidos) *)
+val load_binary : string -> t
+
+(** Escreve a carga no formato binário *)
+val save_binary : t -> string -> unit
+
+(** Indica se o ficheiro está no formato binário *)
+val is_binary : string -> bool
+
+(** Lê um ficheiro em qualquer dos dois formatos *)
+val load : string -> t
+
+(** Converte um CSV para o formato binário e devolve o número de processos *)
+val csv_to_binary : string -> string -> int
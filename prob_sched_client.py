@@ -0,0 +1,215 @@
+# Cliente para o modo --serve do prob_sched.
+#
+# Em vez de lançar um prob_sched.exe novo por simulação (e passar tudo por argv/CSV),
+# cada worker é um processo "prob_sched.exe --serve" que fica vivo: recebe um pedido
+# JSON por linha no stdin e responde com uma linha JSON no stdout.
+# O WorkerPool mantém alguns workers e distribui os pedidos por eles.
+#
+# Exemplo:
+#     with WorkerPool(2) as pool:
+#         r = pool.run({"algo": "rr", "quantum": 4, "gen": 10, "seed": 42})
+#         print(r["results"]["stats"])
+#
+# Também pode ser usado a partir de scripts: lê pedidos (um JSON por linha) do stdin
+# e escreve as respostas pela mesma ordem:
+#     python3 prob_sched_client.py --workers 4 < pedidos.ndjson
+
+import argparse
+import json
+import queue
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# caminho para o programa gerado pelo Dune
+OCAML_PATH = "./_build/default/bin/prob_sched.exe"
+
+
+class WorkerError(Exception):
+    """O worker morreu, não respondeu a tempo ou respondeu com algo que não é JSON."""
+
+
+class SimulationCancelled(WorkerError):
+    """A simulação foi cancelada (o worker que a corria foi terminado)."""
+
+
+class SimulationWorker:
+    """Um processo prob_sched --serve. Não é thread-safe: usar um pedido de cada vez."""
+
+    def __init__(self, exe=OCAML_PATH, extra_args=()):
+        self.cmd = [exe, "--serve", *extra_args]
+        self.proc = None
+        self.lines = None
+
+    def start(self):
+        # stdout lido numa thread à parte, para se poder esperar com timeout
+        # (select nos pipes não funciona em Windows)
+        self.proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     text=True, bufsize=1)
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_lines, args=(self.proc, self.lines), daemon=True).start()
+
+    @staticmethod
+    def _read_lines(proc, lines):
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(None)  # fim do stdout: o processo terminou
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def request(self, pedido, timeout=None, on_progress=None):
+        """Envia um pedido (dicionário) e devolve a resposta (dicionário).
+        Se o worker não estiver vivo é (re)lançado; se passar o timeout é morto.
+        Com on_progress, o worker manda o tempo simulado enquanto corre e
+        on_progress(tempo) é chamado (nesta thread) a cada linha de progresso."""
+        if not self.alive():
+            self.start()
+        # cópias locais: close() pode ser chamado de outra thread (cancelar)
+        proc, lines = self.proc, self.lines
+        if on_progress is not None:
+            pedido = {**pedido, "progress": True}
+        try:
+            proc.stdin.write(json.dumps(pedido) + "\n")
+            proc.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            self.close()
+            raise WorkerError(f"Não foi possível enviar o pedido ao worker: {e}")
+        while True:
+            try:
+                line = lines.get(timeout=timeout)
+            except queue.Empty:
+                # a simulação demorou demasiado: mata o worker (o próximo pedido lança outro)
+                self.close(kill=True)
+                raise WorkerError(f"O worker não respondeu em {timeout} segundos.")
+            if line is None:
+                self.close()
+                raise WorkerError("O worker terminou sem responder.")
+            try:
+                resposta = json.loads(line)
+            except json.JSONDecodeError:
+                self.close()
+                raise WorkerError(f"Resposta do worker não é JSON válido:\n{line}")
+            # linhas {"progress": t} vêm antes da resposta final
+            if "progress" in resposta and "success" not in resposta:
+                if on_progress is not None:
+                    on_progress(resposta["progress"])
+                continue
+            return resposta
+
+    def close(self, kill=False):
+        """Fecha o worker: normalmente com EOF no stdin; com kill=True mata-o logo."""
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        if kill and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        elif proc.poll() is None:
+            try:
+                proc.stdin.close()  # EOF: o worker sai do ciclo
+                proc.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+                proc.wait()
+
+
+class SimulationJob:
+    """Um pedido entregue ao WorkerPool, que pode ser cancelado de outra thread:
+    se ainda estiver à espera de worker não chega a correr; se já estiver a correr,
+    o worker é terminado (o próximo pedido lança outro)."""
+
+    def __init__(self, pedido):
+        self.pedido = pedido
+        self.cancelled = False
+        self.worker = None
+        self.lock = threading.Lock()
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            worker = self.worker
+        if worker is not None:
+            worker.close(kill=True)
+
+
+class WorkerPool:
+    """Alguns workers vivos; cada pedido usa um que esteja livre (ou espera por um).
+    O worker livre usado é o último a ter acabado (LIFO): pedidos seguidos vão para o
+    mesmo worker, que guarda os checkpoints da simulação anterior e só volta a
+    simular a parte afetada quando a carga muda pouco."""
+
+    def __init__(self, size=2, exe=OCAML_PATH, extra_args=()):
+        self.size = max(1, size)
+        self.workers = [SimulationWorker(exe, extra_args) for _ in range(self.size)]
+        self.free = queue.LifoQueue()
+        for w in self.workers:
+            self.free.put(w)
+
+    def run(self, pedido, timeout=None, on_progress=None, job=None):
+        """Corre um pedido num worker livre e devolve a resposta (dicionário).
+        Com job (SimulationJob), job.cancel() interrompe-o e lança SimulationCancelled."""
+        worker = self.free.get()
+        try:
+            if job is not None:
+                if not worker.alive():
+                    worker.start()
+                with job.lock:
+                    if job.cancelled:
+                        raise SimulationCancelled("Simulação cancelada.")
+                    job.worker = worker
+            try:
+                resposta = worker.request(pedido, timeout=timeout, on_progress=on_progress)
+            except WorkerError:
+                if job is not None and job.cancelled:
+                    raise SimulationCancelled("Simulação cancelada.")
+                raise
+            if job is not None and job.cancelled:
+                raise SimulationCancelled("Simulação cancelada.")
+            return resposta
+        finally:
+            if job is not None:
+                with job.lock:
+                    job.worker = None
+            self.free.put(worker)
+
+    def map(self, pedidos, timeout=None):
+        """Corre vários pedidos em paralelo (um por worker) e devolve as respostas pela mesma ordem.
+        Um worker que falhe dá uma resposta de erro igual às do OCaml ("success": false)."""
+        def correr(pedido):
+            try:
+                return self.run(pedido, timeout=timeout)
+            except WorkerError as e:
+                return {"success": False, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(correr, pedidos))
+
+    def close(self):
+        for w in self.workers:
+            w.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Corre pedidos JSON (um por linha no stdin) num conjunto de workers prob_sched --serve.")
+    parser.add_argument("--workers", type=int, default=2, help="número de workers (por omissão 2)")
+    parser.add_argument("--exe", default=OCAML_PATH, help="caminho para o prob_sched.exe")
+    parser.add_argument("--timeout", type=float, default=None, help="segundos por pedido")
+    args = parser.parse_args()
+
+    pedidos = [json.loads(line) for line in sys.stdin if line.strip()]
+    with WorkerPool(args.workers, exe=args.exe) as pool:
+        for resposta in pool.map(pedidos, timeout=args.timeout):
+            print(json.dumps(resposta))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+# Tabela de processos virtualizada para cargas grandes.
+#
+# - Os processos ficam em colunas NumPy (id, chegada, burst, prioridade/período),
+#   não em items do Treeview.
+# - O Treeview só tem os items das linhas que cabem no ecrã. O scroll (barra, roda
+#   do rato, teclado) muda a primeira linha mostrada e os mesmos items são
+#   preenchidos com os valores novos, por isso o custo não depende do número de
+#   processos.
+# - Ordenar (clicar no cabeçalho) e filtrar (ex: "burst>=10 prio=2") trabalham
+#   sobre os arrays; a vista é só um array de índices.
+# - Os CSV são lidos numa thread em segundo plano, aos blocos; as linhas vão
+#   aparecendo à medida que são lidas.
+# - Duplo clique numa célula edita o valor (Enter guarda, Escape cancela); a tabela
+#   fica marcada como editada para a próxima simulação usar estas linhas. Um id
+#   que já exista noutra linha é recusado.
+
+import csv
+import queue
+import re
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+# (nome da coluna no Treeview, título, largura)
+COLUNAS = [
+    ("id", "ID", 50),
+    ("start_time", "Chegada", 70),
+    ("burst_time", "Duração", 70),
+    ("priority_period", "Prioridade/Período", 120),
+]
+# Nomes aceites no filtro para cada coluna
+NOMES_FILTRO = {
+    "id": 0,
+    "chegada": 1, "start": 1, "start_time": 1, "arrival": 1,
+    "burst": 2, "duracao": 2, "duração": 2, "burst_time": 2,
+    "prio": 3, "prioridade": 3, "priority": 3, "periodo": 3, "período": 3, "period": 3,
+}
+OPERADORES = {
+    "=": np.equal, "==": np.equal, "!=": np.not_equal,
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+}
+CONDICAO = re.compile(r"^\s*([^\s<>=!]+)\s*(==|!=|<=|>=|=|<|>)\s*(-?\d+)\s*$")
+
+# Linhas lidas do CSV por bloco (cada bloco é entregue de uma vez à tabela)
+LINHAS_POR_BLOCO = 50_000
+
+
+def ler_csv_em_blocos(filepath, entregar, parar=None):
+    """Lê um CSV "id,chegada,burst,prioridade" e chama entregar(bloco) com arrays
+    (n, 4) de int64, LINHAS_POR_BLOCO linhas de cada vez.
+    A primeira linha é ignorada se não for numérica (cabeçalho); as outras linhas
+    com menos de 4 colunas ou valores inválidos são contadas como ignoradas.
+    Devolve (linhas lidas, linhas ignoradas). Se parar() for verdade a leitura pára."""
+    lidas = ignoradas = 0
+    with open(filepath, mode='r', newline='', encoding='utf-8') as csvfile:
+        bloco = []
+        for numero, row in enumerate(csv.reader(csvfile, delimiter=',')):
+            try:
+                bloco.append((int(row[0]), int(row[1]), int(row[2]), int(row[3])))
+            except (ValueError, IndexError):
+                if numero > 0 and row:
+                    ignoradas += 1
+                continue
+            if len(bloco) == LINHAS_POR_BLOCO:
+                if parar is not None and parar():
+                    return lidas, ignoradas
+                entregar(np.array(bloco, dtype=np.int64))
+                lidas += len(bloco)
+                bloco = []
+        if bloco:
+            entregar(np.array(bloco, dtype=np.int64))
+            lidas += len(bloco)
+    return lidas, ignoradas
+
+
+def filtro_de_texto(texto):
+    """Converte "burst>=10 prio=2" (condições separadas por espaços ou vírgulas)
+    numa lista de (coluna, operador, valor). Lança ValueError se não perceber."""
+    condicoes = []
+    for parte in re.split(r"[,;]|\s+(?=[^\s<>=!]+\s*(?:==|!=|<=|>=|=|<|>))", texto.strip()):
+        if not parte.strip():
+            continue
+        m = CONDICAO.match(parte)
+        if not m or m.group(1).lower() not in NOMES_FILTRO:
+            raise ValueError(f"Condição inválida: '{parte.strip()}' (ex: burst>=10, prio=2, chegada<100)")
+        condicoes.append((NOMES_FILTRO[m.group(1).lower()], OPERADORES[m.group(2)], int(m.group(3))))
+    return condicoes
+
+
+class VirtualTable:
+    """Treeview que só materializa as linhas visíveis de uma tabela guardada em arrays."""
+
+    def __init__(self, master):
+        self.master = master
+        self.tree = ttk.Treeview(master, columns=[c[0] for c in COLUNAS], show='headings',
+                                 selectmode='browse')
+        for indice, (nome, titulo, largura) in enumerate(COLUNAS):
+            self.tree.heading(nome, text=titulo, command=lambda k=indice: self.ordenar(k))
+            self.tree.column(nome, width=largura, anchor=tk.CENTER)
+        self.scrollbar = ttk.Scrollbar(master, orient=tk.VERTICAL, command=self.yview)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+        # dados: arrays com capacidade a dobrar, n linhas usadas
+        self.dados = np.empty((0, 4), dtype=np.int64)
+        self.n = 0
+        self.vista = np.empty(0, dtype=np.int64)  # índices das linhas mostradas, pela ordem
+        self.ordem = None       # (coluna, descendente) ou None
+        self.condicoes = []     # filtro atual
+        self.topo = 0           # primeira linha da vista que está no ecrã
+        self.altura = 20        # linhas que cabem no Treeview
+        self.items = []         # items do Treeview (reutilizados)
+        self.editada = False    # alguma célula foi mudada desde que os dados foram carregados
+        self.ao_editar = None   # chamado depois de cada edição
+        self.caixa = None       # caixa de edição aberta por cima de uma célula
+
+        # leitura em segundo plano
+        self.blocos = queue.Queue()
+        self.leitura = 0        # geração da leitura atual (leituras antigas são ignoradas)
+        self.ao_terminar = None
+
+        self.tree.bind("<Configure>", self._ao_redimensionar)
+        self.tree.bind("<MouseWheel>", self._roda)
+        self.tree.bind("<Button-4>", lambda ev: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda ev: self.scroll(3))
+        self.tree.bind("<Prior>", lambda ev: self._tecla(-self.altura))
+        self.tree.bind("<Next>", lambda ev: self._tecla(self.altura))
+        self.tree.bind("<Up>", lambda ev: self._tecla(-1) if self._no_limite(0) else None)
+        self.tree.bind("<Down>", lambda ev: self._tecla(1) if self._no_limite(-1) else None)
+        self.tree.bind("<Double-1>", self._editar_celula)
+
+    # --- Dados ---
+
+    def __len__(self):
+        return self.n
+
+    def limpar(self):
+        self.leitura += 1  # ignora blocos de uma leitura que ainda esteja a decorrer
+        self.dados = np.empty((0, 4), dtype=np.int64)
+        self.n = 0
+        self.topo = 0
+        self.editada = False
+        self._atualizar_vista()
+
+    def set_rows(self, linhas):
+        """Substitui os dados por uma lista de [id, chegada, burst, prioridade/período]."""
+        self.limpar()
+        if len(linhas):
+            self._acrescentar(np.asarray(linhas, dtype=np.int64).reshape(-1, 4))
+            self._atualizar_vista()
+
+    def rows(self):
+        """Todas as linhas carregadas (pela ordem original), como array (n, 4)."""
+        return self.dados[:self.n]
+
+    def _acrescentar(self, bloco):
+        if self.n + len(bloco) > len(self.dados):
+            maior = np.empty((max(2 * len(self.dados), self.n + len(bloco), 1024), 4), dtype=np.int64)
+            maior[:self.n] = self.dados[:self.n]
+            self.dados = maior
+        self.dados[self.n:self.n + len(bloco)] = bloco
+        self.n += len(bloco)
+
+    def load_csv(self, filepath, ao_terminar=None):
+        """Lê o CSV numa thread; as linhas vão aparecendo. ao_terminar(lidas, ignoradas, erro)
+        é chamado no Tk quando a leitura acaba (erro é None ou a exceção)."""
+        self.limpar()
+        leitura = self.leitura
+        self.ao_terminar = ao_terminar
+
+        def ler():
+            try:
+                lidas, ignoradas = ler_csv_em_blocos(
+                    filepath, lambda bloco: self.blocos.put((leitura, "bloco", bloco)),
+                    parar=lambda: self.leitura != leitura)
+                self.blocos.put((leitura, "fim", (lidas, ignoradas, None)))
+            except Exception as e:
+                self.blocos.put((leitura, "fim", (0, 0, e)))
+
+        threading.Thread(target=ler, daemon=True).start()
+        self.master.after(100, self._receber_blocos, leitura)
+
+    def _receber_blocos(self, leitura):
+        if leitura != self.leitura:
+            return  # começou outra leitura (ou a tabela foi limpa)
+        novos = False
+        terminou = None
+        try:
+            while True:
+                de, tipo, valor = self.blocos.get_nowait()
+                if de != leitura:
+                    continue
+                if tipo == "bloco":
+                    self._acrescentar(valor)
+                    novos = True
+                else:
+                    terminou = valor
+        except queue.Empty:
+            pass
+        if novos:
+            self._atualizar_vista(manter_topo=True)
+        if terminou is None:
+            self.master.after(100, self._receber_blocos, leitura)
+        elif self.ao_terminar is not None:
+            self.ao_terminar(*terminou)
+
+    def editar(self, linha, coluna, valor):
+        """Muda um valor (linha dos dados, não da vista) e volta a ordenar/filtrar."""
+        self.dados[linha, coluna] = valor
+        self.editada = True
+        self._atualizar_vista(manter_topo=True)
+        if self.ao_editar is not None:
+            self.ao_editar(linha)
+
+    def _editar_celula(self, ev):
+        """Duplo clique: abre uma caixa de texto por cima da célula."""
+        item = self.tree.identify_row(ev.y)
+        coluna = self.tree.identify_column(ev.x)  # "#1" a "#4"
+        if not item or not coluna or item not in self.items:
+            return
+        caixa_celula = self.tree.bbox(item, coluna)
+        if not caixa_celula:
+            return
+        indice = int(coluna[1:]) - 1
+        linha = int(self.vista[self.topo + self.items.index(item)])
+        self._fechar_caixa()
+        x, y, largura, altura = caixa_celula
+        caixa = ttk.Entry(self.tree, justify=tk.CENTER)
+        caixa.insert(0, str(self.dados[linha, indice]))
+        caixa.select_range(0, tk.END)
+        caixa.place(x=x, y=y, width=largura, height=altura)
+        caixa.focus_set()
+        self.caixa = caixa
+
+        def guardar(fechar_se_invalido):
+            if self.caixa is not caixa:
+                return  # já fechada (ex: o FocusOut de quando a caixa é destruída)
+            try:
+                valor = int(caixa.get())
+            except ValueError:
+                valor = -1
+            # chegada e prioridade/período >= 0, duração >= 1; o id não pode ser o de
+            # outro processo (o worker identifica os processos pelo id entre simulações)
+            repetido = (indice == 0 and valor != self.dados[linha, 0]
+                        and bool(np.any(self.dados[:self.n, 0] == valor)))
+            if valor < (1 if indice == 2 else 0) or repetido:
+                if fechar_se_invalido:
+                    self._fechar_caixa()
+                else:
+                    self.tree.bell()
+                return
+            self._fechar_caixa()
+            self.editar(linha, indice, valor)
+
+        caixa.bind("<Return>", lambda ev: guardar(False))
+        caixa.bind("<KP_Enter>", lambda ev: guardar(False))
+        caixa.bind("<FocusOut>", lambda ev: guardar(True))
+        caixa.bind("<Escape>", lambda ev: self._fechar_caixa())
+
+    def _fechar_caixa(self):
+        caixa, self.caixa = self.caixa, None
+        if caixa is not None:
+            caixa.destroy()
+            self.tree.focus_set()
+
+    # --- Ordenar e filtrar ---
+
+    def ordenar(self, coluna):
+        """Ordena pela coluna (clicar outra vez inverte a ordem)."""
+        descendente = self.ordem == (coluna, False)
+        self.ordem = (coluna, descendente)
+        for indice, (nome, titulo, _) in enumerate(COLUNAS):
+            seta = (" ▼" if descendente else " ▲") if indice == coluna else ""
+            self.tree.heading(nome, text=titulo + seta)
+        self._atualizar_vista()
+
+    def filtrar(self, texto):
+        """Mostra só as linhas que cumprem o filtro (ex: "burst>=10 prio=2"); "" mostra tudo.
+        Lança ValueError se o filtro for inválido."""
+        self.condicoes = filtro_de_texto(texto)
+        self.topo = 0
+        self._atualizar_vista()
+
+    def _atualizar_vista(self, manter_topo=False):
+        dados = self.dados[:self.n]
+        if self.condicoes:
+            mascara = np.ones(self.n, dtype=bool)
+            for coluna, operador, valor in self.condicoes:
+                mascara &= operador(dados[:, coluna], valor)
+            vista = np.nonzero(mascara)[0]
+        else:
+            vista = np.arange(self.n)
+        if self.ordem is not None:
+            coluna, descendente = self.ordem
+            chave = dados[vista, coluna]
+            # ordenação estável: em caso de empate fica a ordem original
+            vista = vista[np.argsort(-chave if descendente else chave, kind="stable")]
+        self.vista = vista
+        if not manter_topo:
+            self.topo = 0
+        self._mostrar()
+
+    # --- Janela visível ---
+
+    def _ao_redimensionar(self, _ev=None):
+        # altura de uma linha do Treeview (depende do tema); 20 píxeis se não se souber
+        try:
+            altura_linha = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (ValueError, tk.TclError):
+            altura_linha = 20
+        cabecalho = 25
+        altura = max(1, (self.tree.winfo_height() - cabecalho) // altura_linha)
+        if altura != self.altura:
+            self.altura = altura
+            self._mostrar()
+
+    def _mostrar(self):
+        # a caixa de edição ficaria por cima de outra linha
+        self._fechar_caixa()
+        total = len(self.vista)
+        self.topo = max(0, min(self.topo, total - self.altura))
+        janela = self.vista[self.topo:self.topo + self.altura]
+        # cria ou apaga items só quando o número de linhas visíveis muda
+        while len(self.items) < len(janela):
+            self.items.append(self.tree.insert('', tk.END, values=()))
+        while len(self.items) > len(janela):
+            self.tree.delete(self.items.pop())
+        for item, linha in zip(self.items, self.dados[janela]):
+            self.tree.item(item, values=[int(v) for v in linha])
+        if total:
+            self.scrollbar.set(self.topo / total, (self.topo + len(janela)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll(self, linhas):
+        self.topo += linhas
+        self._mostrar()
+
+    def yview(self, *args):
+        """Comando da barra de scroll ("moveto" fração ou "scroll" n units/pages)."""
+        if args[0] == "moveto":
+            self.topo = int(float(args[1]) * len(self.vista))
+        elif args[0] == "scroll":
+            passos = int(args[1])
+            self.topo += passos * (self.altura if args[2] == "pages" else 1)
+        self._mostrar()
+
+    def _roda(self, ev):
+        # Windows: delta múltiplo de 120; macOS: delta pequeno
+        passos = -ev.delta // 120 if abs(ev.delta) >= 120 else -ev.delta
+        self.scroll(3 * passos)
+        return "break"
+
+    def _no_limite(self, posicao):
+        # a seleção está na primeira (0) ou última (-1) linha visível?
+        selecao = self.tree.selection()
+        return bool(self.items) and bool(selecao) and selecao[0] == self.items[posicao]
+
+    def _tecla(self, linhas):
+        self.scroll(linhas)
+        return "break"
@@ -0,0 +1,92 @@
+(* Test file for engine checkpoints and incremental re-simulation *)
+open Prob_sched_lib
+open OUnit2
+
+(* Editing a late process and resuming from the last checkpoint before its arrival
+   gives the same events, statistics and counters as simulating the edit from t=0 *)
+let test_checkpoint_resume _ =
+  let workload last_burst = [
+    Process.create ~id:1 ~arrival_time:0 ~burst_time:5 ~priority:2 ();
+    Process.create ~id:2 ~arrival_time:1 ~burst_time:3 ~priority:1 ();
+    Process.create ~id:3 ~arrival_time:2 ~burst_time:4 ~priority:3 ();
+    Process.create ~id:4 ~arrival_time:6 ~burst_time:2 ~priority:1 ();
+    Process.create ~id:5 ~arrival_time:9 ~burst_time:6 ~priority:2 ();
+    Process.create ~id:6 ~arrival_time:30 ~burst_time:2 ~priority:1 ();
+    Process.create ~id:7 ~arrival_time:31 ~burst_time:last_burst ~priority:1 ();
+  ] in
+  let engines = [
+    ("fcfs", fun ctx sink checkpoints ps -> Scheduler.fcfs ~ctx ~sink ?checkpoints ps);
+    ("sjf", fun ctx sink checkpoints ps -> Scheduler.sjf ~ctx ~sink ?checkpoints ps);
+    ("priority_np", fun ctx sink checkpoints ps -> Scheduler.priority_non_preemptive ~ctx ~sink ?checkpoints ps);
+    ("priority_preemp", fun ctx sink checkpoints ps -> Scheduler.priority_preemptive ~ctx ~sink ?checkpoints ps);
+    ("rr", fun ctx sink checkpoints ps -> Scheduler.round_robin ~ctx ~sink ?checkpoints ps ~quantum:2);
+  ] in
+  let run engine ?resume ps =
+    let ctx = Sim_context.create ps in
+    let collector = Statistics.create_collector ~ctx () in
+    Option.iter (fun (_, state) -> Statistics.restore_collector collector state) resume;
+    let events = ref [] in
+    let saved = ref [] in
+    let checkpoints = {
+      Checkpoint.every = 3;
+      save = (fun cp -> saved := (cp, Statistics.save_collector collector) :: !saved);
+      resume = Option.map fst resume;
+    } in
+    let sink ev = events := ev :: !events; Statistics.observe collector ev in
+    let final_time, _ = engine ctx sink (Some checkpoints) ctx.Sim_context.processes in
+    (final_time, List.rev !events, Statistics.finish collector final_time, ctx.Sim_context.counters, !saved)
+  in
+  let edited = workload 9 in
+  assert_equal 31 (Checkpoint.earliest_change (workload 4) edited) "First affected arrival";
+  assert_equal max_int (Checkpoint.earliest_change edited (workload 9)) "Unchanged workload";
+  List.iter (fun (name, engine) ->
+    let _, _, _, _, saved = run engine (workload 4) in
+    let resume = List.find (fun (cp, _) -> cp.Checkpoint.time < 31) saved in
+    assert_bool (name ^ ": checkpoint after t=0") ((fst resume).Checkpoint.time > 0);
+    let full_time, full_events, full_stats, full_counters, _ = run engine edited in
+    let time, events, stats, counters, _ = run engine ~resume edited in
+    assert_equal full_time time (name ^ ": final time");
+    assert_equal full_stats stats (name ^ ": statistics");
+    assert_equal full_counters counters (name ^ ": counters");
+    (* the resumed run emits exactly the events after the checkpoint *)
+    let skipped = List.length full_events - List.length events in
+    assert_equal (List.filteri (fun i _ -> i >= skipped) full_events) events (name ^ ": events")
+  ) engines
+
+(* A round-robin checkpoint taken right after a quantum expiry (the process is
+   back in the queue, the next dispatch not yet made) resumes with the same
+   counters as an uninterrupted run: the next dispatch is still a preemption *)
+let test_checkpoint_mid_quantum _ =
+  let workload () = [
+    Process.create ~id:1 ~arrival_time:0 ~burst_time:6 ~priority:1 ();
+    Process.create ~id:2 ~arrival_time:0 ~burst_time:6 ~priority:1 ();
+  ] in
+  let run ?resume () =
+    let ctx = Sim_context.create (workload ()) in
+    let saved = ref [] in
+    let checkpoints = { Checkpoint.every = 3; save = (fun cp -> saved := cp :: !saved); resume } in
+    let final_time, _ =
+      Scheduler.round_robin ~ctx ~sink:ignore ~checkpoints ctx.Sim_context.processes ~quantum:2
+    in
+    (final_time, Checkpoint.copy_counters ctx.Sim_context.counters, List.rev !saved)
+  in
+  let full_time, full_counters, saved = run () in
+  let mid_quantum = List.filter (fun cp -> cp.Checkpoint.taken_off <> None) saved in
+  assert_bool "Checkpoints right after a quantum expiry" (mid_quantum <> []);
+  List.iter (fun cp ->
+    let time, counters, _ = run ~resume:cp () in
+    let at = string_of_int cp.Checkpoint.time in
+    assert_equal full_time time ("Final time, resumed at " ^ at);
+    assert_equal full_counters counters ("Counters, resumed at " ^ at)
+  ) mid_quantum
+
+(* Suite definition *)
+let suite =
+  "Checkpoint Tests" >::: [
+    "test_checkpoint_resume" >:: test_checkpoint_resume;
+    "test_checkpoint_mid_quantum" >:: test_checkpoint_mid_quantum;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
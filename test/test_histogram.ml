@@ -0,0 +1,24 @@
+(* Test file for the latency histograms *)
+open Prob_sched_lib
+open OUnit2
+
+(* Percentiles from the histogram: exact below 128, within 1% above *)
+let test_histogram_percentiles _ =
+  let h = Histogram.create () in
+  for v = 1 to 100 do Histogram.add h v done;
+  assert_equal 50.0 (Histogram.quantile h 0.50) "p50 of 1..100";
+  assert_equal 99.0 (Histogram.quantile h 0.99) "p99 of 1..100";
+  let big = Histogram.create () in
+  for v = 1 to 100_000 do Histogram.add big v done;
+  let p95 = Histogram.quantile big 0.95 in
+  assert_bool "p95 of 1..100000 within 1%" (Float.abs (p95 -. 95_000.0) < 950.0)
+
+(* Suite definition *)
+let suite =
+  "Histogram Tests" >::: [
+    "test_histogram_percentiles" >:: test_histogram_percentiles;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
@@ -0,0 +1,75 @@
+(* Test file for lazy periodic release and hyperperiod extrapolation *)
+open Prob_sched_lib
+open OUnit2
+
+(* Lazy release gives the same events as the pre-generated instances, and
+   extrapolating repeated hyperperiods gives the same statistics as simulating them *)
+let test_periodic_release_and_extrapolation _ =
+  let tasks () = [
+    Process.create ~id:1 ~arrival_time:0 ~burst_time:1 ~priority:1 ?period:(Some 5) ?deadline:(Some 5) ();
+    Process.create ~id:2 ~arrival_time:0 ~burst_time:2 ~priority:2 ?period:(Some 8) ?deadline:(Some 8) ();
+    Process.create ~id:3 ~arrival_time:0 ~burst_time:2 ~priority:3 ?period:(Some 14) ?deadline:(Some 14) ();
+  ] in
+  let instances = Scheduler.gerar_instancias_periodicas (tasks ()) 20 in
+  (* as instâncias pré-geradas têm ids estruturados (tarefa * 1000 + k) *)
+  let by_task (final_time, log) =
+    (final_time,
+     List.map (fun e ->
+       let pid = e.Scheduler.process_id in
+       (e.Scheduler.time, (if pid >= 1000 then pid / 1000 else pid), e.Scheduler.new_state)
+     ) log)
+  in
+  let expected = by_task (Scheduler.rate_monotonic instances ~tempo_max:20) in
+  assert_equal expected (by_task (Scheduler.rate_monotonic_periodic ~tempo_max:20 (tasks ()))) "Same RM schedule";
+  assert_equal (Some 280) (Scheduler.hyperperiod (tasks ())) "Hyperperiod is the LCM of the periods";
+  let run extrapolate =
+    let collector = Statistics.create_collector () in
+    let skips = ref 0 in
+    let counter = { Scheduler.on_boundary = ignore; on_skip = (fun _ -> incr skips) } in
+    let final_time, _ =
+      Scheduler.edf_periodic ~sink:(Statistics.observe collector) ~extrapolate
+        ~listeners:[Statistics.hyperperiod_listener collector; counter] ~tempo_max:4000 (tasks ())
+    in
+    (Statistics.finish collector final_time, !skips)
+  in
+  let simulated, no_skips = run false in
+  let extrapolated, skips = run true in
+  assert_equal 0 no_skips "Nothing skipped without ~extrapolate";
+  assert_equal 1 skips "Repeated hyperperiods skipped once";
+  assert_equal simulated extrapolated "Same statistics"
+
+(* Mais de 1000 instâncias por tarefa: os ids das instâncias não colidem entre
+   tarefas, e com sink as instâncias saem do índice quando terminam *)
+let test_periodic_instance_ids _ =
+  let tasks = [
+    Process.create ~id:1 ~arrival_time:0 ~burst_time:1 ~priority:1 ?period:(Some 2) ?deadline:(Some 2) ();
+    Process.create ~id:2 ~arrival_time:0 ~burst_time:1 ~priority:2 ?period:(Some 4) ?deadline:(Some 4) ();
+  ] in
+  let ctx = Sim_context.create [] in
+  let collector = Statistics.create_collector ~ctx () in
+  let instances = Hashtbl.create 16 in
+  let sink e =
+    Statistics.observe collector e;
+    match e.Scheduler.new_state, e.Scheduler.instance_id with
+    | Process.Terminated, Some iid ->
+        assert_bool "Instance ids are unique" (not (Hashtbl.mem instances iid));
+        Hashtbl.replace instances iid e.Scheduler.process_id
+    | _ -> ()
+  in
+  let final_time, _ = Scheduler.rate_monotonic_periodic ~ctx ~sink ~tempo_max:5000 tasks in
+  let stats = Statistics.finish collector final_time in
+  assert_equal 3750 (Hashtbl.length instances) "Every instance completes";
+  assert_equal 3750 stats.Statistics.total_processes_completed "Every instance counted";
+  assert_equal 0 stats.Statistics.deadline_misses "No deadline misses";
+  assert_equal 0 (Hashtbl.length ctx.Sim_context.process_index) "Index drained"
+
+(* Suite definition *)
+let suite =
+  "Periodic Engine Tests" >::: [
+    "test_periodic_release_and_extrapolation" >:: test_periodic_release_and_extrapolation;
+    "test_periodic_instance_ids" >:: test_periodic_instance_ids;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
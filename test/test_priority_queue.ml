@@ -0,0 +1,62 @@
+(* Test file for Priority_queue (array-backed binary heap) *)
+open Prob_sched_lib
+open OUnit2
+
+(* Equal periods must come out in insertion order, and handles allow removal *)
+let test_priority_queue_fifo_ties _ =
+  let pq = Priority_queue.create (fun p -> Option.value p.Process.period ~default:max_int) in
+  let mk id period = Process.create ~id ~arrival_time:0 ~burst_time:1 ~priority:id
+                       ?period:(Some period) ?deadline:(Some period) () in
+  Priority_queue.add pq (mk 1 8);
+  let h2 = Priority_queue.push pq (mk 2 5) in
+  Priority_queue.add pq (mk 3 8);
+  Priority_queue.add pq (mk 4 5);
+  assert_equal 4 (Priority_queue.size pq);
+  Priority_queue.remove pq h2;
+  assert_bool "Removed handle should no longer be in the queue" (not (Priority_queue.mem pq h2));
+  let order = List.init 3 (fun _ -> (Priority_queue.take pq).Process.id) in
+  assert_equal [4; 1; 3] order "Ties should be extracted in FIFO order";
+  assert_bool "Queue should be empty" (Priority_queue.is_empty pq)
+
+(* A handle only belongs to the queue that created it *)
+let test_priority_queue_foreign_handle _ =
+  let a = Priority_queue.create (fun x -> x) in
+  let b = Priority_queue.create (fun x -> x) in
+  let h = Priority_queue.push a 3 in
+  Priority_queue.add b 1;
+  assert_bool "Handle is in its own queue" (Priority_queue.mem a h);
+  assert_bool "Handle is not in another queue" (not (Priority_queue.mem b h));
+  Priority_queue.remove b h;
+  Priority_queue.update b h 0;
+  assert_equal 1 (Priority_queue.size b) "Other queue is unchanged";
+  assert_equal (Some 1) (Priority_queue.peek_opt b) "Other queue keeps its element";
+  assert_bool "Handle is still in its own queue" (Priority_queue.mem a h)
+
+(* Taken elements are not kept alive by the heap array *)
+let test_priority_queue_releases_taken _ =
+  let pq = Priority_queue.create (fun (r : int ref) -> !r) in
+  let weak = Weak.create 2 in
+  let add i =
+    let v = ref i in
+    Weak.set weak i (Some v);
+    Priority_queue.add pq v
+  in
+  add 0;
+  add 1;
+  ignore (Sys.opaque_identity (Priority_queue.take pq));
+  ignore (Sys.opaque_identity (Priority_queue.take pq));
+  Gc.full_major ();
+  assert_bool "First taken element collected" (Weak.get weak 0 = None);
+  assert_bool "Second taken element collected" (Weak.get weak 1 = None)
+
+(* Suite definition *)
+let suite =
+  "Priority Queue Tests" >::: [
+    "test_priority_queue_fifo_ties" >:: test_priority_queue_fifo_ties;
+    "test_priority_queue_foreign_handle" >:: test_priority_queue_foreign_handle;
+    "test_priority_queue_releases_taken" >:: test_priority_queue_releases_taken;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
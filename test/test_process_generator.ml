@@ -0,0 +1,19 @@
+(* Test file for seeded process generation *)
+open Prob_sched_lib
+open OUnit2
+
+(* The same seed and key must always generate the same workload *)
+let test_seeded_generation _ =
+  let gen key = Process_generator.generate_processes ~st:(Random_distributions.stream ~seed:42 key) 20 in
+  assert_equal (gen [1; 10]) (gen [1; 10]) "Same seed and key should give the same processes";
+  assert_bool "Different keys should give different processes" (gen [1; 10] <> gen [2; 10])
+
+(* Suite definition *)
+let suite =
+  "Process Generator Tests" >::: [
+    "test_seeded_generation" >:: test_seeded_generation;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
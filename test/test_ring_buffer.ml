@@ -0,0 +1,43 @@
+(* Test file for the ring buffer used as the Round Robin ready queue *)
+open Prob_sched_lib
+open OUnit2
+
+(* Elements leave in FIFO order across the wrap-around and the growth of the array *)
+let test_ring_buffer_fifo _ =
+  let q = Ring_buffer.create () in
+  for i = 1 to 10 do Ring_buffer.push q i done;
+  for i = 1 to 5 do assert_equal i (Ring_buffer.pop q) "Popped in FIFO order" done;
+  for i = 11 to 40 do Ring_buffer.push q i done;
+  assert_equal (List.init 35 (fun i -> i + 6)) (Ring_buffer.to_list q) "Order after growing";
+  assert_equal 35 (Ring_buffer.length q) "Length";
+  assert_raises Not_found (fun () -> for _ = 1 to 36 do ignore (Ring_buffer.pop q) done)
+
+(* Popped elements are not kept reachable by the array (finished processes can
+   be collected while the run goes on) *)
+let test_ring_buffer_releases_popped _ =
+  let q = Ring_buffer.create () in
+  let weak = Weak.create 2 in
+  let push i =
+    let v = ref i in
+    Weak.set weak i (Some v);
+    Ring_buffer.push q v
+  in
+  push 0;
+  push 1;
+  ignore (Sys.opaque_identity (Ring_buffer.pop q));
+  ignore (Sys.opaque_identity (Ring_buffer.pop q));
+  Ring_buffer.push q (ref 2);
+  Gc.full_major ();
+  assert_bool "First popped element collected" (Weak.get weak 0 = None);
+  assert_bool "Second popped element collected" (Weak.get weak 1 = None)
+
+(* Suite definition *)
+let suite =
+  "Ring Buffer Tests" >::: [
+    "test_ring_buffer_fifo" >:: test_ring_buffer_fifo;
+    "test_ring_buffer_releases_popped" >:: test_ring_buffer_releases_popped;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
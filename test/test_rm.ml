@@ -221,6 +221,30 @@ let test_missing_p1_debug _ =
   (* Assert that there are P1 executions in the timeline *)
   assert_bool "P1 should have executions in the timeline" ((List.length p1_events) > 0)
 
+(* The event-driven RM engine must reproduce the per-tick schedule *)
+let test_rm_event_driven_completion _ =
+  let p1 = Process.create ~id:1 ~arrival_time:0 ~burst_time:1 ~priority:1
+                         ?period:(Some 5) ?deadline:(Some 5) () in
+  let p2 = Process.create ~id:2 ~arrival_time:0 ~burst_time:2 ~priority:2
+                         ?period:(Some 8) ?deadline:(Some 8) () in
+  let p3 = Process.create ~id:3 ~arrival_time:0 ~burst_time:2 ~priority:3
+                         ?period:(Some 14) ?deadline:(Some 14) () in
+  let max_time = 20 in
+  let instances = Scheduler.gerar_instancias_periodicas [p1; p2; p3] max_time in
+  let final_time, _ = Scheduler.rate_monotonic instances ~tempo_max:max_time in
+  assert_equal 19 final_time "RM should finish the last instance at t=19";
+  let completions =
+    List.map (fun p -> (p.Process.id, p.Process.completion_time)) instances
+    |> List.sort compare
+  in
+  (* Completion times produced by the original tick-by-tick engine *)
+  let expected = [
+    (1001, Some 1); (1002, Some 6); (1003, Some 11); (1004, Some 16);
+    (2001, Some 3); (2002, Some 10); (2003, Some 18);
+    (3001, Some 5); (3002, Some 19);
+  ] in
+  assert_equal expected completions "Completion times should match the per-tick schedule"
+
 (* Suite definition *)
 let suite = 
   "Rate Monotonic Tests" >::: [
@@ -229,6 +253,7 @@ let suite =
     "test_periodic_instances" >:: test_periodic_instances;
     "test_rm_scheduling" >:: test_rm_scheduling;
     "test_missing_p1_debug" >:: test_missing_p1_debug;
+    "test_rm_event_driven_completion" >:: test_rm_event_driven_completion;
   ]
 
 (* Run the tests *)
@@ -0,0 +1,34 @@
+(* Test file for the schedulability analysis *)
+open Prob_sched_lib
+open OUnit2
+
+(* Schedulability tests: the RTA response times match the simulated first
+   completions, the EDF ones the worst simulated completions, and U = 1 is
+   decided by the exact tests *)
+let test_schedulability_analysis _ =
+  let task id c t =
+    Process.create ~id ~arrival_time:0 ~burst_time:c ~priority:id ?period:(Some t) ?deadline:(Some t) ()
+  in
+  let analyze algo procs = Option.get (Schedulability.analyze algo procs) in
+  let rm = analyze "rm" [task 1 1 5; task 2 2 8; task 3 2 14] in
+  assert_equal Schedulability.Schedulable rm.verdict "Below the Liu & Layland bound";
+  assert_equal [Some 1; Some 3; Some 5]
+    (List.map (fun (r : Schedulability.task_result) -> r.response_time) rm.tasks) "RM response times";
+  let full = [task 1 2 4; task 2 3 6] in
+  assert_equal Schedulability.Unschedulable (analyze "rm" full).verdict "RM misses at U = 1";
+  assert_equal Schedulability.Schedulable (analyze "edf" full).verdict "EDF meets every deadline at U = 1";
+  assert_equal [Some 4; Some 6]
+    (List.map (fun (r : Schedulability.task_result) -> r.response_time) (analyze "edf" full).tasks)
+    "EDF response times";
+  assert_equal Schedulability.Unschedulable (analyze "edf" [task 1 3 5; task 2 3 7]).verdict "U > 1";
+  assert_equal None (Schedulability.analyze "fcfs" full) "Only rm and edf are analysed"
+
+(* Suite definition *)
+let suite =
+  "Schedulability Tests" >::: [
+    "test_schedulability_analysis" >:: test_schedulability_analysis;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
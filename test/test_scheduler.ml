@@ -0,0 +1,26 @@
+(* Test file for the non-periodic scheduling policies *)
+open Prob_sched_lib
+open OUnit2
+
+(* Round Robin: arrivals during a slice are queued before the preempted process *)
+let test_round_robin_order _ =
+  let procs = [
+    Process.create ~id:1 ~arrival_time:0 ~burst_time:5 ~priority:1 ();
+    Process.create ~id:2 ~arrival_time:1 ~burst_time:3 ~priority:1 ();
+    Process.create ~id:3 ~arrival_time:2 ~burst_time:1 ~priority:1 ();
+    Process.create ~id:4 ~arrival_time:20 ~burst_time:2 ~priority:1 ();
+  ] in
+  let final_time, _ = Scheduler.round_robin procs ~quantum:2 in
+  assert_equal 22 final_time "RR final time";
+  let completions = List.map (fun p -> (p.Process.id, p.Process.completion_time)) procs in
+  assert_equal [(1, Some 9); (2, Some 8); (3, Some 5); (4, Some 22)] completions "RR completion times"
+
+(* Suite definition *)
+let suite =
+  "Scheduler Tests" >::: [
+    "test_round_robin_order" >:: test_round_robin_order;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
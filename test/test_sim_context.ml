@@ -0,0 +1,36 @@
+(* Test file for the engine counters kept in the simulation context *)
+open Prob_sched_lib
+open OUnit2
+
+(* Engine counters used by --profile, on the same RR schedule as above *)
+let test_engine_counters _ =
+  let procs = [
+    Process.create ~id:1 ~arrival_time:0 ~burst_time:5 ~priority:1 ();
+    Process.create ~id:2 ~arrival_time:1 ~burst_time:3 ~priority:1 ();
+    Process.create ~id:3 ~arrival_time:2 ~burst_time:1 ~priority:1 ();
+    Process.create ~id:4 ~arrival_time:20 ~burst_time:2 ~priority:1 ();
+  ] in
+  let ctx = Sim_context.create procs in
+  let _, log = Scheduler.round_robin ~ctx ctx.Sim_context.processes ~quantum:2 in
+  let c = ctx.Sim_context.counters in
+  assert_equal (List.length log) c.events "Every event is counted";
+  assert_equal 7 c.context_switches "Dispatches";
+  assert_equal 3 c.preemptions "Quantum expirations";
+  assert_equal 7 c.queue_pushes "Arrivals plus re-queued processes";
+  assert_equal 7 c.queue_pops "One pop per dispatch";
+  (* Alone in RR, the process goes back on the CPU after each quantum *)
+  let ctx = Sim_context.create [Process.create ~id:1 ~arrival_time:0 ~burst_time:5 ~priority:1 ()] in
+  ignore (Scheduler.round_robin ~ctx ctx.Sim_context.processes ~quantum:2);
+  let c = ctx.Sim_context.counters in
+  assert_equal 3 c.context_switches "Re-dispatches";
+  assert_equal 0 c.preemptions "Same process back on the CPU"
+
+(* Suite definition *)
+let suite =
+  "Engine Counter Tests" >::: [
+    "test_engine_counters" >:: test_engine_counters;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
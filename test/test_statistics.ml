@@ -0,0 +1,54 @@
+(* Test file for statistics computed from the event stream *)
+open Prob_sched_lib
+open OUnit2
+
+(* Statistics computed from the event stream must match the ones from the full log *)
+let test_streamed_statistics _ =
+  let make () = [
+    Process.create ~id:1 ~arrival_time:0 ~burst_time:4 ~priority:2 ();
+    Process.create ~id:2 ~arrival_time:1 ~burst_time:3 ~priority:1 ();
+    Process.create ~id:3 ~arrival_time:9 ~burst_time:2 ~priority:3 ();
+  ] in
+  let procs = make () in
+  let final_time, log = Scheduler.priority_preemptive procs in
+  let expected = Statistics.calculate_statistics procs final_time log in
+  let procs = make () in
+  let collector = Statistics.create_collector () in
+  let streamed_time, streamed_log =
+    Scheduler.priority_preemptive ~sink:(Statistics.observe collector) procs
+  in
+  assert_equal final_time streamed_time "Same final time";
+  assert_equal [] streamed_log "No log is kept when a sink is given";
+  assert_equal expected (Statistics.finish collector streamed_time) "Same statistics"
+
+(* Idle time comes from the length of the idle intervals, not from the number
+   of idle events: one event per gap in priority_preemptive, two in fcfs *)
+let test_idle_intervals _ =
+  let make () = [
+    Process.create ~id:1 ~arrival_time:0 ~burst_time:2 ~priority:1 ();
+    Process.create ~id:2 ~arrival_time:10 ~burst_time:3 ~priority:1 ();
+    Process.create ~id:3 ~arrival_time:20 ~burst_time:1 ~priority:1 ();
+  ] in
+  let expected = (1.0 -. (15.0 /. 21.0)) *. 100.0 in
+  let idle_events log = List.length (List.filter (fun e -> e.Scheduler.process_id = -1) log) in
+  let procs = make () in
+  let final_time, log = Scheduler.priority_preemptive procs in
+  assert_equal 21 final_time "Preemptive final time";
+  assert_equal 2 (idle_events log) "One idle event per gap";
+  let stats = Statistics.calculate_statistics procs final_time log in
+  assert_equal expected stats.Statistics.cpu_utilization "Preemptive utilization";
+  let procs = make () in
+  let final_time, log = Scheduler.fcfs procs in
+  let stats = Statistics.calculate_statistics procs final_time log in
+  assert_equal expected stats.Statistics.cpu_utilization "FCFS utilization"
+
+(* Suite definition *)
+let suite =
+  "Statistics Tests" >::: [
+    "test_streamed_statistics" >:: test_streamed_statistics;
+    "test_idle_intervals" >:: test_idle_intervals;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite
@@ -0,0 +1,112 @@
+(* Test file for the workload loader (CSV and binary format) *)
+open Prob_sched_lib
+open OUnit2
+
+(* CSV -> binary -> mmap must give back the same rows; invalid lines are skipped *)
+let test_workload_binary_roundtrip _ =
+  let csv_file = Filename.temp_file "workload" ".csv" in
+  let bin_file = Filename.temp_file "workload" ".bin" in
+  let oc = open_out csv_file in
+  output_string oc "id,chegada,burst,periodo\n1, 0, 3, 5\n\n2,0,2,7\n3,x,1,1\n4,-2,1,9";
+  close_out oc;
+  let expected = [(1, 0, 3, 5); (2, 0, 2, 7); (4, -2, 1, 9)] in
+  assert_equal expected (Workload.to_tuples (Workload.load_csv csv_file)) "CSV rows";
+  assert_equal 3 (Workload.csv_to_binary csv_file bin_file) "Converted rows";
+  assert_bool "Binary file should be detected" (Workload.is_binary bin_file);
+  assert_equal expected (Workload.to_tuples (Workload.load bin_file)) "Binary rows";
+  Sys.remove csv_file;
+  Sys.remove bin_file
+
+(* Two processes with the same id are rejected when the file is loaded, in both
+   formats: the run index and the statistics find processes by id *)
+let test_workload_duplicate_ids _ =
+  let file = Filename.temp_file "workload" ".csv" in
+  let bin_file = Filename.temp_file "workload" ".bin" in
+  let oc = open_out file in
+  output_string oc "1,0,3,2\n2,1,2,1\n";
+  close_out oc;
+  Workload.save_binary (Workload.load_csv file) bin_file;
+  let oc = open_out file in
+  output_string oc "1,0,3,2\n2,1,2,1\n1,4,1,1\n";
+  close_out oc;
+  assert_raises (Failure ("ID de processo repetido (1) em '" ^ file ^ "'."))
+    (fun () -> Workload.load_csv file);
+  (* the same id written straight into the binary file *)
+  let w = Workload.load_binary bin_file in
+  let ids = Bigarray.Array1.create Bigarray.int32 Bigarray.c_layout 2 in
+  Bigarray.Array1.fill ids 2l;
+  Workload.save_binary { w with Workload.ids } (bin_file ^ ".dup");
+  assert_raises (Failure ("ID de processo repetido (2) em '" ^ bin_file ^ ".dup'."))
+    (fun () -> Workload.load_binary (bin_file ^ ".dup"));
+  List.iter Sys.remove [file; bin_file; bin_file ^ ".dup"]
+
+(* A binary file written on a machine with the other byte order is converted on load *)
+let test_workload_foreign_byte_order _ =
+  let file = Filename.temp_file "workload" ".bin" in
+  let rows = [(1, 0, 3, 5); (2, 4, 2, 7); (3, -2, 1, 9)] in
+  let n = List.length rows in
+  let b = Bytes.create (4 * (4 + (4 * n))) in
+  let set i v =
+    if Sys.big_endian then Bytes.set_int32_le b (4 * i) (Int32.of_int v)
+    else Bytes.set_int32_be b (4 * i) (Int32.of_int v)
+  in
+  List.iteri set [0x50534348; 2; n; 0x01020304];
+  List.iteri (fun r (id, arrival, burst, param) ->
+    List.iteri (fun k v -> set (4 + (k * n) + r) v) [id; arrival; burst; param]
+  ) rows;
+  let oc = open_out_bin file in
+  output_bytes oc b;
+  close_out oc;
+  assert_bool "Binary file should be detected" (Workload.is_binary file);
+  assert_equal rows (Workload.to_tuples (Workload.load file)) "Rows in the other byte order";
+  set 3 0;
+  let oc = open_out_bin file in
+  output_bytes oc b;
+  close_out oc;
+  assert_raises (Failure ("Ficheiro binário de processos inválido: " ^ file))
+    (fun () -> Workload.load_binary file);
+  Sys.remove file
+
+(* Running on the columns gives the same result as the process list, and the
+   index only keeps the processes that are still running *)
+let test_run_workload _ =
+  let file = Filename.temp_file "workload" ".csv" in
+  let oc = open_out file in
+  output_string oc "1,5,3,2\n2,0,4,1\n3,5,2,1\n4,30,1,3\n5,1,6,2\n";
+  close_out oc;
+  let w = Workload.load_csv file in
+  Sys.remove file;
+  let processes () =
+    List.map (fun (id, arrival_time, burst_time, priority) ->
+      Process.create ~id ~arrival_time ~burst_time ~priority ()) (Workload.to_tuples w)
+  in
+  List.iter (fun (name, policy, engine) ->
+    let procs = processes () in
+    let expected_time, log = engine procs in
+    let expected = Statistics.calculate_statistics procs expected_time log in
+    let ctx = Sim_context.create [] in
+    let collector = Statistics.create_collector ~ctx () in
+    let final_time, _ = Scheduler.run_workload ~ctx ~sink:(Statistics.observe collector) policy w in
+    assert_equal expected_time final_time (name ^ ": final time");
+    assert_equal expected (Statistics.finish collector final_time) (name ^ ": statistics");
+    assert_equal 0 (Hashtbl.length ctx.Sim_context.process_index) (name ^ ": index is empty at the end")
+  ) [
+    ("fcfs", Scheduler.Fcfs, fun ps -> Scheduler.fcfs ps);
+    ("sjf", Scheduler.Sjf, fun ps -> Scheduler.sjf ps);
+    ("priority_np", Scheduler.Priority_non_preemptive, fun ps -> Scheduler.priority_non_preemptive ps);
+    ("priority_preemp", Scheduler.Priority_preemptive, fun ps -> Scheduler.priority_preemptive ps);
+    ("rr", Scheduler.Round_robin 2, fun ps -> Scheduler.round_robin ps ~quantum:2);
+  ]
+
+(* Suite definition *)
+let suite =
+  "Workload Tests" >::: [
+    "test_workload_binary_roundtrip" >:: test_workload_binary_roundtrip;
+    "test_workload_duplicate_ids" >:: test_workload_duplicate_ids;
+    "test_workload_foreign_byte_order" >:: test_workload_foreign_byte_order;
+    "test_run_workload" >:: test_run_workload;
+  ]
+
+(* Run the tests *)
+let () =
+  run_test_tt_main suite